@@ -0,0 +1,104 @@
+"""Offline end-to-end throughput benchmark for the ``/jobbot post`` path.
+
+Drives ``_collect_jobs`` + ``_post_jobs`` against local stand-ins (corpus web
+server, fake OpenAI Responses endpoint, fake Discord guild) and reports
+jobs/sec, per-request latency percentiles and peak RSS.
+
+Run with ``python -m benchmarks.e2e [--requests 200] [--concurrency 16]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from benchmarks.fakes import OfflineStack, latency_summary, start_offline_stack
+
+
+def _references(stack: OfflineStack, count: int, seed: int) -> List[str]:
+    # One to three sources per request, mixing pages and posters.
+    rng = random.Random(seed)
+    entries = stack.corpus.entries
+    return [
+        "\n".join(stack.web.reference_for(entry) for entry in rng.sample(entries, rng.randint(1, 3)))
+        for _ in range(count)
+    ]
+
+
+async def run(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        stack = await start_offline_stack(
+            Path(tmp),
+            web_latency=args.web_latency_ms / 1000,
+            openai_latency=args.openai_latency_ms / 1000,
+            openai_jitter=args.openai_jitter_ms / 1000,
+            send_latency=args.send_latency_ms / 1000,
+        )
+        try:
+            references = _references(stack, args.requests, args.seed)
+            semaphore = asyncio.Semaphore(args.concurrency)
+            latencies: List[float] = []
+            posted = 0
+
+            async def one(index: int, reference: str) -> None:
+                nonlocal posted
+                async with semaphore:
+                    started = time.perf_counter()
+                    jobs, _ = await stack.bot._collect_jobs(  # noqa: SLF001
+                        reference=reference,
+                        request_id=index,
+                        force=not args.dedupe,
+                    )
+                    posted_jobs, _ = await stack.bot._post_jobs(  # noqa: SLF001
+                        jobs,
+                        stack.guild,
+                        request_id=index,
+                        force=not args.dedupe,
+                    )
+                    latencies.append(time.perf_counter() - started)
+                    posted += len(posted_jobs)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(index, reference) for index, reference in enumerate(references)))
+            elapsed = time.perf_counter() - started
+        finally:
+            await stack.close()
+
+    p50, p95, p99 = latency_summary(latencies)
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"corpus v{stack.corpus.version}: {len(stack.corpus.entries)} entries")
+    print(
+        f"requests={args.requests} concurrency={args.concurrency} "
+        f"openai={args.openai_latency_ms:.0f}ms±{args.openai_jitter_ms:.0f} "
+        f"web={args.web_latency_ms:.0f}ms discord={args.send_latency_ms:.0f}ms"
+    )
+    print(f"jobs posted: {posted} in {elapsed:.2f}s → {posted / elapsed:.1f} jobs/s, {args.requests / elapsed:.1f} req/s")
+    print(f"request latency p50={p50 * 1000:.0f}ms p95={p95 * 1000:.0f}ms p99={p99 * 1000:.0f}ms")
+    print(f"fake OpenAI calls: {stack.openai.calls}, page/poster requests: {stack.web.requests}")
+    print(f"peak RSS: {peak_rss_mb:.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--openai-latency-ms", type=float, default=800)
+    parser.add_argument("--openai-jitter-ms", type=float, default=400)
+    parser.add_argument("--web-latency-ms", type=float, default=50)
+    parser.add_argument("--send-latency-ms", type=float, default=60)
+    parser.add_argument("--dedupe", action="store_true", help="Keep duplicate protection on (later requests skip work).")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""Local stand-ins for the web, the OpenAI Responses API and Discord.
+
+Used by the offline benchmarks so the full ``/jobbot post`` path can run
+without network access or credentials.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import discord
+from aiohttp import web
+
+from bot.client import LaCommuDiscordBot
+from bot.config import BotConfig, ChannelConfig, OpenAIConfig
+from bot.history import PostHistory
+from bot.openai_client import OpenAIJobParser
+from bot.retry import RetryManager
+
+CORPUS_DIR = Path(__file__).with_name("corpus")
+TEAM_CHANNELS = {"art": 1, "game_design": 2, "dev": 3, "others": 4}
+
+_SOURCE_REGEX = re.compile(r"Source (?:URL|Reference): (\S+)")
+
+
+@dataclass(slots=True)
+class CorpusEntry:
+    name: str
+    kind: str  # "page" or "image"
+    source: Path
+    output: str
+
+
+@dataclass(slots=True)
+class Corpus:
+    version: int
+    entries: List[CorpusEntry]
+
+    @classmethod
+    def load(cls, directory: Path = CORPUS_DIR) -> "Corpus":
+        manifest = json.loads((directory / "manifest.json").read_text())
+        entries = [
+            CorpusEntry(
+                name=item["name"],
+                kind=item["kind"],
+                source=directory / item["source"],
+                output=(directory / item["output"]).read_text(),
+            )
+            for item in manifest["entries"]
+        ]
+        return cls(version=manifest["version"], entries=entries)
+
+    def labels(self) -> Dict[str, List[Dict[str, Any]]]:
+        return json.loads((CORPUS_DIR / "labels.json").read_text())
+
+    def by_name(self) -> Dict[str, CorpusEntry]:
+        return {entry.name: entry for entry in self.entries}
+
+
+class _LocalServer:
+    def __init__(self) -> None:
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    def _app(self) -> web.Application:  # pragma: no cover - overridden
+        raise NotImplementedError
+
+    async def start(self) -> str:
+        self._runner = web.AppRunner(self._app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+class FakeWeb(_LocalServer):
+    """Serves corpus pages and posters at ``/pages/<name>.html`` and ``/posters/<name>.png``."""
+
+    def __init__(self, corpus: Corpus, *, latency: float = 0.0) -> None:
+        super().__init__()
+        self._files = {f"/{entry.source.parent.name}/{entry.source.name}": entry.source for entry in corpus.entries}
+        self._latency = latency
+        self.requests = 0
+
+    def url_for(self, entry: CorpusEntry) -> str:
+        return f"{self.base_url}/{entry.source.parent.name}/{entry.source.name}"
+
+    def reference_for(self, entry: CorpusEntry) -> str:
+        url = self.url_for(entry)
+        return f"image: {url}" if entry.kind == "image" else url
+
+    def _app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{folder}/{filename}", self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests += 1
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        path = self._files.get(request.path)
+        if path is None:
+            raise web.HTTPNotFound()
+        return web.FileResponse(path)
+
+
+class FakeOpenAI(_LocalServer):
+    """Minimal ``POST /v1/responses`` returning canned corpus outputs.
+
+    The output is picked from the ``Source URL`` / ``Source Reference`` in the
+    prompt (file stem = corpus entry name). ``latency`` (+ uniform ``jitter``)
+    mimics model time; ``outputs`` overrides the canned text per entry;
+    ``error_rate`` returns HTTP 500 for a fraction of calls.
+    """
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        *,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        outputs: Optional[Dict[str, str]] = None,
+        tokens_per_char: float = 0.25,
+        seed: int = 7,
+    ) -> None:
+        super().__init__()
+        self._outputs = {entry.name: entry.output for entry in corpus.entries}
+        self._outputs.update(outputs or {})
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+        self._tokens_per_char = tokens_per_char
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.models: Dict[str, int] = {}
+
+    def _app(self) -> web.Application:
+        app = web.Application(client_max_size=8 * 1024 * 1024)
+        app.router.add_post("/v1/responses", self._handle)
+        return app
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        body = await request.json()
+        model = body.get("model", "unknown")
+        self.models[model] = self.models.get(model, 0) + 1
+        prompt = _prompt_text(body.get("input", []))
+        delay = self._latency + self._random.uniform(0, self._jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        if self._error_rate and self._random.random() < self._error_rate:
+            return web.json_response({"error": {"message": "synthetic failure", "type": "server_error"}}, status=500)
+        match = _SOURCE_REGEX.search(prompt)
+        name = Path(match.group(1)).stem if match else ""
+        text = self._outputs.get(name, "[]")
+        input_tokens = int(len(prompt) * self._tokens_per_char) + (765 if "input_image" in json.dumps(body) else 0)
+        output_tokens = int(len(text) * self._tokens_per_char)
+        return web.json_response(_response_payload(model, text, input_tokens, output_tokens))
+
+
+def _prompt_text(messages: List[Dict[str, Any]]) -> str:
+    parts: List[str] = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(str(item.get("text", "")) for item in content if isinstance(item, dict))
+    return "\n".join(parts)
+
+
+def _response_payload(model: str, text: str, input_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": f"resp_{time.time_ns():x}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": model,
+        "output": [
+            {
+                "type": "message",
+                "id": "msg_bench",
+                "status": "completed",
+                "role": "assistant",
+                "content": [{"type": "output_text", "text": text, "annotations": []}],
+            }
+        ],
+        "parallel_tool_calls": False,
+        "tool_choice": "none",
+        "tools": [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+class FakeChannel:
+    def __init__(self, name: str, channel_id: int, *, latency: float = 0.0) -> None:
+        self.name = name
+        self.id = channel_id
+        self.mention = f"#{name}"
+        self._latency = latency
+        self.sent: List[Any] = []
+
+    async def send(self, *, embed=None, content=None, **kwargs) -> None:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        self.sent.append(embed or content)
+
+
+class FakeGuild:
+    def __init__(self, *, guild_id: int = 123, send_latency: float = 0.0) -> None:
+        self.id = guild_id
+        self.name = "Benchmark Guild"
+        self.shard_id = 0
+        self.text_channels = [
+            FakeChannel(team, channel_id, latency=send_latency) for team, channel_id in TEAM_CHANNELS.items()
+        ]
+
+    def get_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return next((channel for channel in self.text_channels if channel.id == channel_id), None)
+
+    async def fetch_channel(self, channel_id: int) -> Optional[FakeChannel]:
+        return self.get_channel(channel_id)
+
+    @property
+    def sent_count(self) -> int:
+        return sum(len(channel.sent) for channel in self.text_channels)
+
+
+# Discord rejects the initial response after 3 s and follow-ups once the token expires.
+INTERACTION_DEFER_WINDOW = 3.0
+INTERACTION_TOKEN_TTL = 15 * 60.0
+
+
+def _unknown_interaction() -> discord.NotFound:
+    response = SimpleNamespace(status=404, reason="Not Found")
+    return discord.NotFound(response, {"code": 10062, "message": "Unknown interaction"})
+
+
+class FakeUser:
+    def __init__(self, user_id: int) -> None:
+        self.id = user_id
+        self.name = f"bench-user-{user_id}"
+        self.mention = f"<@{user_id}>"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeInteractionResponse:
+    def __init__(self, interaction: "FakeInteraction", *, latency: float) -> None:
+        self._interaction = interaction
+        self._latency = latency
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, *, thinking: bool = False, ephemeral: bool = False) -> None:
+        interaction = self._interaction
+        interaction.defer_at = time.perf_counter()
+        if interaction.defer_at - interaction.received_at > interaction.defer_window:
+            interaction.expired = True
+            raise _unknown_interaction()
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        self._done = True
+
+    async def send_message(self, content: Optional[str] = None, *, embed=None, ephemeral: bool = False, **kwargs) -> None:
+        await self.defer()
+        self._interaction.messages.append(embed or content)
+        self._interaction.summary_at = time.perf_counter()
+
+
+class FakeFollowup:
+    def __init__(self, interaction: "FakeInteraction", *, latency: float) -> None:
+        self._interaction = interaction
+        self._latency = latency
+
+    async def send(self, content: Optional[str] = None, *, embed=None, ephemeral: bool = False, **kwargs) -> None:
+        interaction = self._interaction
+        if time.perf_counter() - interaction.received_at > INTERACTION_TOKEN_TTL:
+            raise _unknown_interaction()
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        interaction.messages.append(embed or content)
+        if interaction.summary_at is None:
+            interaction.summary_at = time.perf_counter()
+
+
+class FakeInteraction:
+    """Enough of ``discord.Interaction`` for the ``/jobbot`` command callbacks.
+
+    ``received_at`` is when Discord created the interaction (``perf_counter``
+    clock); ``defer_at`` / ``summary_at`` record when the bot responded.
+    """
+
+    def __init__(
+        self,
+        interaction_id: int,
+        guild: "FakeGuild",
+        user: FakeUser,
+        *,
+        received_at: Optional[float] = None,
+        response_latency: float = 0.0,
+        defer_window: float = INTERACTION_DEFER_WINDOW,
+    ) -> None:
+        self.id = interaction_id
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.received_at = time.perf_counter() if received_at is None else received_at
+        self.defer_window = defer_window
+        self.response = FakeInteractionResponse(self, latency=response_latency)
+        self.followup = FakeFollowup(self, latency=response_latency)
+        self.messages: List[Any] = []
+        self.defer_at: Optional[float] = None
+        self.summary_at: Optional[float] = None
+        self.expired = False
+
+
+@dataclass
+class OfflineStack:
+    """A bot wired to local stand-ins; build with :func:`start_offline_stack`."""
+
+    corpus: Corpus
+    web: FakeWeb
+    openai: FakeOpenAI
+    bot: LaCommuDiscordBot
+    guild: FakeGuild
+    retry_manager: RetryManager
+    post_history: PostHistory
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+    async def close(self) -> None:
+        self.retry_manager.close()
+        await self.post_history.aclose()
+        await self.openai.stop()
+        await self.web.stop()
+
+
+async def start_offline_stack(
+    workdir: Path,
+    *,
+    corpus: Optional[Corpus] = None,
+    web_latency: float = 0.0,
+    openai_latency: float = 0.0,
+    openai_jitter: float = 0.0,
+    send_latency: float = 0.0,
+    model: str = "gpt-4o-mini",
+    configure: Optional[Callable[[BotConfig], None]] = None,
+    bot_kwargs: Optional[Dict[str, Any]] = None,
+    retry_kwargs: Optional[Dict[str, Any]] = None,
+) -> OfflineStack:
+    corpus = corpus or Corpus.load()
+    fake_web = FakeWeb(corpus, latency=web_latency)
+    fake_openai = FakeOpenAI(corpus, latency=openai_latency, jitter=openai_jitter)
+    await fake_web.start()
+    openai_url = await fake_openai.start()
+
+    config = BotConfig(
+        discord_token="offline",
+        openai=OpenAIConfig(api_key="offline", model=model, base_url=f"{openai_url}/v1"),
+        channels=ChannelConfig(team_channels=dict(TEAM_CHANNELS)),
+        near_duplicate_action="off",
+    )
+    if configure:
+        configure(config)
+    workdir.mkdir(parents=True, exist_ok=True)
+    retry_manager = RetryManager(workdir / "pending_requests.json", **(retry_kwargs or {}))
+    post_history = PostHistory(workdir / "posted_jobs.log")
+    await post_history.load()
+    parser = OpenAIJobParser(config.openai)
+    bot = LaCommuDiscordBot(config, parser, retry_manager, post_history, **(bot_kwargs or {}))
+    guild = FakeGuild(send_latency=send_latency)
+    await bot._cache_team_channels(guild)  # noqa: SLF001
+    return OfflineStack(
+        corpus=corpus,
+        web=fake_web,
+        openai=fake_openai,
+        bot=bot,
+        guild=guild,
+        retry_manager=retry_manager,
+        post_history=post_history,
+    )
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def latency_summary(values: List[float]) -> Tuple[float, float, float]:
+    return percentile(values, 0.50), percentile(values, 0.95), percentile(values, 0.99)
@@ -0,0 +1,63 @@
+"""Compare memory and lookup cost of PostHistory seen-set representations.
+
+Run with ``python -m benchmarks.history_seen [--keys 200000]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+import tracemalloc
+from typing import Callable, Iterable, List
+
+from bot.keyset import KeyDigestSet
+
+
+def _synthetic_keys(count: int) -> List[str]:
+    rng = random.Random(42)
+    hosts = ["jobs.lever.co", "boards.greenhouse.io", "www.linkedin.com/jobs/view", "apply.workable.com"]
+    return [
+        f"https://{rng.choice(hosts)}/studio-{rng.randrange(5000)}/{rng.getrandbits(64):x}-gameplay-programmer"
+        for _ in range(count)
+    ]
+
+
+def _measure(factory: Callable[[Iterable[str]], object], keys: List[str]) -> tuple[object, int]:
+    tracemalloc.start()
+    container = factory(keys)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return container, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--keys", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Keys are materialised before measuring: the log file has to be read either way.
+    keys = _synthetic_keys(args.keys)
+    hits = random.Random(1).sample(keys, min(args.lookups, len(keys)))
+    misses = _synthetic_keys(args.lookups + args.keys)[args.keys:]
+
+    candidates = {
+        "set[str]": lambda items: set(items),
+        "KeyDigestSet": lambda items: KeyDigestSet(items, capacity=len(keys)),
+        "KeyDigestSet+bloom": lambda items: KeyDigestSet(items, bloom=True, capacity=len(keys)),
+    }
+    print(f"{'representation':<20} {'memory':>10} {'B/key':>7} {'hit ns':>8} {'miss ns':>8}")
+    for name, factory in candidates.items():
+        # set[str] holds references to the key strings, which must stay alive.
+        container, size = _measure(factory, keys)
+        if isinstance(container, set):
+            size += sum(len(key) + 49 for key in keys)
+        lookup = container.might_contain if isinstance(container, KeyDigestSet) else container.__contains__
+        hit_ns = timeit.timeit(lambda: [key in container for key in hits], number=1) / len(hits) * 1e9
+        miss_ns = timeit.timeit(lambda: [lookup(key) for key in misses], number=1) / len(misses) * 1e9
+        print(f"{name:<20} {size / 1e6:>8.1f}MB {size / len(keys):>7.1f} {hit_ns:>8.0f} {miss_ns:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
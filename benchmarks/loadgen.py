@@ -0,0 +1,181 @@
+"""Fire concurrent ``/jobbot post`` and ``/jobbot preview`` invocations at the bot.
+
+Synthetic interactions arrive on a fixed schedule (``--rate`` per second, or
+all at once with ``--rate 0``) and are dispatched to the real command
+callbacks the way discord.py does, one task per interaction. The bot runs
+against the offline stand-ins from :mod:`benchmarks.fakes`.
+
+Reported per command:
+
+* defer latency: from Discord creating the interaction to ``defer()``;
+  anything past 3 s counts as expired, as Discord would reject it;
+* time-to-summary: from creation to the first follow-up;
+* retry-file contention: wait for and hold time of the ``RetryManager`` lock,
+  plus journal compactions.
+
+Run with ``python -m benchmarks.loadgen [--interactions 300] [--rate 50]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.fakes import FakeInteraction, FakeUser, OfflineStack, latency_summary, start_offline_stack
+
+
+class TimedLock(asyncio.Lock):
+    """``asyncio.Lock`` that records how long callers waited for and held it."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.waits: List[float] = []
+        self.holds: List[float] = []
+        self._acquired_at = 0.0
+
+    async def acquire(self) -> bool:
+        started = time.perf_counter()
+        result = await super().acquire()
+        self._acquired_at = time.perf_counter()
+        self.waits.append(self._acquired_at - started)
+        return result
+
+    def release(self) -> None:
+        self.holds.append(time.perf_counter() - self._acquired_at)
+        super().release()
+
+
+def _instrument_retry_manager(stack: OfflineStack) -> TimedLock:
+    manager = stack.retry_manager
+    lock = TimedLock()
+    manager._lock = lock  # noqa: SLF001
+    compact = manager._compact  # noqa: SLF001
+    stack.extras["compactions"] = 0
+
+    def counting_compact() -> None:
+        stack.extras["compactions"] += 1
+        compact()
+
+    manager._compact = counting_compact  # noqa: SLF001
+    return lock
+
+
+def _format_ms(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    p50, p95, p99 = latency_summary(values)
+    return f"p50={p50 * 1000:.0f}ms p95={p95 * 1000:.0f}ms p99={p99 * 1000:.0f}ms max={max(values) * 1000:.0f}ms"
+
+
+async def run(args: argparse.Namespace) -> None:
+    if args.executor_workers:
+        # OpenAI calls and file I/O go through run_blocking, i.e. the default executor.
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(args.executor_workers))
+    with tempfile.TemporaryDirectory() as tmp:
+        stack = await start_offline_stack(
+            Path(tmp),
+            web_latency=args.web_latency_ms / 1000,
+            openai_latency=args.openai_latency_ms / 1000,
+            openai_jitter=args.openai_jitter_ms / 1000,
+            send_latency=args.send_latency_ms / 1000,
+            retry_kwargs={"compact_threshold": args.compact_threshold},
+        )
+        lock = _instrument_retry_manager(stack)
+        group = stack.bot.tree.get_command("jobbot")
+        commands = {"post": group.get_command("post"), "preview": group.get_command("preview")}
+        rng = random.Random(args.seed)
+        entries = stack.corpus.entries
+        users = [FakeUser(1000 + index) for index in range(args.users)]
+        interactions: Dict[str, List[FakeInteraction]] = defaultdict(list)
+        tasks: List[asyncio.Task[None]] = []
+        errors = 0
+
+        async def invoke(name: str, interaction: FakeInteraction, reference: str) -> None:
+            nonlocal errors
+            try:
+                await commands[name].callback(interaction, reference=reference, force=not args.dedupe)
+            except Exception:  # noqa: BLE001
+                errors += 1
+                logging.getLogger(__name__).exception("🚫 %s interaction %s failed", name, interaction.id)
+
+        try:
+            started = time.perf_counter()
+            for index in range(args.interactions):
+                # Arrival times follow Discord's clock, not ours: if the loop is
+                # busy, dispatch happens late but the 3 s window already started.
+                arrival = started + (index / args.rate if args.rate else 0.0)
+                delay = arrival - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                name = "preview" if rng.random() < args.preview_ratio else "post"
+                reference = "\n".join(
+                    stack.web.reference_for(entry) for entry in rng.sample(entries, rng.randint(1, 3))
+                )
+                interaction = FakeInteraction(
+                    10_000 + index,
+                    stack.guild,
+                    rng.choice(users),
+                    received_at=arrival,
+                    response_latency=args.response_latency_ms / 1000,
+                )
+                interactions[name].append(interaction)
+                tasks.append(asyncio.create_task(invoke(name, interaction, reference)))
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - started
+        finally:
+            await stack.close()
+
+    print(
+        f"interactions={args.interactions} rate={args.rate or 'burst'}/s preview_ratio={args.preview_ratio} "
+        f"openai={args.openai_latency_ms:.0f}ms±{args.openai_jitter_ms:.0f} web={args.web_latency_ms:.0f}ms "
+        f"discord={args.send_latency_ms:.0f}ms executor_workers={args.executor_workers or 'default'}"
+    )
+    print(f"finished in {elapsed:.2f}s, {errors} callback error(s), {stack.guild.sent_count} job message(s) posted")
+    for name, items in interactions.items():
+        expired = sum(1 for item in items if item.expired)
+        defers = [item.defer_at - item.received_at for item in items if item.defer_at is not None]
+        summaries = [item.summary_at - item.received_at for item in items if item.summary_at is not None]
+        print(f"/jobbot {name}: {len(items)} sent, {expired} expired before defer ({expired / len(items):.1%})")
+        print(f"  defer latency    {_format_ms(defers)}")
+        print(f"  time-to-summary  {_format_ms(summaries)}")
+    print(
+        f"retry lock: {len(lock.waits)} acquisitions, wait {_format_ms(lock.waits)}; "
+        f"hold {_format_ms(lock.holds)}; {stack.extras['compactions']} compaction(s)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interactions", type=int, default=300)
+    parser.add_argument("--rate", type=float, default=50, help="Arrivals per second; 0 sends everything at once.")
+    parser.add_argument("--preview-ratio", type=float, default=0.3)
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--openai-latency-ms", type=float, default=800)
+    parser.add_argument("--openai-jitter-ms", type=float, default=400)
+    parser.add_argument("--web-latency-ms", type=float, default=50)
+    parser.add_argument("--send-latency-ms", type=float, default=60)
+    parser.add_argument("--response-latency-ms", type=float, default=40, help="Round trip of defer/follow-up calls.")
+    parser.add_argument(
+        "--executor-workers",
+        type=int,
+        default=0,
+        help="Size of the default executor used by run_blocking (0 keeps asyncio's default).",
+    )
+    parser.add_argument("--compact-threshold", type=int, default=1000, help="RetryManager journal compaction threshold.")
+    parser.add_argument("--dedupe", action="store_true", help="Keep duplicate protection on (later requests skip work).")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Measure event-loop time spent in logging during a burst of posts.
+
+Each simulated post logs the same INFO lines as the real pipeline. The
+benchmark compares synchronous handlers (file + stream, as before) with the
+``QueueHandler`` setup from :mod:`bot.log`, reporting loop time spent inside
+logging calls and the worst loop stall seen by a 1 ms ticker.
+
+``--write-latency-ms`` adds a delay to every file write to mimic a slow or
+contended disk (network volumes, a full journald pipe), which is where the
+synchronous setup hurts most.
+
+Run with ``python -m benchmarks.logging_burst [--posts 500] [--write-latency-ms 0.5]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from bot.log import TEXT_FORMAT, build_file_handler, setup_queue_logging
+
+LINES_PER_POST = 8
+
+
+async def _burst(posts: int, concurrency: int) -> tuple[float, float]:
+    log = logging.getLogger("bot.client")
+    spent = 0.0
+    worst_stall = 0.0
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        nonlocal worst_stall
+        while not done.is_set():
+            expected = time.perf_counter() + 0.001
+            await asyncio.sleep(0.001)
+            worst_stall = max(worst_stall, time.perf_counter() - expected)
+
+    async def post(index: int) -> None:
+        nonlocal spent
+        for line in range(LINES_PER_POST):
+            started = time.perf_counter()
+            log.info("📤 Posted '%s' to #%s in guild %s (step %d)", f"Job {index}", "dev", 123, line)
+            spent += time.perf_counter() - started
+            await asyncio.sleep(0)
+
+    tick = asyncio.create_task(ticker())
+    for offset in range(0, posts, concurrency):
+        await asyncio.gather(*(post(index) for index in range(offset, min(offset + concurrency, posts))))
+    done.set()
+    await tick
+    return spent, worst_stall
+
+
+class _SlowFileHandler(logging.FileHandler):
+    latency = 0.0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        time.sleep(self.latency)
+        super().emit(record)
+
+
+def _sync_handlers(handlers: List[logging.Handler]) -> None:
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--write-latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for mode in ("sync", "queue"):
+            # The stream goes to memory so terminal speed doesn't skew the numbers.
+            if args.write_latency_ms:
+                file_handler: logging.Handler = _SlowFileHandler(Path(tmp) / f"{mode}.log")
+                _SlowFileHandler.latency = args.write_latency_ms / 1000
+            else:
+                file_handler = build_file_handler(Path(tmp) / f"{mode}.log")
+            handlers = [logging.StreamHandler(io.StringIO()), file_handler]
+            listener = None
+            if mode == "sync":
+                _sync_handlers(handlers)
+            else:
+                listener = setup_queue_logging(handlers)
+            started = time.perf_counter()
+            spent, stall = asyncio.run(_burst(args.posts, args.concurrency))
+            elapsed = time.perf_counter() - started
+            if listener:
+                listener.stop()
+            for handler in handlers:
+                handler.close()
+            results[mode] = (spent, stall, elapsed)
+
+    records = args.posts * LINES_PER_POST
+    print(f"{records} log records from {args.posts} posts ({args.concurrency} concurrent)")
+    print(f"{'handlers':<8} {'loop time in logging':>22} {'per record':>12} {'worst stall':>12}")
+    for mode, (spent, stall, _) in results.items():
+        print(f"{mode:<8} {spent * 1000:>19.1f} ms {spent / records * 1e6:>9.1f} µs {stall * 1000:>9.2f} ms")
+    saved = results["sync"][0] - results["queue"][0]
+    print(f"Loop time saved with QueueHandler: {saved * 1000:.1f} ms ({saved / results['sync'][0]:.0%})")
+
+
+if __name__ == "__main__":
+    main()
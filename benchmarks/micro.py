@@ -0,0 +1,187 @@
+"""Micro-benchmarks for the per-job hot paths, with stored baselines.
+
+Covers the HTML cleanup behind ``fetch_page_text``, ``_extract_jobs``,
+``JobPosting.from_dict``, ``create_job_embed`` and ``sanitize_team`` over the
+versioned corpus in ``benchmarks/corpus/``. Each case is timed like
+pytest-benchmark does (auto-ranged loops, several rounds, min and median per
+call) and compared against ``benchmarks/baselines/micro.json``.
+
+Timings are compared as ratios to a fixed pure-Python calibration workload
+timed in the same rounds, so a baseline recorded on a laptop stays meaningful
+on CI and CPU throttling mid-run does not read as a regression; pass
+``--absolute`` to compare raw numbers on the same machine.
+
+Run with ``python -m benchmarks.micro`` (compare, exit 1 on regression) or
+``python -m benchmarks.micro --save`` to record a new baseline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import timeit
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fakes import Corpus
+from bot.formatter import create_job_embed
+from bot.models import JobPosting
+from bot.openai_client import _extract_jobs
+from bot.scraping import _extract_text
+from bot.utils import sanitize_team
+
+BASELINE_PATH = Path(__file__).with_name("baselines") / "micro.json"
+MAX_SCRAPE_BYTES = 50_000
+TEAM_INPUTS = ["art", "Game Design", "programming", "Dev", "level design", "audio", "", "QA", "Tech Art", "producer"]
+
+
+@dataclass(slots=True)
+class Case:
+    name: str
+    func: Callable[[], Any]
+
+
+@dataclass(slots=True)
+class Timing:
+    min: float
+    median: float
+    # min divided by the calibration workload's min, timed in the same rounds.
+    relative: float
+
+
+def _cases(corpus: Corpus) -> List[Case]:
+    cases: List[Case] = []
+    for entry in corpus.entries:
+        if entry.kind == "page":
+            html = entry.source.read_text(encoding="utf-8")
+            url = f"https://bench.invalid/{entry.name}"
+            cases.append(Case(f"extract_text[{entry.name}]", lambda html=html, url=url: _extract_text(url, html, MAX_SCRAPE_BYTES)))
+    for entry in corpus.entries:
+        cases.append(Case(f"extract_jobs[{entry.name}]", lambda text=entry.output: _extract_jobs(text)))
+
+    payloads = [job for entry in corpus.entries for job in _extract_jobs(entry.output)]
+    postings = [JobPosting.from_dict(payload) for payload in payloads]
+    cases.append(Case("job_from_dict", lambda: [JobPosting.from_dict(payload) for payload in payloads]))
+    cases.append(Case("create_job_embed", lambda: [create_job_embed(posting) for posting in postings]))
+    cases.append(Case("sanitize_team", lambda: [sanitize_team(team) for team in TEAM_INPUTS]))
+    return cases
+
+
+def _calibration_workload() -> None:
+    # Fixed mix of dict/str/list work, roughly the shape of the code under test.
+    data = [{"title": f"role {index}", "skills": ["a", "b", str(index)]} for index in range(200)]
+    parsed = json.loads(json.dumps(data))
+    sorted(item["title"].upper() for item in parsed)
+
+
+def _loops(timer: timeit.Timer, min_time: float) -> int:
+    loops = 1
+    while timer.timeit(loops) < min_time:
+        loops *= 2
+    return loops
+
+
+def _time(func: Callable[[], Any], *, rounds: int, min_time: float) -> Timing:
+    # Calibration rounds are interleaved with the case's rounds so CPU frequency
+    # changes and noisy neighbours affect both sides of the ratio alike.
+    timer = timeit.Timer(func)
+    calibration = timeit.Timer(_calibration_workload)
+    loops = _loops(timer, min_time)
+    calibration_loops = _loops(calibration, min_time / 2)
+    samples: List[float] = []
+    calibration_samples: List[float] = []
+    for _ in range(rounds):
+        calibration_samples.append(calibration.timeit(calibration_loops) / calibration_loops)
+        samples.append(timer.timeit(loops) / loops)
+    best = min(samples)
+    return Timing(min=best, median=statistics.median(samples), relative=best / min(calibration_samples))
+
+
+def _load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _format_us(seconds: float) -> str:
+    return f"{seconds * 1e6:>10.1f}µs"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baseline.")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=0.30, help="Allowed slowdown before failing (0.30 = +30%%).")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.02, help="Seconds per round used to size the loop count.")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text.")
+    parser.add_argument("--absolute", action="store_true", help="Compare raw timings without calibration.")
+    args = parser.parse_args(argv)
+
+    # The code under test logs on every call; keep handler cost out of the numbers.
+    logging.disable(logging.CRITICAL)
+    corpus = Corpus.load()
+    results: Dict[str, Timing] = {}
+    for case in _cases(corpus):
+        if args.filter and args.filter not in case.name:
+            continue
+        results[case.name] = _time(case.func, rounds=args.rounds, min_time=args.min_time)
+
+    baseline = None if args.save else _load_baseline(args.baseline)
+    if baseline and baseline.get("corpus_version") != corpus.version:
+        print(
+            f"⚠️ Baseline was recorded on corpus v{baseline.get('corpus_version')}, corpus is v{corpus.version}; "
+            "re-record it with --save."
+        )
+        baseline = None
+
+    print(f"corpus v{corpus.version}  python {platform.python_version()}  {'absolute' if args.absolute else 'calibrated'}")
+    print(f"{'case':<40} {'min':>12} {'median':>12} {'baseline':>12} {'change':>8}")
+    regressions: List[str] = []
+    for name, timing in results.items():
+        line = f"{name:<40} {_format_us(timing.min)} {_format_us(timing.median)}"
+        previous = (baseline or {}).get("results", {}).get(name)
+        if previous:
+            if args.absolute:
+                expected, change = previous["min"], timing.min / previous["min"] - 1
+            else:
+                # Baseline ratio expressed in this machine's calibration units.
+                expected = previous["relative"] * timing.min / timing.relative
+                change = timing.relative / previous["relative"] - 1
+            flag = ""
+            if change > args.threshold:
+                regressions.append(name)
+                flag = "  ❌"
+            line += f" {_format_us(expected)} {change:>+7.0%}{flag}"
+        print(line)
+
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "corpus_version": corpus.version,
+            "python": platform.python_version(),
+            "results": {
+                name: {"min": timing.min, "median": timing.median, "relative": timing.relative}
+                for name, timing in results.items()
+            },
+        }
+        args.baseline.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+        print(f"💾 Saved baseline to {args.baseline}")
+        return 0
+    if baseline is None:
+        print("ℹ️ No baseline to compare against; run with --save to record one.")
+        return 0
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    print(f"✅ All cases within {args.threshold:.0%} of baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""Compare model endpoints on the labelled corpus: accuracy, latency, tokens, cost.
+
+Every corpus page and poster goes through ``OpenAIJobParser`` once per run for
+each endpoint. Extracted jobs are matched to ``benchmarks/corpus/labels.json``
+by title, then scored field by field. Tokens and estimated cost come from the
+parser's own usage accounting (:class:`bot.usage.UsageLedger`).
+
+Endpoints are ``NAME=MODEL[,base_url=URL][,image_model=MODEL]``. ``base_url``
+may point at any OpenAI-compatible server (a local model, a proxy); the
+special value ``fake[:LATENCY_MS]`` starts the offline stand-in that replays
+the corpus outputs, which is handy for checking the harness itself. Real
+endpoints read the key from ``OPENAI_API_KEY``.
+
+Run with ``python -m benchmarks.model_compare --endpoint mini=gpt-4o-mini --endpoint full=gpt-4o``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.fakes import Corpus, CorpusEntry, FakeOpenAI, percentile
+from bot.config import OpenAIConfig
+from bot.openai_client import OpenAIJobParser
+from bot.scraping import _extract_text
+from bot.usage import UsageLedger, set_usage_owner
+from bot.utils import sanitize_team, to_base64
+
+EXACT_FIELDS = ("company_name", "location", "work_model", "seniority", "contract_type", "team")
+FUZZY_FIELDS = ("job_title", "skills")
+# Below this title overlap an extracted job is not considered the labelled one.
+MATCH_THRESHOLD = 0.5
+MAX_SCRAPE_BYTES = 600_000
+
+_WORD = re.compile(r"\w+")
+
+
+@dataclass(slots=True)
+class Endpoint:
+    name: str
+    model: str
+    base_url: Optional[str] = None
+    image_model: Optional[str] = None
+    fake_latency: Optional[float] = None
+
+
+@dataclass(slots=True)
+class EndpointResult:
+    endpoint: Endpoint
+    latencies: List[float] = field(default_factory=list)
+    labelled: int = 0
+    extracted: int = 0
+    matched: int = 0
+    field_scores: Dict[str, List[float]] = field(default_factory=dict)
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+    def accuracy(self, name: Optional[str] = None) -> float:
+        scores = self.field_scores.get(name, []) if name else [s for values in self.field_scores.values() for s in values]
+        return sum(scores) / len(scores) if scores else 0.0
+
+
+def parse_endpoint(raw: str) -> Endpoint:
+    name, _, spec = raw.partition("=")
+    if not name or not spec:
+        raise argparse.ArgumentTypeError(f"Expected NAME=MODEL[,key=value...], got '{raw}'")
+    model, *options = spec.split(",")
+    endpoint = Endpoint(name=name.strip(), model=model.strip())
+    for option in options:
+        key, _, value = option.partition("=")
+        key, value = key.strip(), value.strip()
+        if key == "base_url" and value.startswith("fake"):
+            _, _, latency = value.partition(":")
+            endpoint.fake_latency = float(latency or 0) / 1000
+        elif key == "base_url":
+            endpoint.base_url = value
+        elif key == "image_model":
+            endpoint.image_model = value
+        else:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint option '{key}' in '{raw}'")
+    return endpoint
+
+
+def _words(value: Any) -> set[str]:
+    return {word.casefold() for word in _WORD.findall(str(value or ""))}
+
+
+def _overlap(expected: set[str], actual: set[str]) -> float:
+    """F1 of two token sets."""
+    if not expected and not actual:
+        return 1.0
+    common = len(expected & actual)
+    if not common:
+        return 0.0
+    precision, recall = common / len(actual), common / len(expected)
+    return 2 * precision * recall / (precision + recall)
+
+
+def _normalize(name: str, value: Any) -> str:
+    if name == "team":
+        return sanitize_team(str(value or ""))
+    return " ".join(sorted(_words(value)))
+
+
+def score_field(name: str, expected: Any, actual: Any) -> float:
+    if name == "job_title":
+        return _overlap(_words(expected), _words(actual))
+    if name == "skills":
+        expected_items = {str(item).casefold().strip() for item in expected or []}
+        actual_items = {str(item).casefold().strip() for item in actual or []} if isinstance(actual, list) else set()
+        return _overlap(expected_items, actual_items)
+    return 1.0 if _normalize(name, expected) == _normalize(name, actual) else 0.0
+
+
+def score_entry(labels: List[Dict[str, Any]], jobs: List[Dict[str, Any]], result: EndpointResult) -> None:
+    result.labelled += len(labels)
+    result.extracted += len(jobs)
+    remaining = list(jobs)
+    for label in labels:
+        best: Optional[Tuple[float, Dict[str, Any]]] = None
+        for job in remaining:
+            similarity = _overlap(_words(label.get("job_title")), _words(job.get("job_title")))
+            if similarity >= MATCH_THRESHOLD and (best is None or similarity > best[0]):
+                best = (similarity, job)
+        # Missed jobs score zero on every field so recall shows up in accuracy too.
+        job = best[1] if best else {}
+        if best:
+            result.matched += 1
+            remaining.remove(best[1])
+        for name in EXACT_FIELDS + FUZZY_FIELDS:
+            if name in label:
+                result.field_scores.setdefault(name, []).append(score_field(name, label[name], job.get(name)))
+
+
+async def _parse(parser: OpenAIJobParser, entry: CorpusEntry) -> List[Dict[str, Any]]:
+    url = f"https://corpus.invalid/{entry.source.parent.name}/{entry.source.name}"
+    if entry.kind == "image":
+        image_url = f"data:image/png;base64,{to_base64(entry.source.read_bytes())}"
+        return await parser.parse_from_image(image_url=image_url, url=url)
+    content = _extract_text(url, entry.source.read_text(encoding="utf-8"), MAX_SCRAPE_BYTES) or ""
+    return await parser.parse_from_text(content=content, url=url)
+
+
+async def run_endpoint(
+    endpoint: Endpoint,
+    owner_id: int,
+    corpus: Corpus,
+    labels: Dict[str, List[Dict[str, Any]]],
+    ledger: UsageLedger,
+    *,
+    runs: int,
+) -> EndpointResult:
+    result = EndpointResult(endpoint)
+    fake: Optional[FakeOpenAI] = None
+    base_url = endpoint.base_url
+    if endpoint.fake_latency is not None:
+        fake = FakeOpenAI(corpus, latency=endpoint.fake_latency)
+        base_url = f"{await fake.start()}/v1"
+    config = OpenAIConfig(
+        api_key=os.getenv("OPENAI_API_KEY") or "offline",
+        model=endpoint.model,
+        image_model=endpoint.image_model,
+        base_url=base_url,
+    )
+    parser = OpenAIJobParser(config, usage_ledger=ledger)
+    # Usage is attributed per endpoint through the ledger's guild column.
+    set_usage_owner(owner_id, None)
+    try:
+        for _ in range(runs):
+            for entry in corpus.entries:
+                started = time.perf_counter()
+                jobs = await _parse(parser, entry)
+                result.latencies.append(time.perf_counter() - started)
+                score_entry(labels.get(entry.name, []), jobs, result)
+    finally:
+        if fake is not None:
+            await fake.stop()
+    totals = await ledger.totals(guild_id=owner_id)
+    result.calls = totals.calls
+    result.input_tokens = totals.input_tokens
+    result.output_tokens = totals.output_tokens
+    result.cost_usd = totals.cost_usd
+    return result
+
+
+def _report(results: List[EndpointResult]) -> None:
+    header = f"{'endpoint':<14} {'model':<18} {'recall':>7} {'prec.':>7} {'fields':>7} {'p50':>8} {'p95':>8} {'in tok':>8} {'out tok':>8} {'$/100':>8}"
+    print(header)
+    for result in results:
+        sources = max(len(result.latencies), 1)
+        recall = result.matched / result.labelled if result.labelled else 0.0
+        precision = result.matched / result.extracted if result.extracted else 0.0
+        print(
+            f"{result.endpoint.name:<14} {result.endpoint.model:<18} {recall:>7.1%} {precision:>7.1%} "
+            f"{result.accuracy():>7.1%} {percentile(result.latencies, 0.5) * 1000:>6.0f}ms "
+            f"{percentile(result.latencies, 0.95) * 1000:>6.0f}ms {result.input_tokens / sources:>8.0f} "
+            f"{result.output_tokens / sources:>8.0f} {result.cost_usd / sources * 100:>8.4f}"
+        )
+    print("\nper-field accuracy")
+    names = EXACT_FIELDS + FUZZY_FIELDS
+    print(f"{'endpoint':<14} " + " ".join(f"{name[:12]:>12}" for name in names))
+    for result in results:
+        print(f"{result.endpoint.name:<14} " + " ".join(f"{result.accuracy(name):>12.1%}" for name in names))
+    print("\n(tokens are per source; $/100 is the estimated cost of 100 sources; unknown models cost 0)")
+
+
+def _as_json(results: List[EndpointResult]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "endpoint": result.endpoint.name,
+            "model": result.endpoint.model,
+            "sources": len(result.latencies),
+            "labelled": result.labelled,
+            "extracted": result.extracted,
+            "matched": result.matched,
+            "accuracy": result.accuracy(),
+            "fields": {name: result.accuracy(name) for name in result.field_scores},
+            "latency_p50": percentile(result.latencies, 0.5),
+            "latency_p95": percentile(result.latencies, 0.95),
+            "calls": result.calls,
+            "input_tokens": result.input_tokens,
+            "output_tokens": result.output_tokens,
+            "cost_usd": result.cost_usd,
+        }
+        for result in results
+    ]
+
+
+async def run(args: argparse.Namespace) -> None:
+    corpus = Corpus.load()
+    labels = corpus.labels()
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = UsageLedger(Path(tmp) / "usage.db")
+        await ledger.load()
+        try:
+            results = [
+                await run_endpoint(endpoint, index + 1, corpus, labels, ledger, runs=args.runs)
+                for index, endpoint in enumerate(args.endpoint)
+            ]
+        finally:
+            ledger.close()
+    print(f"corpus v{corpus.version}: {len(corpus.entries)} sources x {args.runs} run(s)\n")
+    _report(results)
+    if args.json:
+        args.json.write_text(json.dumps(_as_json(results), indent=2) + "\n", encoding="utf-8")
+        print(f"💾 Saved report to {args.json}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--endpoint",
+        type=parse_endpoint,
+        action="append",
+        required=True,
+        help="NAME=MODEL[,base_url=URL|fake[:LATENCY_MS]][,image_model=MODEL]; repeat to compare.",
+    )
+    parser.add_argument("--runs", type=int, default=1, help="Passes over the corpus per endpoint.")
+    parser.add_argument("--json", type=Path, help="Also write the results as JSON.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Replay a production capture (``CAPTURE_DIR``) through the current pipeline.
+
+Every captured request is fed to ``_collect_jobs`` + ``_post_jobs`` offline:
+redirects, page bodies and model outputs come from the archive, so the run is
+deterministic and as fast as the code allows. Only the bot's own work is
+timed, which makes the latency comparable across versions.
+
+The parsed jobs are compared with what production produced at capture time,
+or with an earlier replay saved via ``--save`` when ``--against`` is given.
+
+Run with ``python -m benchmarks.replay data/capture [--save run.jsonl] [--against old.jsonl]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import bot.client as client_module
+from benchmarks.fakes import TEAM_CHANNELS, FakeGuild, latency_summary
+from bot.capture import CapturedRequest, output_key, read_capture
+from bot.client import LaCommuDiscordBot
+from bot.config import BotConfig, ChannelConfig, OpenAIConfig
+from bot.history import PostHistory
+from bot.models import JobPosting
+from bot.openai_client import _extract_jobs
+from bot.retry import RetryManager
+from bot.scraping import _extract_text
+from bot.urls import anonymize_url
+
+# Fields that show up in the Discord embed; enough to notice a behaviour change.
+COMPARED_FIELDS = ("job_title", "company_name", "job_url", "team", "location", "work_model", "seniority")
+
+
+class ReplaySource:
+    """Serves the current captured request's redirects, pages and model outputs."""
+
+    def __init__(self) -> None:
+        self.current: Optional[CapturedRequest] = None
+        self.missing = 0
+
+    async def resolve(self, url: str) -> str:
+        assert self.current is not None
+        return self.current.redirects.get(anonymize_url(url), url)
+
+    async def fetch_page_text(self, url: str, *, timeout: float, max_bytes: int) -> Optional[str]:
+        assert self.current is not None
+        content = self.current.pages.get(anonymize_url(url))
+        if content is None:
+            self.missing += 1
+            return None
+        return _extract_text(url, content, max_bytes)
+
+    async def parse_from_text(self, *, content: str, url: str) -> List[Dict[str, Any]]:
+        return self._parse("text", url)
+
+    async def parse_from_image(self, *, image_url: str, url: str) -> List[Dict[str, Any]]:
+        return self._parse("image", url)
+
+    def _parse(self, kind: str, url: str) -> List[Dict[str, Any]]:
+        assert self.current is not None
+        text = self.current.outputs.get(output_key(kind, anonymize_url(url)))
+        if text is None:
+            self.missing += 1
+            return []
+        return _extract_jobs(text)
+
+
+def _normalize(jobs: List[Dict[str, Any]]) -> List[str]:
+    rows = []
+    for data in jobs:
+        job = JobPosting.from_dict(dict(data))
+        rows.append(json.dumps({name: getattr(job, name) for name in COMPARED_FIELDS}, sort_keys=True))
+    return sorted(rows)
+
+
+async def replay(directory: Path) -> List[Dict[str, Any]]:
+    source = ReplaySource()
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        config = BotConfig(
+            discord_token="replay",
+            openai=OpenAIConfig(api_key="replay"),
+            channels=ChannelConfig(team_channels=dict(TEAM_CHANNELS)),
+            near_duplicate_action="off",
+        )
+        retry_manager = RetryManager(Path(tmp) / "pending_requests.json")
+        post_history = PostHistory(Path(tmp) / "posted_jobs.log")
+        await post_history.load()
+        bot = LaCommuDiscordBot(config, source, retry_manager, post_history, redirect_resolver=source)  # type: ignore[arg-type]
+        guild = FakeGuild()
+        await bot._cache_team_channels(guild)  # noqa: SLF001
+        original_fetch = client_module.fetch_page_text
+        client_module.fetch_page_text = source.fetch_page_text
+        try:
+            for index, request in enumerate(read_capture(directory)):
+                source.current = request
+                started = time.perf_counter()
+                # Replays every source: the production history that skipped some is not captured.
+                jobs, issues = await bot._collect_jobs(reference=request.reference, force=True)  # noqa: SLF001
+                if request.command == "post":
+                    await bot._post_jobs(jobs, guild, force=True)  # type: ignore[arg-type]  # noqa: SLF001
+                results.append(
+                    {
+                        "index": index,
+                        "command": request.command,
+                        "reference": request.reference,
+                        "duration": time.perf_counter() - started,
+                        "captured_duration": request.duration,
+                        "jobs": _normalize(jobs),
+                        "captured_jobs": _normalize(request.jobs),
+                        "issues": issues,
+                    }
+                )
+        finally:
+            client_module.fetch_page_text = original_fetch
+            retry_manager.close()
+            await post_history.aclose()
+    if source.missing:
+        print(f"⚠️ {source.missing} source(s) had no captured page or model output")
+    return results
+
+
+def _report(results: List[Dict[str, Any]], against: Optional[List[Dict[str, Any]]], max_diffs: int) -> int:
+    durations = [item["duration"] for item in results]
+    p50, p95, p99 = latency_summary(durations)
+    print(f"replayed {len(results)} request(s) in {sum(durations):.2f}s")
+    print(f"  pipeline latency p50={p50 * 1000:.1f}ms p95={p95 * 1000:.1f}ms p99={p99 * 1000:.1f}ms")
+    if against is not None:
+        old = [item["duration"] for item in against]
+        o50, o95, _ = latency_summary(old)
+        print(f"  previous run     p50={o50 * 1000:.1f}ms p95={o95 * 1000:.1f}ms ({sum(old):.2f}s total)")
+        baseline = {item["index"]: item["jobs"] for item in against}
+        label = "previous run"
+    else:
+        baseline = {item["index"]: item["captured_jobs"] for item in results}
+        label = "capture"
+
+    changed = 0
+    for item in results:
+        expected = baseline.get(item["index"])
+        if expected is None or expected == item["jobs"]:
+            continue
+        changed += 1
+        if changed > max_diffs:
+            continue
+        print(f"\n#{item['index']} /jobbot {item['command']}: {item['reference'].splitlines()[0][:100]}")
+        for row in sorted(set(expected) - set(item["jobs"])):
+            print(f"  - {row}")
+        for row in sorted(set(item["jobs"]) - set(expected)):
+            print(f"  + {row}")
+    print(f"\n{changed} of {len(results)} request(s) produced different jobs than the {label}")
+    return changed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", type=Path, help="Capture directory (CAPTURE_DIR).")
+    parser.add_argument("--save", type=Path, help="Write this run's results as JSON lines.")
+    parser.add_argument("--against", type=Path, help="Compare with results saved by an earlier --save.")
+    parser.add_argument("--max-diffs", type=int, default=20, help="Diffs to print before only counting them.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    results = asyncio.run(replay(args.capture))
+    against = None
+    if args.against:
+        against = [json.loads(line) for line in args.against.read_text(encoding="utf-8").splitlines() if line]
+    _report(results, against, args.max_diffs)
+    if args.save:
+        args.save.write_text("".join(json.dumps(item) + "\n" for item in results), encoding="utf-8")
+        print(f"💾 Saved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
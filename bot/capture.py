@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .urls import anonymize_url
+from .utils import URL_REGEX, extract_image_urls, extract_urls, locked_file, run_blocking
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "requests.jsonl"
+BLOB_DIR = "blobs"
+
+_current_capture: ContextVar[Optional["CaptureRecord"]] = ContextVar("jobbot_capture", default=None)
+
+
+@dataclass(slots=True)
+class CaptureRecord:
+    """What one ``/jobbot`` request saw: sources, page bodies, model outputs, redirects.
+
+    URLs are stored anonymised (see :func:`bot.urls.anonymize_url`) and the
+    free text around links, guild and user are dropped.
+    """
+
+    command: str
+    force: bool
+    sources: List[Dict[str, str]]
+    captured_at: float = field(default_factory=time.time)
+    pages: Dict[str, str] = field(default_factory=dict)
+    outputs: Dict[str, str] = field(default_factory=dict)
+    redirects: Dict[str, str] = field(default_factory=dict)
+    jobs: List[Dict[str, Any]] = field(default_factory=list)
+    issues: List[str] = field(default_factory=list)
+    duration: float = 0.0
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+    _token: Optional[Token] = field(default=None, repr=False)
+
+
+def replay_reference(sources: List[Dict[str, str]]) -> str:
+    """A reference equivalent to the captured one, for replaying it."""
+    return "\n".join(f"image: {source['url']}" if source["kind"] == "image" else source["url"] for source in sources)
+
+
+def _scrub(text: str) -> str:
+    return URL_REGEX.sub(lambda match: anonymize_url(match.group(0)), text)
+
+
+def _scrub_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: _scrub(value) if isinstance(value, str) else value for key, value in job.items()}
+
+
+def output_key(kind: str, url: str) -> str:
+    return f"{kind} {url}"
+
+
+def capture_page(url: str, content: str) -> None:
+    record = _current_capture.get()
+    if record is not None:
+        record.pages[anonymize_url(url)] = content
+
+
+def capture_model_output(kind: str, url: str, text: str) -> None:
+    record = _current_capture.get()
+    if record is not None:
+        # The model tends to echo the source URL; keep tracking values out of the archive.
+        record.outputs[output_key(kind, anonymize_url(url))] = _scrub(text)
+
+
+def capture_redirect(url: str, target: str) -> None:
+    record = _current_capture.get()
+    if record is not None and url != target:
+        record.redirects[anonymize_url(url)] = anonymize_url(target)
+
+
+class TrafficCapture:
+    """Opt-in recorder of anonymised requests for offline replay.
+
+    Each finished request appends one JSON line to ``requests.jsonl``; page
+    bodies and model outputs are stored once, gzipped and content-addressed,
+    under ``blobs/``. Capture pauses once the archive reaches ``max_bytes``.
+    Replay with ``python -m benchmarks.replay <directory>``.
+    """
+
+    def __init__(self, directory: Path, *, max_bytes: int = 500_000_000, sample_rate: float = 1.0) -> None:
+        self.directory = directory
+        self._max_bytes = max_bytes
+        self._sample_rate = sample_rate
+        # Writes run in executor threads, possibly several at once.
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self._full = False
+        self.captured = 0
+
+    def begin(self, *, command: str, reference: str, force: bool) -> Optional[CaptureRecord]:
+        """Start capturing the current task's request; ``None`` when sampled out or full."""
+        if self._full or random.random() >= self._sample_rate:
+            return None
+        text = reference.strip()
+        image_urls = extract_image_urls(text)
+        sources = [{"kind": "page", "url": anonymize_url(url)} for url in extract_urls(text) if url not in image_urls]
+        sources += [{"kind": "image", "url": anonymize_url(url)} for url in image_urls]
+        record = CaptureRecord(command=command, force=force, sources=sources)
+        record._token = _current_capture.set(record)
+        return record
+
+    async def finish(
+        self,
+        record: Optional[CaptureRecord],
+        *,
+        jobs: List[Dict[str, Any]],
+        issues: List[str],
+    ) -> None:
+        if record is None:
+            return
+        record.duration = time.perf_counter() - record._started
+        record.jobs = [_scrub_job(job) for job in jobs]
+        record.issues = [_scrub(issue) for issue in issues]
+        if record._token is not None:
+            try:
+                _current_capture.reset(record._token)
+            except ValueError:
+                pass
+            record._token = None
+        try:
+            await run_blocking(self._write, record)
+        except OSError as exc:
+            logger.warning("⚠️ Could not write capture to %s: %s", self.directory, exc)
+
+    def _write(self, record: CaptureRecord) -> None:
+        with self._lock:
+            if self._size is None:
+                self._size = sum(path.stat().st_size for path in self.directory.rglob("*") if path.is_file())
+        pages = {url: self._put_blob(content) for url, content in record.pages.items()}
+        outputs = {key: self._put_blob(text) for key, text in record.outputs.items()}
+        line = json.dumps(
+            {
+                "command": record.command,
+                "force": record.force,
+                "captured_at": round(record.captured_at, 3),
+                "duration": round(record.duration, 4),
+                "sources": record.sources,
+                "redirects": record.redirects,
+                "pages": pages,
+                "outputs": outputs,
+                "jobs": record.jobs,
+                "issues": record.issues,
+            },
+            ensure_ascii=False,
+            default=str,
+        )
+        with locked_file(self.directory / INDEX_NAME, "a") as handle:
+            handle.write(line + "\n")
+        with self._lock:
+            self._size += len(line) + 1
+            self.captured += 1
+            if self._size >= self._max_bytes and not self._full:
+                self._full = True
+                logger.warning("📼 Capture archive %s reached %d bytes; capture paused", self.directory, self._size)
+
+    def _put_blob(self, content: str) -> str:
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.directory / BLOB_DIR / digest[:2] / f"{digest}.gz"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            compressed = gzip.compress(data, mtime=0)
+            # Unique per process and thread: shard processes and concurrent writes may store the same blob.
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(compressed)
+            tmp_path.replace(path)
+            with self._lock:
+                assert self._size is not None
+                self._size += len(compressed)
+        return digest
+
+
+@dataclass(slots=True)
+class CapturedRequest:
+    command: str
+    force: bool
+    reference: str
+    duration: float
+    redirects: Dict[str, str]
+    pages: Dict[str, str]
+    outputs: Dict[str, str]
+    jobs: List[Dict[str, Any]]
+    issues: List[str]
+
+
+def read_capture(directory: Path) -> Iterator[CapturedRequest]:
+    """Yield the captured requests in ``directory`` with their blobs loaded."""
+
+    def blob(digest: str) -> str:
+        path = directory / BLOB_DIR / digest[:2] / f"{digest}.gz"
+        return gzip.decompress(path.read_bytes()).decode("utf-8")
+
+    with (directory / INDEX_NAME).open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("⚠️ Ignoring truncated capture record")
+                continue
+            yield CapturedRequest(
+                command=item.get("command", "post"),
+                force=bool(item.get("force")),
+                reference=replay_reference(item.get("sources", [])),
+                duration=float(item.get("duration", 0.0)),
+                redirects=item.get("redirects", {}),
+                pages={url: blob(digest) for url, digest in item.get("pages", {}).items()},
+                outputs={key: blob(digest) for key, digest in item.get("outputs", {}).items()},
+                jobs=item.get("jobs", []),
+                issues=item.get("issues", []),
+            )
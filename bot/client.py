@@ -1,43 +1,136 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Dict, List, Optional
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from .capture import CaptureRecord, TrafficCapture, capture_redirect
 from .config import BotConfig
 from .formatter import create_job_embed, create_error_embed
 from .models import JobPosting
 from .history import PostHistory
+from .metrics import CACHE_REQUESTS, DISCORD_SEND_SECONDS, DUPLICATES_SKIPPED, JOBS_POSTED
 from .openai_client import OpenAIJobParser
+from .preview_cache import PreviewCache
 from .retry import PendingRequest, RetryManager
-from .scraping import fetch_page_text
+from .scraping import fetch_page_text, preload_dependencies
+from .similarity import SimilarityIndex
+from .startup import startup_timer
+from .tracing import render_waterfall, start_span, start_trace, traced, tracer
+from .urls import RedirectResolver, dedupe_key
+from .usage import UsageLedger, next_utc_midnight, set_usage_owner
 from .utils import extract_image_urls, extract_urls, sanitize_team
+from .warmup import Warmup
 
 logger = logging.getLogger(__name__)
 
+# Warm-up steps that must finish before a command reads history, budgets or fingerprints.
+STORAGE_WARMUP = ("history", "usage", "similarity")
 
-class LaCommuDiscordBot(commands.Bot):
+
+class PostPreviewView(discord.ui.View):
+    """"Post these" button under a preview; posts the cached jobs without re-parsing."""
+
+    def __init__(self, bot: "LaCommuDiscordBot", *, reference: str, force: bool, timeout: float) -> None:
+        super().__init__(timeout=timeout)
+        self.bot = bot
+        self.reference = reference
+        self.force = force
+
+    @discord.ui.button(label="Post these", emoji="📬", style=discord.ButtonStyle.success)
+    async def post_these(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:
+        guild = interaction.guild
+        if guild is None:
+            await interaction.response.send_message(
+                "Run this command inside a Discord server.",
+                ephemeral=True,
+            )
+            return
+        if self.bot._draining:
+            await interaction.response.send_message(
+                "🔄 The bot is restarting; run `/jobbot post` again in a minute.",
+                ephemeral=True,
+            )
+            return
+        self.bot._track_inflight()
+        button.disabled = True
+        self.stop()
+        try:
+            await interaction.response.edit_message(view=self)
+        except discord.NotFound:
+            logger.warning("⚠️ Interaction expired before the preview could be posted")
+            return
+        await self.bot._handle_post(interaction, guild, reference=self.reference, force=self.force)
+
+
+class LaCommuDiscordBot(commands.AutoShardedBot):
     def __init__(
         self,
         config: BotConfig,
         parser: OpenAIJobParser,
         retry_manager: RetryManager,
         post_history: PostHistory,
+        *,
+        shard_ids: Optional[Sequence[int]] = None,
+        redirect_resolver: Optional[RedirectResolver] = None,
+        similarity_index: Optional[SimilarityIndex] = None,
+        usage_ledger: Optional[UsageLedger] = None,
+        traffic_capture: Optional[TrafficCapture] = None,
+        command_sync_path: Optional[Path] = None,
     ) -> None:
         intents = discord.Intents.default()
         intents.message_content = True
         intents.messages = True
         intents.guilds = True
-        super().__init__(command_prefix=commands.when_mentioned, intents=intents)
+        super().__init__(
+            command_prefix=commands.when_mentioned,
+            intents=intents,
+            shard_count=config.shard_count,
+            shard_ids=list(shard_ids) if shard_ids is not None else None,
+        )
         self.config = config
         self.parser = parser
         self.retry_manager = retry_manager
         self.post_history = post_history
+        self.redirect_resolver = redirect_resolver or RedirectResolver(timeout=config.request_timeout)
+        if similarity_index is None and config.near_duplicate_action != "off":
+            similarity_index = SimilarityIndex(
+                max_distance=config.near_duplicate_distance,
+                window=config.near_duplicate_window_days * 86400,
+            )
+        self.similarity_index = similarity_index
+        self.usage_ledger = usage_ledger
+        self.traffic_capture = traffic_capture
+        self.command_sync_path = command_sync_path
+        self.warmup = Warmup()
+        self.preview_cache = (
+            PreviewCache(
+                ttl=config.preview_cache_ttl,
+                max_entries=config.preview_cache_max_entries,
+                max_bytes=config.preview_cache_max_bytes,
+            )
+            if config.preview_cache_ttl > 0
+            else None
+        )
         self.team_channels: Dict[str, int] = {}
+        self._retry_scheduler: Optional[asyncio.Task[None]] = None
+        self._retry_tasks: Set[asyncio.Task[None]] = set()
+        # Command invocations still running; waited for (then cancelled) by drain().
+        self._inflight: Set[asyncio.Task[Any]] = set()
+        self._draining = False
+        # Moving average of fetch + parse time per source, used to report dedupe savings.
+        self._source_seconds_avg = 0.0
+        self._dedupe_saved_calls = 0
+        self._dedupe_saved_seconds = 0.0
         self._register_app_commands()
         self._ready_logged = False
 
@@ -74,17 +167,101 @@ class LaCommuDiscordBot(commands.Bot):
             cached_count = sum(
                 1 for key in self.team_channels if key.startswith(f"{guild.id}:")
             )
-            embed.set_footer(text=f"Cached routes: {cached_count}")
+            footer = f"Cached routes: {cached_count}"
+            if self.shard_count and self.shard_count > 1:
+                footer += f" · Shard {guild.shard_id}/{self.shard_count}"
+            embed.set_footer(text=footer)
+            embed.add_field(
+                name="Duplicate links skipped before fetch",
+                value=(
+                    f"{self._dedupe_saved_calls} LLM call(s) saved "
+                    f"(~{self._dedupe_saved_seconds:.0f}s)"
+                ),
+                inline=False,
+            )
+            if self.usage_ledger is not None:
+                usage = await self.usage_ledger.summary(guild.id)
+                usage_lines = [
+                    f"{usage.guild.calls} call(s) · {usage.guild.input_tokens:,} in / "
+                    f"{usage.guild.output_tokens:,} out tokens (~{usage.guild.image_tokens:,} from images) · "
+                    f"~${usage.guild.cost_usd:.2f}"
+                ]
+                if self.usage_ledger.guild_daily_tokens:
+                    usage_lines.append(
+                        f"Budget: {usage.guild.tokens:,}/{self.usage_ledger.guild_daily_tokens:,} tokens"
+                    )
+                usage_lines.extend(
+                    f"<@{user_id}>: {totals.tokens:,} tokens, {totals.calls} call(s)"
+                    for user_id, totals in usage.top_users
+                    if user_id
+                )
+                embed.add_field(
+                    name=f"OpenAI usage today ({usage.day} UTC)",
+                    value="\n".join(usage_lines),
+                    inline=False,
+                )
+            retry_stats = await self.retry_manager.stats()
+            embed.add_field(
+                name="Retry queue",
+                value=(
+                    f"Backlog: {retry_stats.backlog} · Due: {retry_stats.due} · "
+                    f"In flight: {retry_stats.in_flight} · Exhausted: {retry_stats.exhausted}\n"
+                    f"Lag: {retry_stats.lag_seconds:.0f}s"
+                ),
+                inline=False,
+            )
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
+        @jobbot_group.command(name="trace", description="Show where the time went in a recent request")
+        @app_commands.describe(
+            request="Interaction ID of a /jobbot post or preview (default: the latest one in this server)",
+        )
+        @app_commands.guild_only()
+        @app_commands.default_permissions(manage_guild=True)
+        async def jobbot_trace(interaction: discord.Interaction, request: Optional[str] = None) -> None:
+            guild = interaction.guild
+            if not guild:
+                await interaction.response.send_message(
+                    "Run this command inside a Discord server.",
+                    ephemeral=True,
+                )
+                return
+
+            # Root spans carry the guild so servers only see their own requests.
+            traces = [tracer.get_trace(request.strip())] if request else tracer.recent_traces()
+            spans = next(
+                (
+                    trace
+                    for trace in traces
+                    if any(span.attributes.get("guild_id") == guild.id for span in trace)
+                ),
+                [],
+            )
+            if not spans:
+                await interaction.response.send_message(
+                    "No recent trace found for that request.",
+                    ephemeral=True,
+                )
+                return
+
+            waterfall = render_waterfall(spans)
+            if len(waterfall) > 1900:
+                waterfall = waterfall[:1897] + "…"
+            await interaction.response.send_message(
+                f"Trace `{spans[0].trace_id}`\n```\n{waterfall}\n```",
+                ephemeral=True,
+            )
+
         @jobbot_group.command(name="post", description="Parse and distribute job offers")
         @app_commands.describe(
             reference="Paste the job URL or text containing job links (use 'image: https://...' for posters)",
+            force="Repost even if these links or jobs were already shared",
         )
         @app_commands.guild_only()
         async def jobbot_post(
             interaction: discord.Interaction,
             reference: str,
+            force: bool = False,
         ) -> None:
             guild = interaction.guild
             if not guild:
@@ -93,87 +270,22 @@ class LaCommuDiscordBot(commands.Bot):
                     ephemeral=True,
                 )
                 return
-
-            try:
-                await interaction.response.defer(thinking=True, ephemeral=True)
-            except discord.NotFound:
-                logger.warning("⚠️ Interaction expired before defer in jobbot_post")
+            if self._draining:
+                await self._queue_while_draining(interaction, guild, reference=reference, force=force)
                 return
-            await self.retry_manager.start_request(
-                request_id=interaction.id,
-                guild_id=guild.id,
-                user_id=interaction.user.id,
-                reference=reference,
-            )
-            request_summary = reference.strip().splitlines()[0][:200]
-            logger.info(
-                "🎯 jobbot post by %s (interaction %s): %s",
-                interaction.user,
-                interaction.id,
-                request_summary,
-            )
-            try:
-                jobs_data, issues = await self._collect_jobs(
-                    reference=reference,
-                )
-
-                if not jobs_data:
-                    if issues:
-                        logger.warning("📝 Job parsing produced no results: %s", " | ".join(issues))
-                    embed = create_error_embed(
-                        title="Post failed",
-                        description="No job listings were detected.",
-                        details="\n".join(issues) if issues else "Inspect the provided reference and try again.",
-                    )
-                    await self._safe_followup(interaction, embed=embed, ephemeral=True)
-                    await self.retry_manager.complete_request(interaction.id)
-                    return
-
-                posted_jobs, dispatch_issues = await self._post_jobs(jobs_data, guild)
-                issues.extend(dispatch_issues)
-                logger.info(
-                    "📚 jobbot post result interaction %s: posted=%d issues=%d",
-                    interaction.id,
-                    len(posted_jobs),
-                    len(issues),
-                )
-
-                if posted_jobs:
-                    lines = [
-                        f"• {job.job_title} @ {job.company_name} → {channel.mention}"
-                        for job, channel in posted_jobs
-                    ]
-                    description = "\n".join(lines)
-                else:
-                    description = "No jobs were posted because of routing errors."
-
-                embed = discord.Embed(
-                    title="📬 Job posting summary",
-                    description=description,
-                    color=discord.Color.green() if posted_jobs else discord.Color.orange(),
-                )
-                embed.add_field(name="Jobs Posted", value=str(len(posted_jobs)), inline=True)
-                if issues:
-                    embed.add_field(
-                        name="Notes",
-                        value="\n".join(issues)[:1000],
-                        inline=False,
-                    )
-
-                await self._safe_followup(interaction, embed=embed, ephemeral=True)
-                await self.retry_manager.complete_request(interaction.id)
-            except Exception as exc:  # noqa: BLE001
-                await self.retry_manager.fail_request(interaction.id, repr(exc))
-                raise
+            self._track_inflight()
+            await self._handle_post(interaction, guild, reference=reference, force=force)
 
         @jobbot_group.command(name="preview", description="Preview channel routing for a job reference")
         @app_commands.describe(
             reference="Paste the job URL or text containing job links (use 'image: https://...' for posters)",
+            force="Parse links even if they were already shared",
         )
         @app_commands.guild_only()
         async def jobbot_preview(
             interaction: discord.Interaction,
             reference: str,
+            force: bool = False,
         ) -> None:
             guild = interaction.guild
             if not guild:
@@ -182,12 +294,30 @@ class LaCommuDiscordBot(commands.Bot):
                     ephemeral=True,
                 )
                 return
+            if self._draining:
+                await interaction.response.send_message(
+                    "🔄 The bot is restarting; run the preview again in a minute.",
+                    ephemeral=True,
+                )
+                return
+            self._track_inflight()
 
             try:
                 await interaction.response.defer(thinking=True, ephemeral=True)
             except discord.NotFound:
                 logger.warning("⚠️ Interaction expired before defer in jobbot_preview")
                 return
+            await self.warmup.wait(*STORAGE_WARMUP)
+            set_usage_owner(guild.id, interaction.user.id)
+            over_budget = await self._budget_exceeded(guild.id, interaction.user.id)
+            if over_budget:
+                embed = create_error_embed(
+                    title="Daily budget reached",
+                    description=f"Not parsing this preview: {over_budget}.",
+                    details="Budgets reset at 00:00 UTC.",
+                )
+                await self._safe_followup(interaction, embed=embed, ephemeral=True)
+                return
             request_summary = reference.strip().splitlines()[0][:200]
             logger.info(
                 "🎯 jobbot preview by %s (interaction %s): %s",
@@ -195,9 +325,14 @@ class LaCommuDiscordBot(commands.Bot):
                 interaction.id,
                 request_summary,
             )
-            jobs_data, issues = await self._collect_jobs(
-                reference=reference,
-            )
+            with start_trace(interaction.id, "jobbot.preview", guild_id=guild.id, force=force):
+                capture = self._begin_capture("preview", reference, force)
+                jobs_data, issues = await self._collect_jobs(
+                    reference=reference,
+                    force=force,
+                )
+                if capture is not None:
+                    await self.traffic_capture.finish(capture, jobs=jobs_data, issues=issues)
 
             if not jobs_data:
                 if issues:
@@ -241,18 +376,323 @@ class LaCommuDiscordBot(commands.Bot):
                 len(jobs_data),
                 len(issues),
             )
-            await self._safe_followup(interaction, embed=embed, ephemeral=True)
+            view = None
+            if self.preview_cache is not None and self.preview_cache.put(guild.id, reference, force, jobs_data, issues):
+                minutes = max(round(self.config.preview_cache_ttl / 60), 1)
+                embed.set_footer(
+                    text=f"Post these (or /jobbot post the same links) within {minutes} min to skip re-parsing."
+                )
+                view = PostPreviewView(self, reference=reference, force=force, timeout=self.config.preview_cache_ttl)
+            await self._safe_followup(interaction, embed=embed, ephemeral=True, view=view)
 
         self.tree.add_command(jobbot_group)
 
+    async def _handle_post(
+        self,
+        interaction: discord.Interaction,
+        guild: discord.Guild,
+        *,
+        reference: str,
+        force: bool,
+    ) -> None:
+        # The "Post these" button has already answered its interaction.
+        if not interaction.response.is_done():
+            try:
+                await interaction.response.defer(thinking=True, ephemeral=True)
+            except discord.NotFound:
+                logger.warning("⚠️ Interaction expired before defer in jobbot_post")
+                return
+        try:
+            await self.warmup.wait(*STORAGE_WARMUP)
+            set_usage_owner(guild.id, interaction.user.id)
+            cached = self.preview_cache.take(guild.id, reference, force) if self.preview_cache is not None else None
+            # Reusing a preview costs no OpenAI tokens, so budgets don't apply.
+            over_budget = None if cached is not None else await self._budget_exceeded(guild.id, interaction.user.id)
+            if over_budget and self.config.usage_budget_action == "reject":
+                embed = create_error_embed(
+                    title="Daily budget reached",
+                    description=f"Not parsing this request: {over_budget}.",
+                    details="Budgets reset at 00:00 UTC.",
+                )
+                await self._safe_followup(interaction, embed=embed, ephemeral=True)
+                return
+            await self.retry_manager.start_request(
+                request_id=interaction.id,
+                guild_id=guild.id,
+                user_id=interaction.user.id,
+                reference=reference,
+                force=force,
+            )
+        except asyncio.CancelledError:
+            # Shutdown deadline reached before the request was stored: queue it for the next process.
+            await self._queue_while_draining(interaction, guild, reference=reference, force=force)
+            raise
+        if over_budget:
+            await self.retry_manager.defer_request(
+                interaction.id,
+                until=next_utc_midnight(),
+                reason=f"Daily budget reached: {over_budget}",
+            )
+            embed = discord.Embed(
+                title="⏳ Request queued",
+                description=(
+                    f"Daily OpenAI budget reached ({over_budget}). "
+                    "This request will run automatically after 00:00 UTC."
+                ),
+                color=discord.Color.orange(),
+            )
+            await self._safe_followup(interaction, embed=embed, ephemeral=True)
+            return
+        request_summary = reference.strip().splitlines()[0][:200]
+        logger.info(
+            "🎯 jobbot post by %s (interaction %s): %s",
+            interaction.user,
+            interaction.id,
+            request_summary,
+        )
+        trace = start_trace(interaction.id, "jobbot.post", guild_id=guild.id, force=force)
+        try:
+            if cached is not None:
+                jobs_data, issues = cached
+                start_span("preview_cache", jobs=len(jobs_data), outcome="hit").end()
+                logger.info("♻️ Reusing %d job(s) parsed by an earlier preview", len(jobs_data))
+                await self._checkpoint_cached_jobs(interaction.id, jobs_data)
+            else:
+                capture = self._begin_capture("post", reference, force)
+                jobs_data, issues = await self._collect_jobs(
+                    reference=reference,
+                    request_id=interaction.id,
+                    force=force,
+                )
+                if capture is not None:
+                    await self.traffic_capture.finish(capture, jobs=jobs_data, issues=issues)
+
+            if not jobs_data:
+                if issues:
+                    logger.warning("📝 Job parsing produced no results: %s", " | ".join(issues))
+                embed = create_error_embed(
+                    title="Post failed",
+                    description="No job listings were detected.",
+                    details="\n".join(issues) if issues else "Inspect the provided reference and try again.",
+                )
+                await self._safe_followup(interaction, embed=embed, ephemeral=True)
+                await self.retry_manager.complete_request(interaction.id)
+                return
+
+            posted_jobs, dispatch_issues = await self._post_jobs(
+                jobs_data,
+                guild,
+                request_id=interaction.id,
+                force=force,
+            )
+            issues.extend(dispatch_issues)
+            logger.info(
+                "📚 jobbot post result interaction %s: posted=%d issues=%d",
+                interaction.id,
+                len(posted_jobs),
+                len(issues),
+            )
+
+            if posted_jobs:
+                lines = [
+                    f"• {job.job_title} @ {job.company_name} → {channel.mention}"
+                    for job, channel in posted_jobs
+                ]
+                description = "\n".join(lines)
+            else:
+                description = "No jobs were posted because of routing errors."
+
+            embed = discord.Embed(
+                title="📬 Job posting summary",
+                description=description,
+                color=discord.Color.green() if posted_jobs else discord.Color.orange(),
+            )
+            embed.add_field(name="Jobs Posted", value=str(len(posted_jobs)), inline=True)
+            if issues:
+                embed.add_field(
+                    name="Notes",
+                    value="\n".join(issues)[:1000],
+                    inline=False,
+                )
+
+            embed.set_footer(text=f"Timings: /jobbot trace request:{interaction.id}")
+            await self._safe_followup(interaction, embed=embed, ephemeral=True)
+            await self.retry_manager.complete_request(interaction.id)
+        except asyncio.CancelledError:
+            # Shutdown deadline reached: stages done so far are checkpointed, resume after restart.
+            await self.retry_manager.defer_request(
+                interaction.id,
+                until=time.time(),
+                reason="Interrupted by shutdown",
+            )
+            embed = discord.Embed(
+                title="🔄 Bot restarting",
+                description="This request was saved and will finish automatically once the bot is back.",
+                color=discord.Color.orange(),
+            )
+            await self._safe_followup(interaction, embed=embed, ephemeral=True)
+            raise
+        except Exception as exc:  # noqa: BLE001
+            trace.end(exc)
+            await self.retry_manager.fail_request(interaction.id, repr(exc))
+            raise
+        finally:
+            trace.end()
+
+    async def _checkpoint_cached_jobs(self, request_id: int, jobs_data: List[Dict[str, object]]) -> None:
+        # Same checkpoints _collect_jobs would have written, so a retry doesn't re-parse.
+        by_source: Dict[str, List[Dict[str, object]]] = {}
+        for data in jobs_data:
+            by_source.setdefault(str(data.get("source_url") or ""), []).append(data)
+        for url, jobs in by_source.items():
+            if url:
+                await self.retry_manager.record_source(request_id, url, jobs=jobs)
+
     async def setup_hook(self) -> None:
+        startup_timer.mark("login")
+        self._start_warmup()
+        await self._sync_commands()
+        startup_timer.mark("command sync")
+        self._retry_scheduler = asyncio.create_task(self._run_retry_scheduler())
+
+    def _start_warmup(self) -> None:
+        """Load storage and prime caches in the background instead of before login."""
+        self.warmup.start("history", self.post_history.load())
+        if self.usage_ledger is not None:
+            self.warmup.start("usage", self.usage_ledger.load())
+        if self.similarity_index is not None:
+            self.warmup.start("similarity", self.similarity_index.load())
+        self.warmup.start("redirects", self.redirect_resolver.load())
+        self.warmup.start("http", self._warm_http())
+        self.warmup.start("channels", self._warm_team_channels())
+
+    async def _warm_http(self) -> None:
+        parser_warm_up = getattr(self.parser, "warm_up", None)
+        if parser_warm_up is not None:
+            await parser_warm_up()
+        await preload_dependencies()
+
+    async def _warm_team_channels(self) -> None:
+        # Guilds are only known once the gateway has sent READY.
+        await self.wait_until_ready()
         await self._cache_team_channels()
+
+    async def close(self) -> None:
+        await self._stop_retry_scheduler()
+        await self.warmup.cancel()
+        await super().close()
+
+    async def _stop_retry_scheduler(self) -> None:
+        # Safe to cancel at any await: claiming due requests and starting their tasks happen atomically.
+        task, self._retry_scheduler = self._retry_scheduler, None
+        if task is None:
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    def _track_inflight(self) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _queue_while_draining(
+        self,
+        interaction: discord.Interaction,
+        guild: discord.Guild,
+        *,
+        reference: str,
+        force: bool,
+    ) -> None:
+        # Persisted like any pending request, so the next process picks it up.
+        await self.retry_manager.start_request(
+            request_id=interaction.id,
+            guild_id=guild.id,
+            user_id=interaction.user.id,
+            reference=reference,
+            force=force,
+        )
+        await self.retry_manager.defer_request(
+            interaction.id,
+            until=time.time(),
+            reason="Received during shutdown",
+        )
+        notice = "🔄 The bot is restarting; this request was queued and will be posted once it is back."
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(notice, ephemeral=True)
+            else:
+                await interaction.response.send_message(notice, ephemeral=True)
+        except discord.NotFound:
+            logger.warning("⚠️ Interaction expired before the restart notice could be sent")
+
+    async def drain(self, timeout: float) -> None:
+        """Stop taking new work and give in-flight requests ``timeout`` seconds to finish.
+
+        Requests still running after the deadline are cancelled; ``/jobbot post``
+        and retries hand themselves back to the retry queue with their stage
+        checkpoints, so the next process resumes them instead of starting over.
+        """
+        if self._draining:
+            return
+        self._draining = True
+        # Stop the scheduler first so it can't start retries after the snapshot below.
+        await self._stop_retry_scheduler()
+        tasks = self._inflight | self._retry_tasks
+        logger.info("🛬 Draining %d in-flight request(s) (deadline %.0fs)", len(tasks), timeout)
+        if not tasks:
+            return
+        started = time.perf_counter()
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        if pending:
+            logger.warning(
+                "⏱️ %d request(s) still running after %.0fs; checkpointing them for retry",
+                len(pending),
+                timeout,
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        logger.info("🛬 Drained in %.1fs", time.perf_counter() - started)
+
+    def _command_tree_hash(self) -> str:
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands()]
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    async def _sync_commands(self) -> None:
+        """Sync the global command tree, unless it matches what was last synced."""
+        state = {"application_id": self.application_id, "hash": self._command_tree_hash()}
+        path = self.command_sync_path
+        if path is not None:
+            try:
+                if json.loads(path.read_text(encoding="utf-8")) == state:
+                    logger.info("🌳 Command tree unchanged since last sync; skipping")
+                    return
+            except (OSError, ValueError):
+                pass
         await self.tree.sync()
-        asyncio.create_task(self._resume_pending_requests())
+        logger.info("🌳 Synced command tree (%s)", state["hash"][:12])
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Shard processes may sync concurrently; each writes its own temp file.
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(state), encoding="utf-8")
+                tmp_path.replace(path)
+            except OSError as exc:
+                logger.warning("⚠️ Could not record command tree hash in %s: %s", path, exc)
 
     async def on_ready(self) -> None:
         if not self._ready_logged:
-            logger.info("🚀 Logged in as %s (ID: %s)", self.user, self.user and self.user.id)
+            startup_timer.mark("gateway ready")
+            startup_timer.log_once()
+            logger.info(
+                "🚀 Logged in as %s (ID: %s) on shard(s) %s of %s",
+                self.user,
+                self.user and self.user.id,
+                self.shard_ids if self.shard_ids is not None else "all",
+                self.shard_count,
+            )
             self._ready_logged = True
         else:
             logger.debug("🔁 Session resumed as %s (ID: %s)", self.user, self.user and self.user.id)
@@ -262,22 +702,43 @@ class LaCommuDiscordBot(commands.Bot):
             return
         await self.process_commands(message)
 
+    @traced("post_jobs")
     async def _post_jobs(
         self,
         jobs_data: List[Dict[str, object]],
         guild: discord.Guild,
+        *,
+        request_id: Optional[int] = None,
+        posted_keys: Sequence[str] = (),
+        force: bool = False,
     ) -> tuple[List[tuple[JobPosting, discord.TextChannel]], List[str]]:
         posted_jobs: List[tuple[JobPosting, discord.TextChannel]] = []
         issues: List[str] = []
+        # Source URL -> whether every job parsed from it is now shared, and their job URLs.
+        source_done: Dict[str, bool] = {}
+        source_job_urls: Dict[str, List[str]] = {}
 
         for data in jobs_data:
             origin = data.get("job_url") or data.get("source_url") or ""
             data.setdefault("job_url", origin)
             data.setdefault("source_url", origin)
+            source_url = str(data.get("source_url") or "")
+            source_done.setdefault(source_url, True)
             job = JobPosting.from_dict(data)
+            source_job_urls.setdefault(source_url, []).append(job.job_url)
             team_key = sanitize_team(job.team)
+            history_key = self.post_history.key_for(job)
 
-            if await self.post_history.is_posted(job):
+            if history_key and history_key in posted_keys:
+                logger.info(
+                    "♻️ '%s' was already posted by an earlier attempt of request %s",
+                    job.job_title,
+                    request_id,
+                )
+                continue
+
+            if not force and await self.post_history.is_posted(job):
+                DUPLICATES_SKIPPED.inc(reason="history")
                 issues.append(
                     f"Skipped duplicate `{job.job_title}` ({origin or 'unknown origin'})."
                 )
@@ -289,8 +750,37 @@ class LaCommuDiscordBot(commands.Bot):
                 )
                 continue
 
+            if not force and self.similarity_index is not None:
+                match = await self.similarity_index.find(job)
+                if match:
+                    if self.config.near_duplicate_action == "skip":
+                        DUPLICATES_SKIPPED.inc(reason="near_duplicate")
+                        issues.append(
+                            f"Skipped likely repost `{job.job_title}` ({origin or 'unknown origin'}), "
+                            f"similar to {match.label}."
+                        )
+                        logger.info(
+                            "🧬 Near-duplicate job ignored: '%s' matches '%s' (distance %d) guild=%s",
+                            job.job_title,
+                            match.label,
+                            match.distance,
+                            guild.id,
+                        )
+                        continue
+                    issues.append(
+                        f"`{job.job_title}` looks like a repost of {match.label}; posted anyway."
+                    )
+                    logger.info(
+                        "🧬 Near-duplicate job flagged: '%s' matches '%s' (distance %d) guild=%s",
+                        job.job_title,
+                        match.label,
+                        match.distance,
+                        guild.id,
+                    )
+
             channel = await self._resolve_team_channel(guild, team_key)
             if not channel:
+                source_done[source_url] = False
                 issues.append(
                     f"No destination channel mapped for team `{team_key}` (origin: {origin or 'unknown'})."
                 )
@@ -302,9 +792,13 @@ class LaCommuDiscordBot(commands.Bot):
                 continue
 
             embed = create_job_embed(job)
+            started = time.perf_counter()
             try:
-                await channel.send(embed=embed)
+                with start_span("discord.send", channel=channel.name, job=job.job_title):
+                    await channel.send(embed=embed)
             except discord.HTTPException as exc:
+                DISCORD_SEND_SECONDS.observe(time.perf_counter() - started, outcome="error")
+                source_done[source_url] = False
                 issues.append(
                     f"Failed to post `{job.job_title}` to #{channel.name}: {exc}"
                 )
@@ -317,6 +811,8 @@ class LaCommuDiscordBot(commands.Bot):
                 )
                 continue
 
+            DISCORD_SEND_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+            JOBS_POSTED.inc()
             posted_jobs.append((job, channel))
             logger.info(
                 "📤 Posted '%s' to #%s in guild %s",
@@ -324,7 +820,29 @@ class LaCommuDiscordBot(commands.Bot):
                 channel.name,
                 guild.id,
             )
-            await self.post_history.mark_posted(job)
+            recorded = await self.post_history.mark_posted(
+                job,
+                guild_id=guild.id,
+                channel_id=channel.id,
+                force=force,
+            )
+            if not recorded and self.post_history.shared:
+                logger.warning(
+                    "🔁 '%s' was recorded concurrently by another process in guild %s",
+                    job.job_title,
+                    guild.id,
+                )
+            if self.similarity_index is not None:
+                await self.similarity_index.add(job)
+            if request_id is not None:
+                await self.retry_manager.record_posted(request_id, history_key)
+
+        # Lets the next request for the same link be skipped before fetching it. Only
+        # single-job pages qualify: careers pages and aggregators gain new jobs over time.
+        for source_url, done in source_done.items():
+            job_urls = source_job_urls[source_url]
+            if source_url and done and len(job_urls) == 1 and dedupe_key(job_urls[0]) == dedupe_key(source_url):
+                await self.post_history.mark_url_posted(source_url, guild_id=guild.id)
 
         return posted_jobs, issues
 
@@ -463,44 +981,89 @@ class LaCommuDiscordBot(commands.Bot):
         )
         return channel  # type: ignore[return-value]
 
+    def _begin_capture(self, command: str, reference: str, force: bool) -> Optional[CaptureRecord]:
+        if self.traffic_capture is None:
+            return None
+        return self.traffic_capture.begin(command=command, reference=reference, force=force)
+
+    async def _budget_exceeded(self, guild_id: int, user_id: int) -> Optional[str]:
+        if self.usage_ledger is None:
+            return None
+        return await self.usage_ledger.budget_exceeded(guild_id, user_id)
+
     async def _safe_followup(
         self,
         interaction: discord.Interaction,
         *,
         embed: discord.Embed,
         ephemeral: bool,
+        view: Optional[discord.ui.View] = None,
     ) -> None:
         try:
-            await interaction.followup.send(embed=embed, ephemeral=ephemeral)
+            if view is not None:
+                await interaction.followup.send(embed=embed, ephemeral=ephemeral, view=view)
+            else:
+                await interaction.followup.send(embed=embed, ephemeral=ephemeral)
         except discord.NotFound:
             logger.warning("⚠️ Interaction expired before followup could be sent")
 
-    async def _resume_pending_requests(self) -> None:
+    async def _run_retry_scheduler(self) -> None:
         await self.wait_until_ready()
-        pending = await self.retry_manager.list_pending_requests()
-        if not pending:
+        await self.warmup.wait(*STORAGE_WARMUP)
+        logger.info(
+            "🔁 Retry scheduler running (concurrency=%d, poll=%.0fs)",
+            self.config.retry_concurrency,
+            self.config.retry_poll_interval,
+        )
+        while not self.is_closed() and not self._draining:
+            capacity = self.config.retry_concurrency - len(self._retry_tasks)
+            if capacity > 0:
+                try:
+                    due = await self.retry_manager.claim_due_requests(limit=capacity)
+                except Exception:  # noqa: BLE001
+                    logger.exception("🚫 Could not read pending retry requests")
+                    due = []
+                if due:
+                    logger.info("🔁 Resuming %d pending job request(s)", len(due))
+                for entry in due:
+                    task = asyncio.create_task(self._process_retry(entry))
+                    self._retry_tasks.add(task)
+                    task.add_done_callback(self._retry_tasks.discard)
+            await asyncio.sleep(self.config.retry_poll_interval)
+
+    async def _process_retry(self, entry: PendingRequest) -> None:
+        set_usage_owner(entry.guild_id, entry.user_id)
+        over_budget = await self._budget_exceeded(entry.guild_id, entry.user_id)
+        if over_budget:
+            await self.retry_manager.defer_request(
+                entry.request_id,
+                until=next_utc_midnight(),
+                reason=f"Daily budget reached: {over_budget}",
+            )
             return
-        logger.info("🔁 Resuming %d pending job request(s)", len(pending))
-        for entry in pending:
-            if entry.attempts >= self.retry_manager.max_attempts:
-                logger.warning(
-                    "⚠️ Skipping request %s after %s attempts (last error: %s)",
-                    entry.request_id,
-                    entry.attempts,
-                    entry.last_error,
-                )
-                continue
-            try:
+        try:
+            with start_trace(
+                entry.request_id,
+                "jobbot.retry",
+                guild_id=entry.guild_id,
+                attempt=entry.attempts + 1,
+            ):
                 success = await self._retry_request(entry)
-            except Exception as exc:  # noqa: BLE001
-                await self.retry_manager.fail_request(entry.request_id, repr(exc))
-                logger.exception("🚫 Retry failed for request %s", entry.request_id)
+        except asyncio.CancelledError:
+            await self.retry_manager.defer_request(
+                entry.request_id,
+                until=time.time(),
+                reason="Interrupted by shutdown",
+            )
+            raise
+        except Exception as exc:  # noqa: BLE001
+            await self.retry_manager.fail_request(entry.request_id, repr(exc))
+            logger.exception("🚫 Retry failed for request %s", entry.request_id)
+        else:
+            if success:
+                await self.retry_manager.complete_request(entry.request_id)
             else:
-                if success:
-                    await self.retry_manager.complete_request(entry.request_id)
-                else:
-                    await self.retry_manager.fail_request(entry.request_id, "Retry produced no jobs")
-            await asyncio.sleep(1)
+                await self.retry_manager.fail_request(entry.request_id, "Retry produced no jobs")
 
     async def _retry_request(self, entry: PendingRequest) -> bool:
         guild = self.get_guild(entry.guild_id)
@@ -522,7 +1085,19 @@ class LaCommuDiscordBot(commands.Bot):
             entry.attempts + 1,
             self.retry_manager.max_attempts,
         )
-        jobs_data, issues = await self._collect_jobs(reference=entry.reference)
+        if entry.parsed_sources or entry.posted_keys:
+            logger.info(
+                "♻️ Retry request %s resumes from checkpoint: %d parsed source(s), %d posted job(s)",
+                entry.request_id,
+                len(entry.parsed_sources),
+                len(entry.posted_keys),
+            )
+        jobs_data, issues = await self._collect_jobs(
+            reference=entry.reference,
+            request_id=entry.request_id,
+            checkpoint=entry.parsed_sources,
+            force=entry.force,
+        )
         if not jobs_data:
             if issues:
                 logger.warning(
@@ -531,7 +1106,13 @@ class LaCommuDiscordBot(commands.Bot):
                     " | ".join(issues),
                 )
             return False
-        posted_jobs, dispatch_issues = await self._post_jobs(jobs_data, guild)
+        posted_jobs, dispatch_issues = await self._post_jobs(
+            jobs_data,
+            guild,
+            request_id=entry.request_id,
+            posted_keys=entry.posted_keys,
+            force=entry.force,
+        )
         issues.extend(dispatch_issues)
         logger.info(
             "📚 Retry request %s result: posted=%d issues=%d",
@@ -541,13 +1122,20 @@ class LaCommuDiscordBot(commands.Bot):
         )
         return True
 
-    async def _parse_page_jobs(self, url: str) -> tuple[List[Dict[str, object]], Optional[str]]:
+    async def _parse_page_jobs(
+        self,
+        url: str,
+        *,
+        request_id: Optional[int] = None,
+    ) -> tuple[List[Dict[str, object]], Optional[str]]:
         logger.info("🌐 Parsing job page: %s", url)
-        content = await fetch_page_text(
-            url,
-            timeout=self.config.request_timeout,
-            max_bytes=self.config.max_scrape_bytes,
-        )
+        with start_span("fetch_page", url=url) as span:
+            content = await fetch_page_text(
+                url,
+                timeout=self.config.request_timeout,
+                max_bytes=self.config.max_scrape_bytes,
+            )
+            span.set(chars=len(content or ""))
         if not content:
             return [], f"Couldn't fetch content from {url}"
 
@@ -559,11 +1147,20 @@ class LaCommuDiscordBot(commands.Bot):
             item.setdefault("job_url", url)
             item.setdefault("source_url", url)
         logger.info("📦 Parsed %d job(s) from %s", len(jobs_data), url)
+        if request_id is not None:
+            await self.retry_manager.record_source(
+                request_id,
+                url,
+                jobs=jobs_data,
+                text_hash=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            )
         return jobs_data, None
 
     async def _parse_image_jobs(
         self,
         url: str,
+        *,
+        request_id: Optional[int] = None,
     ) -> tuple[List[Dict[str, object]], Optional[str]]:
         logger.info("🖼️ Parsing job image: %s", url)
         jobs_data = await self.parser.parse_from_image(
@@ -577,36 +1174,89 @@ class LaCommuDiscordBot(commands.Bot):
             item.setdefault("job_url", url)
             item.setdefault("source_url", url)
         logger.info("📦 Parsed %d job(s) from image %s", len(jobs_data), url)
+        if request_id is not None:
+            await self.retry_manager.record_source(request_id, url, jobs=jobs_data)
         return jobs_data, None
 
+    @traced("collect_jobs")
     async def _collect_jobs(
         self,
         *,
         reference: str,
+        request_id: Optional[int] = None,
+        checkpoint: Optional[Dict[str, Dict[str, object]]] = None,
+        force: bool = False,
     ) -> tuple[List[Dict[str, object]], List[str]]:
+        # ``checkpoint`` holds sources parsed by an earlier attempt of the same request.
         jobs: List[Dict[str, object]] = []
         issues: List[str] = []
+        is_retry = bool(checkpoint)
+        checkpoint = checkpoint or {}
 
         text = reference.strip()
         image_urls = extract_image_urls(text)
         all_urls = extract_urls(text)
         page_urls = [url for url in all_urls if url not in image_urls]
-
+        if not page_urls and not image_urls:
+            issues.append("No URLs detected in reference text.")
+            return jobs, issues
+        # Shortened links (lnkd.in, bit.ly, ...) are followed so dedupe sees the real posting.
+        resolved_urls = []
         for url in page_urls:
-            parsed, error = await self._parse_page_jobs(url)
-            if error:
-                issues.append(error)
-            else:
-                jobs.extend(parsed)
+            target = await self.redirect_resolver.resolve(url)
+            capture_redirect(url, target)
+            resolved_urls.append(target)
+        page_urls = list(dict.fromkeys(resolved_urls))
 
-        for image_url in image_urls:
-            parsed, error = await self._parse_image_jobs(image_url)
+        skipped: List[str] = []
+        sources = [(url, False) for url in page_urls] + [(url, True) for url in image_urls]
+        for url, is_image in sources:
+            if url in checkpoint:
+                start_span("source", url=url, outcome="checkpoint").end()
+                CACHE_REQUESTS.inc(cache="checkpoint", result="hit")
+                logger.info("♻️ Reusing checkpointed jobs for %s", url)
+                jobs.extend(checkpoint[url]["jobs"])  # type: ignore[arg-type]
+                continue
+            if is_retry:
+                CACHE_REQUESTS.inc(cache="checkpoint", result="miss")
+            if not force and await self.post_history.is_url_posted(url):
+                DUPLICATES_SKIPPED.inc(reason="link")
+                start_span("source", url=url, outcome="already_posted").end()
+                skipped.append(url)
+                continue
+            started = time.perf_counter()
+            with start_span("source", url=url, kind="image" if is_image else "page") as span:
+                if is_image:
+                    parsed, error = await self._parse_image_jobs(url, request_id=request_id)
+                else:
+                    parsed, error = await self._parse_page_jobs(url, request_id=request_id)
+                span.set(jobs=len(parsed), outcome="error" if error else "parsed")
+            self._record_source_duration(time.perf_counter() - started)
             if error:
                 issues.append(error)
             else:
                 jobs.extend(parsed)
 
-        if not page_urls and not image_urls:
-            issues.append("No URLs detected in reference text.")
+        if skipped:
+            saved_seconds = len(skipped) * self._source_seconds_avg
+            self._dedupe_saved_calls += len(skipped)
+            self._dedupe_saved_seconds += saved_seconds
+            logger.info(
+                "🔁 Skipped %d already-posted link(s) before fetching (saved %d LLM call(s), ~%.1fs): %s",
+                len(skipped),
+                len(skipped),
+                saved_seconds,
+                ", ".join(skipped),
+            )
+            issues.append(
+                f"Skipped {len(skipped)} already-posted link(s) without fetching "
+                f"(saved {len(skipped)} LLM call(s), ~{saved_seconds:.0f}s). Use `force` to repost."
+            )
 
         return jobs, issues
+
+    def _record_source_duration(self, seconds: float) -> None:
+        if self._source_seconds_avg:
+            self._source_seconds_avg += 0.2 * (seconds - self._source_seconds_avg)
+        else:
+            self._source_seconds_avg = seconds
@@ -27,6 +27,7 @@ class OpenAIConfig:
     model: str = "gpt-4o-mini"
     temperature: float = 0.1
     image_model: str | None = None
+    base_url: str | None = None
 
 
 @dataclass(slots=True)
@@ -38,6 +39,38 @@ class BotConfig:
     max_image_bytes: int = 5_000_000
     request_timeout: float = 30.0
     response_timeout: float = 60.0
+    shard_count: int | None = None
+    retry_concurrency: int = 4
+    retry_poll_interval: float = 5.0
+    retry_base_delay: float = 30.0
+    retry_max_delay: float = 3600.0
+    history_backend: str = "log"
+    history_ttl_days: float | None = None
+    history_key_format: str = "text"
+    history_flush_interval: float = 1.0
+    history_batch_size: int = 32
+    history_fsync: bool = False
+    near_duplicate_action: str = "flag"
+    near_duplicate_distance: int = 3
+    near_duplicate_window_days: float = 90.0
+    slow_callback_threshold: float = 0.5
+    ready_max_loop_lag: float = 1.0
+    ready_max_gateway_latency: float = 10.0
+    ready_max_retry_due: int = 50
+    debug_port: int | None = None
+    debug_token: str | None = None
+    trace_file: str | None = "data/traces.jsonl"
+    otlp_endpoint: str | None = None
+    usage_guild_daily_tokens: int | None = None
+    usage_user_daily_tokens: int | None = None
+    usage_budget_action: str = "queue"
+    capture_dir: str | None = None
+    capture_max_bytes: int = 500_000_000
+    capture_sample_rate: float = 1.0
+    shutdown_timeout: float = 8.0
+    preview_cache_ttl: float = 900.0
+    preview_cache_max_entries: int = 256
+    preview_cache_max_bytes: int = 5_000_000
 
 
 def _parse_team_channel_ids(raw: str | None) -> Dict[str, int]:
@@ -67,6 +100,73 @@ def _parse_team_channel_ids(raw: str | None) -> Dict[str, int]:
     return base
 
 
+def _parse_optional_positive_int(name: str) -> int | None:
+    raw = os.getenv(name)
+    if not raw or not raw.strip():
+        return None
+    try:
+        value = int(raw)
+    except ValueError as exc:  # noqa: BLE001
+        raise RuntimeError(f"{name} must be an integer, got '{raw}'.") from exc
+    if value <= 0:
+        raise RuntimeError(f"{name} must be a positive integer.")
+    return value
+
+
+def _parse_positive_int(name: str, field: str) -> int:
+    raw = os.getenv(name)
+    if not raw or not raw.strip():
+        return BotConfig.__dataclass_fields__[field].default
+    try:
+        value = int(raw)
+    except ValueError as exc:  # noqa: BLE001
+        raise RuntimeError(f"{name} must be an integer, got '{raw}'.") from exc
+    if value <= 0:
+        raise RuntimeError(f"{name} must be a positive integer.")
+    return value
+
+
+def _parse_positive_float(name: str, field: str) -> float:
+    raw = os.getenv(name)
+    if not raw or not raw.strip():
+        return BotConfig.__dataclass_fields__[field].default
+    try:
+        value = float(raw)
+    except ValueError as exc:  # noqa: BLE001
+        raise RuntimeError(f"{name} must be a number, got '{raw}'.") from exc
+    if not value > 0:
+        raise RuntimeError(f"{name} must be a positive number.")
+    return value
+
+
+def _parse_history_backend(raw: str | None) -> str:
+    backend = (raw or BotConfig.__dataclass_fields__["history_backend"].default).strip().lower()
+    if backend not in {"log", "sqlite"}:
+        raise RuntimeError(f"HISTORY_BACKEND must be 'log' or 'sqlite', got '{raw}'.")
+    return backend
+
+
+def _parse_history_key_format(raw: str | None) -> str:
+    key_format = (raw or BotConfig.__dataclass_fields__["history_key_format"].default).strip().lower()
+    if key_format not in {"text", "digest", "bloom"}:
+        raise RuntimeError(f"HISTORY_KEY_FORMAT must be 'text', 'digest' or 'bloom', got '{raw}'.")
+    return key_format
+
+
+def _parse_near_duplicate_action(raw: str | None) -> str:
+    action = (raw or BotConfig.__dataclass_fields__["near_duplicate_action"].default).strip().lower()
+    if action not in {"off", "flag", "skip"}:
+        raise RuntimeError(f"NEAR_DUPLICATE_ACTION must be 'off', 'flag' or 'skip', got '{raw}'.")
+    return action
+
+
+def _parse_usage_budget_action(raw: str | None) -> str:
+    action = (raw or BotConfig.__dataclass_fields__["usage_budget_action"].default).strip().lower()
+    if action not in {"queue", "reject"}:
+        raise RuntimeError(f"USAGE_BUDGET_ACTION must be 'queue' or 'reject', got '{raw}'.")
+    return action
+
+
 def load_config() -> BotConfig:
     discord_token = os.getenv("DISCORD_BOT_TOKEN")
     openai_key = os.getenv("OPENAI_API_KEY")
@@ -84,11 +184,16 @@ def load_config() -> BotConfig:
         )
 
     channels = ChannelConfig(team_channels=team_channels)
+    retry_base_delay = _parse_positive_float("RETRY_BASE_DELAY", "retry_base_delay")
+    retry_max_delay = _parse_positive_float("RETRY_MAX_DELAY", "retry_max_delay")
+    if retry_max_delay < retry_base_delay:
+        raise RuntimeError("RETRY_MAX_DELAY must be at least RETRY_BASE_DELAY.")
     openai_cfg = OpenAIConfig(
         api_key=openai_key,
         model=os.getenv("OPENAI_MODEL", OpenAIConfig.__dataclass_fields__["model"].default),
         temperature=float(os.getenv("OPENAI_TEMPERATURE", OpenAIConfig.__dataclass_fields__["temperature"].default)),
         image_model=os.getenv("OPENAI_IMAGE_MODEL"),
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
     )
     return BotConfig(
         discord_token=discord_token,
@@ -98,4 +203,36 @@ def load_config() -> BotConfig:
         max_image_bytes=int(os.getenv("MAX_IMAGE_BYTES", BotConfig.__dataclass_fields__["max_image_bytes"].default)),
         request_timeout=float(os.getenv("REQUEST_TIMEOUT", BotConfig.__dataclass_fields__["request_timeout"].default)),
         response_timeout=float(os.getenv("RESPONSE_TIMEOUT", BotConfig.__dataclass_fields__["response_timeout"].default)),
+        shard_count=_parse_optional_positive_int("DISCORD_SHARD_COUNT"),
+        retry_concurrency=_parse_positive_int("RETRY_CONCURRENCY", "retry_concurrency"),
+        retry_poll_interval=_parse_positive_float("RETRY_POLL_INTERVAL", "retry_poll_interval"),
+        retry_base_delay=retry_base_delay,
+        retry_max_delay=retry_max_delay,
+        history_backend=_parse_history_backend(os.getenv("HISTORY_BACKEND")),
+        history_ttl_days=float(os.getenv("HISTORY_TTL_DAYS")) if os.getenv("HISTORY_TTL_DAYS") else None,
+        history_key_format=_parse_history_key_format(os.getenv("HISTORY_KEY_FORMAT")),
+        history_flush_interval=float(os.getenv("HISTORY_FLUSH_INTERVAL", BotConfig.__dataclass_fields__["history_flush_interval"].default)),
+        history_batch_size=int(os.getenv("HISTORY_BATCH_SIZE", BotConfig.__dataclass_fields__["history_batch_size"].default)),
+        history_fsync=os.getenv("HISTORY_FSYNC", "").strip().lower() in {"1", "true", "yes", "on"},
+        near_duplicate_action=_parse_near_duplicate_action(os.getenv("NEAR_DUPLICATE_ACTION")),
+        near_duplicate_distance=int(os.getenv("NEAR_DUPLICATE_DISTANCE", BotConfig.__dataclass_fields__["near_duplicate_distance"].default)),
+        near_duplicate_window_days=float(os.getenv("NEAR_DUPLICATE_WINDOW_DAYS", BotConfig.__dataclass_fields__["near_duplicate_window_days"].default)),
+        slow_callback_threshold=float(os.getenv("SLOW_CALLBACK_THRESHOLD", BotConfig.__dataclass_fields__["slow_callback_threshold"].default)),
+        ready_max_loop_lag=float(os.getenv("READY_MAX_LOOP_LAG", BotConfig.__dataclass_fields__["ready_max_loop_lag"].default)),
+        ready_max_gateway_latency=float(os.getenv("READY_MAX_GATEWAY_LATENCY", BotConfig.__dataclass_fields__["ready_max_gateway_latency"].default)),
+        ready_max_retry_due=int(os.getenv("READY_MAX_RETRY_DUE", BotConfig.__dataclass_fields__["ready_max_retry_due"].default)),
+        debug_port=_parse_optional_positive_int("DEBUG_PORT"),
+        debug_token=os.getenv("DEBUG_TOKEN") or None,
+        trace_file=os.getenv("TRACE_FILE", BotConfig.__dataclass_fields__["trace_file"].default) or None,
+        otlp_endpoint=os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT") or None,
+        usage_guild_daily_tokens=_parse_optional_positive_int("USAGE_GUILD_DAILY_TOKENS"),
+        usage_user_daily_tokens=_parse_optional_positive_int("USAGE_USER_DAILY_TOKENS"),
+        usage_budget_action=_parse_usage_budget_action(os.getenv("USAGE_BUDGET_ACTION")),
+        capture_dir=os.getenv("CAPTURE_DIR") or None,
+        capture_max_bytes=int(os.getenv("CAPTURE_MAX_BYTES", BotConfig.__dataclass_fields__["capture_max_bytes"].default)),
+        capture_sample_rate=float(os.getenv("CAPTURE_SAMPLE_RATE", BotConfig.__dataclass_fields__["capture_sample_rate"].default)),
+        shutdown_timeout=float(os.getenv("SHUTDOWN_TIMEOUT", BotConfig.__dataclass_fields__["shutdown_timeout"].default)),
+        preview_cache_ttl=float(os.getenv("PREVIEW_CACHE_TTL", BotConfig.__dataclass_fields__["preview_cache_ttl"].default)),
+        preview_cache_max_entries=int(os.getenv("PREVIEW_CACHE_MAX_ENTRIES", BotConfig.__dataclass_fields__["preview_cache_max_entries"].default)),
+        preview_cache_max_bytes=int(os.getenv("PREVIEW_CACHE_MAX_BYTES", BotConfig.__dataclass_fields__["preview_cache_max_bytes"].default)),
     )
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import hmac
+import io
+import logging
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+MAX_CAPTURE_SECONDS = 120.0
+SAMPLE_INTERVAL = 0.005
+
+# Only one profiler can be active per interpreter.
+_profile_lock = asyncio.Lock()
+
+
+def build_debug_app(token: str) -> web.Application:
+    """Admin-only diagnostics; every request must send ``Authorization: Bearer <token>``."""
+
+    @web.middleware
+    async def require_token(request: web.Request, handler):
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            raise web.HTTPUnauthorized(text="Missing or invalid debug token.")
+        return await handler(request)
+
+    app = web.Application(middlewares=[require_token])
+    app.router.add_get("/debug/profile", handle_profile)
+    app.router.add_get("/debug/tracemalloc", handle_tracemalloc)
+    app.router.add_get("/debug/tasks", handle_tasks)
+    return app
+
+
+def _seconds(request: web.Request, default: float = 10.0) -> float:
+    try:
+        seconds = float(request.query.get("seconds", default))
+    except ValueError:
+        raise web.HTTPBadRequest(text="seconds must be a number.") from None
+    return min(max(seconds, 0.1), MAX_CAPTURE_SECONDS)
+
+
+def _report(text: str, filename: str) -> web.Response:
+    return web.Response(
+        text=text,
+        content_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def handle_profile(request: web.Request) -> web.Response:
+    """CPU profile of the event loop thread (``mode=cprofile``) or folded stack samples (``mode=sample``)."""
+    seconds = _seconds(request)
+    mode = request.query.get("mode", "cprofile")
+    if mode not in {"cprofile", "sample"}:
+        raise web.HTTPBadRequest(text="mode must be 'cprofile' or 'sample'.")
+    if _profile_lock.locked():
+        raise web.HTTPConflict(text="A profile is already being captured.")
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    async with _profile_lock:
+        logger.info("🔬 Capturing %s profile for %.1fs", mode, seconds)
+        if mode == "sample":
+            report = await _sample_stacks(seconds)
+            return _report(report, f"jobbot-stacks-{stamp}.folded")
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        buffer = io.StringIO()
+        stats = pstats.Stats(profiler, stream=buffer)
+        stats.sort_stats("cumulative").print_stats(60)
+        return _report(buffer.getvalue(), f"jobbot-profile-{stamp}.txt")
+
+
+async def _sample_stacks(seconds: float) -> str:
+    # Statistical sampler: a thread snapshots the loop thread's stack every
+    # few milliseconds; output is one "frame;frame;frame count" line per stack
+    # (flamegraph.pl / speedscope "folded" format).
+    loop_thread = threading.get_ident()
+    samples: Counter[str] = Counter()
+    stop = threading.Event()
+
+    def sample() -> None:
+        while not stop.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(loop_thread)  # noqa: SLF001
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_qualname} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+                frame = frame.f_back
+            samples[";".join(reversed(names))] += 1
+
+    thread = threading.Thread(target=sample, name="stack-sampler", daemon=True)
+    thread.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        stop.set()
+        thread.join()
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+async def handle_tracemalloc(request: web.Request) -> web.Response:
+    """Allocation growth between two tracemalloc snapshots taken ``seconds`` apart."""
+    seconds = _seconds(request)
+    try:
+        limit = int(request.query.get("limit", 50))
+    except ValueError:
+        raise web.HTTPBadRequest(text="limit must be an integer.") from None
+    started_here = not tracemalloc.is_tracing()
+    if started_here:
+        tracemalloc.start(25)
+    try:
+        before = tracemalloc.take_snapshot()
+        await asyncio.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_here:
+            tracemalloc.stop()
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+    lines = [
+        f"tracemalloc diff over {seconds:.1f}s (traced now {current / 1024:.0f} KiB, peak {peak / 1024:.0f} KiB)",
+        "Only allocations made while tracing are visible; set PYTHONTRACEMALLOC=1 to trace from startup.",
+        "",
+    ]
+    lines.extend(str(stat) for stat in diff[:limit])
+    return _report("\n".join(lines) + "\n", f"jobbot-tracemalloc-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+
+
+async def handle_tasks(request: web.Request) -> web.Response:
+    """Every running asyncio task with its current stack."""
+    current = asyncio.current_task()
+    tasks = sorted(asyncio.all_tasks(), key=lambda task: task.get_name())
+    buffer = io.StringIO()
+    buffer.write(f"{len(tasks)} task(s)\n\n")
+    for task in tasks:
+        marker = " (this request)" if task is current else ""
+        buffer.write(f"=== {task.get_name()}{marker}: {task.get_coro()!r}\n")
+        task.print_stack(limit=20, file=buffer)
+        buffer.write("\n")
+    return _report(buffer.getvalue(), f"jobbot-tasks-{time.strftime('%Y%m%d-%H%M%S')}.txt")
+
+
+async def start_debug_site(port: int, token: Optional[str]) -> Optional[web.AppRunner]:
+    if not token:
+        logger.warning("⚠️ DEBUG_PORT is set but DEBUG_TOKEN is empty; debug routes stay disabled")
+        return None
+    runner = web.AppRunner(build_debug_app(token), access_log=None)
+    await runner.setup()
+    # Loopback only: reach it with an SSH tunnel or from inside the container.
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    logger.info("🔬 Debug routes listening on 127.0.0.1:%s", port)
+    return runner
@@ -2,18 +2,37 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
 from aiohttp import web
 
+from .debug import start_debug_site
+from .metrics import REGISTRY, MetricsRegistry
+
 logger = logging.getLogger(__name__)
 
+ReadinessCheck = Callable[[], Awaitable[Tuple[bool, Dict[str, Any]]]]
+
 
 class HealthServer:
     DEFAULT_PORT = 8080
 
-    def __init__(self, host: str = "0.0.0.0", port: Optional[int] = None) -> None:
+    def __init__(
+        self,
+        host: str = "0.0.0.0",
+        port: Optional[int] = None,
+        *,
+        registry: Optional[MetricsRegistry] = None,
+        readiness: Optional[ReadinessCheck] = None,
+        debug_port: Optional[int] = None,
+        debug_token: Optional[str] = None,
+    ) -> None:
         self._host = host
+        self._registry = registry or REGISTRY
+        self._readiness = readiness
+        self._debug_port = debug_port
+        self._debug_token = debug_token
+        self._debug_runner: Optional[web.AppRunner] = None
         env_port_str = os.getenv("PORT")
         env_port = self.DEFAULT_PORT
         if env_port_str and env_port_str.strip():
@@ -45,14 +64,21 @@ class HealthServer:
         app.router.add_get("/", self._handle_health)
         app.router.add_get("/health", self._handle_health)
         app.router.add_get("/healthz", self._handle_health)
+        app.router.add_get("/ready", self._handle_ready)
+        app.router.add_get("/metrics", self._handle_metrics)
         # Disable default aiohttp access logging to keep health probes out of INFO logs.
         self._runner = web.AppRunner(app, access_log=None)
         await self._runner.setup()
         self._site = web.TCPSite(self._runner, self._host, self._port)
         await self._site.start()
         logger.info("🌐 Health server listening on %s:%s", self._host, self._port)
+        if self._debug_port is not None:
+            self._debug_runner = await start_debug_site(self._debug_port, self._debug_token)
 
     async def stop(self) -> None:
+        if self._debug_runner:
+            await self._debug_runner.cleanup()
+            self._debug_runner = None
         if self._site:
             await self._site.stop()
             self._site = None
@@ -63,3 +89,19 @@ class HealthServer:
 
     async def _handle_health(self, request: web.Request) -> web.Response:  # noqa: D401
         return web.json_response({"status": "ok"})
+
+    async def _handle_ready(self, request: web.Request) -> web.Response:
+        if self._readiness is None:
+            return web.json_response({"status": "ready"})
+        try:
+            ready, details = await self._readiness()
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("🚫 Readiness check failed: %s", exc)
+            ready, details = False, {"status": "unavailable", "failures": [str(exc)]}
+        return web.json_response(details, status=200 if ready else 503)
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=self._registry.render().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
@@ -1,23 +1,362 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import TYPE_CHECKING, Set
+from typing import TYPE_CHECKING, Callable, Dict, List, NamedTuple, Optional, Protocol, Sequence, Set, Union
 
-from .utils import run_blocking
+from .keyset import KeyDigestSet
+from .urls import dedupe_key
+from .utils import locked_file, run_blocking
 
 if TYPE_CHECKING:
     from .models import JobPosting
 
+logger = logging.getLogger(__name__)
+
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
+
+
+class HistoryRecord(NamedTuple):
+    key: str
+    posted_at: float
+    guild_id: Optional[int] = None
+    channel_id: Optional[int] = None
+
+
+class HistoryStore(Protocol):
+    async def load(self) -> None: ...
+
+    def might_contain(self, key: str) -> bool: ...
+
+    async def contains(self, key: str) -> bool: ...
+
+    async def add_many(self, records: Sequence[HistoryRecord], *, replace: bool = False) -> List[str]: ...
+
+    async def rewrite_keys(self, transform: Callable[[str], str]) -> int: ...
+
+    def close(self) -> None: ...
+
+
+class LogHistoryStore:
+    """Plain-text log with one key per line, mirrored in an in-memory set.
+
+    With ``shared=True`` the log may be appended by several bot processes (one
+    per shard group); appends are serialised with a lock on a ``.lock`` file next
+    to the log (which, unlike the log, is never replaced), and lines written
+    by the other processes are picked up before each lookup and again under the
+    lock before appending, so only one process records a given key.
+
+    ``compact=True`` keeps 64-bit key digests (:class:`KeyDigestSet`) instead of
+    full strings, and ``bloom=True`` adds a Bloom filter that answers most
+    misses without taking the history lock.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path,
+        *,
+        shared: bool = False,
+        compact: bool = False,
+        bloom: bool = False,
+        fsync: bool = False,
+    ) -> None:
+        self.storage_path = storage_path
+        self._lock_path = storage_path.with_name(storage_path.name + ".lock")
+        self._shared = shared
+        self._fsync = fsync
+        self._compact = compact or bloom
+        self._bloom = bloom
+        self._seen: Union[Set[str], KeyDigestSet] = set()
+        self._offset = 0
+
+    async def load(self) -> None:
+        keys, self._offset = await run_blocking(self._read_entries, 0)
+        if self._compact:
+            self._seen = KeyDigestSet(keys, bloom=self._bloom, capacity=len(keys))
+        else:
+            self._seen = set(keys)
+
+    def might_contain(self, key: str) -> bool:
+        # Other processes may have appended keys the filter hasn't seen yet.
+        if self._shared or not isinstance(self._seen, KeyDigestSet):
+            return True
+        return self._seen.might_contain(key)
+
+    async def contains(self, key: str) -> bool:
+        if key in self._seen:
+            return True
+        if self._shared:
+            await self._refresh()
+        return key in self._seen
+
+    async def add_many(self, records: Sequence[HistoryRecord], *, replace: bool = False) -> List[str]:
+        """Append the keys not stored yet and return them.
+
+        The log keeps no timestamps, so ``replace`` has nothing to refresh.
+        """
+        keys = [record.key for record in records]
+        added, entries, offset = await run_blocking(self._append_entries, keys, self._offset)
+        self._seen.update(entries)
+        self._seen.update(keys)
+        self._offset = max(self._offset, offset)
+        return added
+
+    async def rewrite_keys(self, transform: Callable[[str], str]) -> int:
+        changed = await run_blocking(self._rewrite_file, transform)
+        await self.load()
+        return changed
+
+    def close(self) -> None:
+        return None
+
+    def _rewrite_file(self, transform: Callable[[str], str]) -> int:
+        if not self.storage_path.exists():
+            return 0
+        with locked_file(self._lock_path), self.storage_path.open("r", encoding="utf-8") as handle:
+            keys = [line.strip() for line in handle if line.strip()]
+            rewritten = list(dict.fromkeys(transform(key) for key in keys))
+            tmp_path = self.storage_path.with_name(self.storage_path.name + ".tmp")
+            tmp_path.write_text("".join(f"{key}\n" for key in rewritten), encoding="utf-8")
+            tmp_path.replace(self.storage_path)
+        return sum(1 for key in keys if transform(key) != key)
+
+    async def _refresh(self) -> None:
+        entries, offset = await run_blocking(self._read_entries, self._offset)
+        self._seen.update(entries)
+        self._offset = offset
+
+    def _read_entries(self, offset: int) -> tuple[List[str], int]:
+        if not self.storage_path.exists():
+            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            return [], 0
+        with self.storage_path.open("rb") as handle:
+            handle.seek(offset)
+            data = handle.read()
+        # Only consume complete lines when another process may be mid-append.
+        complete = data.rfind(b"\n") + 1 if self._shared else len(data)
+        lines = data[:complete].decode("utf-8").splitlines()
+        return [line.strip() for line in lines if line.strip()], offset + complete
+
+    def _append_entries(self, keys: Sequence[str], offset: int) -> tuple[List[str], List[str], int]:
+        entries: List[str] = []
+        with locked_file(self._lock_path), self.storage_path.open("a", encoding="utf-8") as handle:
+            if self._shared:
+                # Another process may have recorded some of these keys since our last lookup.
+                entries, offset = self._read_entries(offset)
+                stored = set(entries)
+                keys = [key for key in dict.fromkeys(keys) if key not in stored]
+            if keys:
+                handle.write("".join(f"{key}\n" for key in keys))
+                handle.flush()
+                if self._fsync:
+                    os.fsync(handle.fileno())
+                if self._shared:
+                    offset = handle.tell()
+        return list(keys), entries, offset
+
+
+class SQLiteHistoryStore:
+    """Indexed SQLite table (WAL mode) holding post time, guild and channel per key.
+
+    Lookups hit the primary-key index instead of an in-memory set, so startup
+    cost and memory don't grow with the history. Entries older than ``ttl``
+    seconds are ignored and purged on load, which lets old offers be re-posted.
+    WAL mode makes the database safe to share between shard processes.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path,
+        *,
+        ttl: Optional[float] = None,
+        legacy_log_path: Optional[Path] = None,
+    ) -> None:
+        self.storage_path = storage_path
+        self._ttl = ttl
+        self._legacy_log_path = legacy_log_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+
+    async def load(self) -> None:
+        await run_blocking(self._open)
+
+    def might_contain(self, key: str) -> bool:
+        return True
+
+    async def contains(self, key: str) -> bool:
+        return await run_blocking(self._contains, key)
+
+    async def add_many(self, records: Sequence[HistoryRecord], *, replace: bool = False) -> List[str]:
+        """Store ``records`` and return the keys that had no live row yet.
+
+        ``replace`` also overwrites live rows, restarting their TTL.
+        """
+        return await run_blocking(self._insert_many, records, replace)
+
+    async def rewrite_keys(self, transform: Callable[[str], str]) -> int:
+        return await run_blocking(self._rewrite_rows, transform)
+
+    def close(self) -> None:
+        with self._db_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _cutoff(self) -> float:
+        return time.time() - self._ttl if self._ttl else float("-inf")
+
+    def _open(self) -> None:
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.storage_path, check_same_thread=False, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS posted_jobs ("
+            " key TEXT PRIMARY KEY,"
+            " posted_at REAL NOT NULL,"
+            " guild_id INTEGER,"
+            " channel_id INTEGER"
+            ") WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_posted_jobs_posted_at ON posted_jobs (posted_at)"
+        )
+        connection.commit()
+        with self._db_lock:
+            self._connection = connection
+            self._migrate_legacy_log()
+            if self._ttl:
+                with connection:
+                    purged = connection.execute(
+                        "DELETE FROM posted_jobs WHERE posted_at < ?", (self._cutoff(),)
+                    ).rowcount
+                if purged:
+                    logger.info("🧹 Expired %d posted job(s) from history", purged)
+
+    def _migrate_legacy_log(self) -> None:
+        legacy = self._legacy_log_path
+        if legacy is None or not legacy.exists():
+            return
+        assert self._connection is not None
+        # The log has no per-line timestamps; its mtime is the best available bound.
+        posted_at = legacy.stat().st_mtime
+        with legacy.open("r", encoding="utf-8") as handle:
+            keys = [(line.strip(), posted_at) for line in handle if line.strip()]
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO posted_jobs (key, posted_at) VALUES (?, ?)",
+                keys,
+            )
+        legacy.replace(legacy.with_name(legacy.name + ".migrated"))
+        logger.info("📦 Migrated %d history key(s) from %s to %s", len(keys), legacy, self.storage_path)
+
+    def _rewrite_rows(self, transform: Callable[[str], str]) -> int:
+        with self._db_lock:
+            assert self._connection is not None
+            rows = self._connection.execute(
+                "SELECT key, posted_at, guild_id, channel_id FROM posted_jobs"
+            ).fetchall()
+            changed = [(row, transform(row[0])) for row in rows if transform(row[0]) != row[0]]
+            with self._connection:
+                for (key, posted_at, guild_id, channel_id), new_key in changed:
+                    self._connection.execute("DELETE FROM posted_jobs WHERE key = ?", (key,))
+                    # Keep the most recent post time when two old keys collapse into one.
+                    self._connection.execute(
+                        "INSERT INTO posted_jobs (key, posted_at, guild_id, channel_id) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (key) DO UPDATE SET posted_at = MAX(posted_at, excluded.posted_at)",
+                        (new_key, posted_at, guild_id, channel_id),
+                    )
+        return len(changed)
+
+    def _contains(self, key: str) -> bool:
+        with self._db_lock:
+            assert self._connection is not None
+            row = self._connection.execute(
+                "SELECT 1 FROM posted_jobs WHERE key = ? AND posted_at >= ?",
+                (key, self._cutoff()),
+            ).fetchone()
+        return row is not None
+
+    def _insert_many(self, records: Sequence[HistoryRecord], replace: bool) -> List[str]:
+        # Without replace only expired rows are overwritten, so the row count tells
+        # whether this process recorded the key first.
+        query = (
+            "INSERT INTO posted_jobs (key, posted_at, guild_id, channel_id) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET posted_at = excluded.posted_at, "
+            "guild_id = excluded.guild_id, channel_id = excluded.channel_id"
+        )
+        if not replace:
+            query += " WHERE posted_jobs.posted_at < ?"
+        cutoff = self._cutoff()
+        added: List[str] = []
+        with self._db_lock:
+            assert self._connection is not None
+            with self._connection:
+                for record in records:
+                    params = tuple(record) if replace else (*record, cutoff)
+                    if self._connection.execute(query, params).rowcount:
+                        added.append(record.key)
+        return added
+
 
 class PostHistory:
-    """Stores identifiers of previously posted jobs to avoid duplicates."""
+    """Stores identifiers of previously posted jobs to avoid duplicates.
 
-    def __init__(self, storage_path: Path) -> None:
+    Paths ending in ``.db``/``.sqlite`` use :class:`SQLiteHistoryStore`; anything
+    else uses the plain-text :class:`LogHistoryStore`.
+
+    Without ``flush_interval`` every ``mark_posted`` is written through. With it,
+    a background writer group-commits pending keys every ``flush_interval``
+    seconds or once ``batch_size`` keys are waiting; pending keys already count
+    as posted, and :meth:`aclose` flushes whatever is left.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path,
+        *,
+        shared: bool = False,
+        compact: bool = False,
+        bloom: bool = False,
+        ttl: Optional[float] = None,
+        legacy_log_path: Optional[Path] = None,
+        store: Optional[HistoryStore] = None,
+        flush_interval: Optional[float] = None,
+        batch_size: int = 32,
+        fsync: bool = False,
+    ) -> None:
         self.storage_path = storage_path
-        self._seen: Set[str] = set()
+        self.shared = shared
+        if store is None:
+            if storage_path.suffix in SQLITE_SUFFIXES:
+                store = SQLiteHistoryStore(storage_path, ttl=ttl, legacy_log_path=legacy_log_path)
+            else:
+                if ttl:
+                    logger.warning("⚠️ History TTL requires the sqlite backend; entries won't expire")
+                store = LogHistoryStore(
+                    storage_path,
+                    shared=shared,
+                    compact=compact,
+                    bloom=bloom,
+                    fsync=fsync,
+                )
+        self._store = store
         self._lock = asyncio.Lock()
         self._loaded = False
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._pending: Dict[str, HistoryRecord] = {}
+        # Pending keys re-posted with force: their stored record is refreshed, not skipped.
+        self._forced: Set[str] = set()
+        self._flush_lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+        self._writer: Optional[asyncio.Task[None]] = None
+        self._closing = False
 
     async def load(self) -> None:
         if self._loaded:
@@ -25,46 +364,145 @@ class PostHistory:
         async with self._lock:
             if self._loaded:
                 return
-            entries = await run_blocking(self._read_entries)
-            self._seen = entries
+            await self._store.load()
             self._loaded = True
 
     async def is_posted(self, job: "JobPosting") -> bool:
+        return await self._is_key_posted(self._build_key(job))
+
+    async def is_url_posted(self, url: str) -> bool:
+        """Check a reference URL before fetching it."""
+        return await self._is_key_posted(self._url_key(url))
+
+    async def mark_posted(
+        self,
+        job: "JobPosting",
+        *,
+        guild_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        force: bool = False,
+    ) -> bool:
+        """Record ``job``; False when it was already recorded, possibly by another process.
+
+        With ``force`` an existing record is refreshed (restarting its TTL) and
+        the call always returns True.
+        """
+        return await self._mark_key(self._build_key(job), guild_id=guild_id, channel_id=channel_id, force=force)
+
+    async def mark_url_posted(
+        self,
+        url: str,
+        *,
+        guild_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+    ) -> bool:
+        """Record a reference URL whose jobs were all shared."""
+        return await self._mark_key(self._url_key(url), guild_id=guild_id, channel_id=channel_id)
+
+    async def _is_key_posted(self, key: str) -> bool:
         await self.load()
-        key = self._build_key(job)
         if not key:
             return False
+        if key in self._pending:
+            return True
+        if not self._store.might_contain(key):
+            return False
         async with self._lock:
-            return key in self._seen
+            return await self._store.contains(key)
 
-    async def mark_posted(self, job: "JobPosting") -> None:
+    async def _mark_key(
+        self,
+        key: str,
+        *,
+        guild_id: Optional[int],
+        channel_id: Optional[int],
+        force: bool = False,
+    ) -> bool:
         await self.load()
-        key = self._build_key(job)
         if not key:
-            return
+            return False
         async with self._lock:
-            if key in self._seen:
-                return
-            self._seen.add(key)
-        await run_blocking(self._append_entry, key)
+            if not force and (key in self._pending or await self._store.contains(key)):
+                return False
+            self._pending[key] = HistoryRecord(key, time.time(), guild_id, channel_id)
+            if force:
+                self._forced.add(key)
+        if self._flush_interval is None:
+            # A key flushed by someone else's concurrent flush counts as ours.
+            return (await self.flush()).get(key, True)
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._run_writer())
+        if len(self._pending) >= self._batch_size:
+            self._flush_requested.set()
+        return True
 
-    def _read_entries(self) -> Set[str]:
-        if not self.storage_path.exists():
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            return set()
-        with self.storage_path.open("r", encoding="utf-8") as handle:
-            return {line.strip() for line in handle if line.strip()}
+    async def flush(self) -> Dict[str, bool]:
+        """Persist pending keys; maps each to whether this process recorded it first."""
+        async with self._flush_lock:
+            if not self._pending:
+                return {}
+            records = list(self._pending.values())
+            fresh = [record for record in records if record.key not in self._forced]
+            forced = [record for record in records if record.key in self._forced]
+            try:
+                added = set(await self._store.add_many(fresh)) if fresh else set()
+                if forced:
+                    await self._store.add_many(forced, replace=True)
+                    added.update(record.key for record in forced)
+            except Exception:  # noqa: BLE001
+                # Keys stay pending (and still count as posted) until the next flush.
+                logger.exception("🚫 Failed to persist %d posted job key(s)", len(records))
+                return {}
+            for record in records:
+                if self._pending.get(record.key) is record:
+                    del self._pending[record.key]
+                    self._forced.discard(record.key)
+            logger.debug("💾 Flushed %d posted job key(s)", len(records))
+            if self.shared and len(added) < len(records):
+                logger.info("🔁 %d posted job key(s) were already recorded by another process", len(records) - len(added))
+            return {record.key: record.key in added for record in records}
 
-    def _append_entry(self, key: str) -> None:
-        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-        with self.storage_path.open("a", encoding="utf-8") as handle:
-            handle.write(f"{key}\n")
+    async def aclose(self) -> None:
+        self._closing = True
+        if self._writer is not None:
+            # Wake the writer instead of cancelling it so an in-progress write completes.
+            self._flush_requested.set()
+            await self._writer
+            self._writer = None
+        await self.flush()
+        self.close()
+
+    def close(self) -> None:
+        self._store.close()
+
+    async def rewrite_keys(self) -> int:
+        """Re-key stored URLs with the current canonicalizer; returns the number changed."""
+        await self.load()
+        await self.flush()
+        async with self._lock:
+            return await self._store.rewrite_keys(_canonical_key)
+
+    async def _run_writer(self) -> None:
+        assert self._flush_interval is not None
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            await self.flush()
+
+    def key_for(self, job: "JobPosting") -> str:
+        """Return the identifier used to deduplicate ``job``."""
+        return self._build_key(job)
+
+    def _url_key(self, url: str) -> str:
+        return dedupe_key(url)
 
     def _build_key(self, job: "JobPosting") -> str:
-        url = (job.job_url or "").strip().lower()
+        url = self._url_key(job.job_url)
         if url:
-            sanitized = url.split("#", 1)[0].rstrip("/")
-            return sanitized
+            return url
 
         company = (job.company_name or "").strip().lower()
         title = (job.job_title or "").strip().lower()
@@ -72,3 +510,8 @@ class PostHistory:
         if not company and not title:
             return ""
         return "|".join(filter(None, (company, title, team)))
+
+
+def _canonical_key(key: str) -> str:
+    # Composite "company|title|team" keys are left untouched.
+    return dedupe_key(key) if key.startswith(("http://", "https://")) else key
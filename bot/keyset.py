@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+from array import array
+from typing import Iterable, List, Optional
+
+# Open-addressing table of 64-bit key digests. A Python ``set[str]`` of URLs
+# costs ~150 bytes per entry; this costs 8 bytes per slot at <= 50% load.
+# Two keys with the same 64-bit digest are treated as equal; with a million
+# entries the chance of any collision is around 3e-8.
+
+_EMPTY = 0
+_MAX_LOAD = 0.5
+
+
+def key_digest(key: str) -> int:
+    digest = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return digest or 1  # 0 marks an empty slot
+
+
+class BloomFilter:
+    """Bit array answering "definitely absent" without touching the table."""
+
+    BITS_PER_KEY = 10
+    HASHES = 7
+
+    def __init__(self, capacity: int) -> None:
+        self._size = max(capacity * self.BITS_PER_KEY, 64)
+        self._bits = bytearray((self._size + 7) // 8)
+
+    def add(self, digest: int) -> None:
+        for position in self._positions(digest):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, digest: int) -> bool:
+        # Inlined so most misses stop after the first probe.
+        bits = self._bits
+        size = self._size
+        position = digest & 0xFFFFFFFF
+        step = (digest >> 32) | 1
+        for _ in range(self.HASHES):
+            position %= size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+        return True
+
+    def _positions(self, digest: int) -> List[int]:
+        # Double hashing over the two 32-bit halves of the digest.
+        first = digest & 0xFFFFFFFF
+        second = (digest >> 32) | 1
+        size = self._size
+        return [(first + index * second) % size for index in range(self.HASHES)]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._bits)
+
+
+class KeyDigestSet:
+    """Set of strings stored as fixed-width 64-bit digests."""
+
+    def __init__(self, keys: Iterable[str] = (), *, bloom: bool = False, capacity: int = 1024) -> None:
+        self._use_bloom = bloom
+        self._count = 0
+        self._allocate(capacity)
+        self.update(keys)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        return self._find(key_digest(key)) is not None
+
+    def might_contain(self, key: str) -> bool:
+        """Cheap pre-check: ``False`` means the key is definitely absent."""
+        if self._bloom is None:
+            return key in self
+        return self._bloom.might_contain(key_digest(key))
+
+    def add(self, key: str) -> bool:
+        """Insert ``key``; return ``False`` when it was already present."""
+        return self._insert(key_digest(key))
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    @property
+    def nbytes(self) -> int:
+        size = self._slots.itemsize * len(self._slots)
+        return size + (self._bloom.nbytes if self._bloom else 0)
+
+    def _allocate(self, capacity: int) -> None:
+        size = 8
+        while size * _MAX_LOAD < capacity:
+            size *= 2
+        self._slots = array("Q", [_EMPTY]) * size
+        self._mask = size - 1
+        self._bloom: Optional[BloomFilter] = BloomFilter(int(size * _MAX_LOAD)) if self._use_bloom else None
+
+    def _find(self, digest: int) -> Optional[int]:
+        index = digest & self._mask
+        while True:
+            slot = self._slots[index]
+            if slot == digest:
+                return index
+            if slot == _EMPTY:
+                return None
+            index = (index + 1) & self._mask
+
+    def _insert(self, digest: int) -> bool:
+        index = digest & self._mask
+        while True:
+            slot = self._slots[index]
+            if slot == digest:
+                return False
+            if slot == _EMPTY:
+                break
+            index = (index + 1) & self._mask
+        self._slots[index] = digest
+        self._count += 1
+        if self._bloom is not None:
+            self._bloom.add(digest)
+        if self._count > len(self._slots) * _MAX_LOAD:
+            self._grow()
+        return True
+
+    def _grow(self) -> None:
+        digests = [slot for slot in self._slots if slot != _EMPTY]
+        self._count = 0
+        self._allocate(len(digests) * 2)
+        for digest in digests:
+            self._insert(digest)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from .tracing import current_span
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s %(name)s: %(message)s"
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the interaction ID of the trace active in the calling task."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = getattr(current_span(), "trace_id", None)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            payload["request_id"] = request_id
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def build_file_handler(
+    path: Path,
+    *,
+    max_bytes: int = 0,
+    rotate_when: Optional[str] = None,
+    backups: int = 5,
+) -> logging.Handler:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if rotate_when:
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=rotate_when, backupCount=backups, encoding="utf-8", utc=True
+        )
+    if max_bytes:
+        return logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+    return logging.FileHandler(path, encoding="utf-8")
+
+
+def setup_queue_logging(
+    handlers: List[logging.Handler],
+    *,
+    level: str | int = logging.INFO,
+    json_format: bool = False,
+) -> logging.handlers.QueueListener:
+    """Route root logging through a queue so the event loop never waits on I/O.
+
+    The caller-side ``QueueHandler`` only enqueues the record; ``handlers`` run
+    on the listener's background thread. Returns the started listener; stop it
+    on shutdown to flush pending records.
+    """
+    formatter: logging.Formatter = JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+        existing.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import abc
+import bisect
+import math
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Minimal Prometheus text-format metrics (no client library needed). Metrics
+# are module-level and exposed by HealthServer on ``/metrics``.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SLOW_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric(abc.ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]: ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._bounds = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (+Inf last), sum, count.
+        self._series: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self._bounds) + 1), [0.0, 0.0])
+            series[0][index] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return int(series[1][1]) if series else 0
+
+    def _samples(self) -> List[str]:
+        lines: List[str] = []
+        with self._lock:
+            items = sorted((key, (list(buckets), list(totals))) for key, (buckets, totals) in self._series.items())
+        for key, (buckets, (total, count)) in items:
+            cumulative = 0
+            for bound, bucket in zip(self._bounds + (math.inf,), buckets):
+                cumulative += bucket
+                lines.append(
+                    f"{self.name}_bucket{self._labels(key, [('le', _format_value(bound))])} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {_format_value(count)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets=buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PAGE_FETCH_SECONDS = REGISTRY.histogram(
+    "jobbot_page_fetch_seconds", "Time spent downloading job pages.", ["outcome"]
+)
+PAGE_EXTRACT_SECONDS = REGISTRY.histogram(
+    "jobbot_page_extract_seconds", "Time spent extracting text from downloaded HTML."
+)
+IMAGE_FETCH_SECONDS = REGISTRY.histogram(
+    "jobbot_image_fetch_seconds", "Time spent downloading job images.", ["outcome"]
+)
+OPENAI_REQUEST_SECONDS = REGISTRY.histogram(
+    "jobbot_openai_request_seconds",
+    "OpenAI request latency.",
+    ["kind", "outcome"],
+    buckets=SLOW_BUCKETS,
+)
+OPENAI_TOKENS = REGISTRY.counter(
+    "jobbot_openai_tokens_total", "Tokens reported by OpenAI responses.", ["kind", "direction"]
+)
+DISCORD_SEND_SECONDS = REGISTRY.histogram(
+    "jobbot_discord_send_seconds", "Latency of posting a job embed to Discord.", ["outcome"]
+)
+JOBS_POSTED = REGISTRY.counter("jobbot_jobs_posted_total", "Jobs posted to Discord.")
+DUPLICATES_SKIPPED = REGISTRY.counter(
+    "jobbot_duplicates_skipped_total",
+    "Jobs or links skipped as duplicates (history, near_duplicate, link).",
+    ["reason"],
+)
+RETRY_BACKLOG = REGISTRY.gauge("jobbot_retry_backlog", "Pending requests that can still be retried.")
+RETRY_IN_FLIGHT = REGISTRY.gauge("jobbot_retry_in_flight", "Requests currently being processed.")
+RETRY_FAILURES = REGISTRY.counter(
+    "jobbot_retry_failures_total", "Failed request attempts (scheduled or exhausted).", ["outcome"]
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "jobbot_cache_requests_total", "Cache lookups by cache and result (hit/miss).", ["cache", "result"]
+)
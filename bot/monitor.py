@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import math
+import sys
+import threading
+import time
+import traceback
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from .metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from discord.ext import commands
+
+    from .retry import RetryManager
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_SECONDS = REGISTRY.gauge("jobbot_event_loop_lag_seconds", "Latest event loop scheduling lag.")
+LOOP_LAG_HISTOGRAM = REGISTRY.histogram(
+    "jobbot_event_loop_lag_sample_seconds", "Event loop scheduling lag samples."
+)
+SLOW_CALLBACKS = REGISTRY.counter(
+    "jobbot_slow_callbacks_total", "Times the event loop was blocked past the slow-callback threshold."
+)
+GATEWAY_LATENCY_SECONDS = REGISTRY.gauge(
+    "jobbot_gateway_latency_seconds", "Discord gateway heartbeat latency (NaN while disconnected)."
+)
+
+
+class LoopMonitor:
+    """Samples event loop lag and reports callbacks that block the loop.
+
+    A sampler task sleeps ``interval`` seconds and records how late it wakes
+    up. A watchdog thread checks the sampler's deadline; when the loop is
+    stuck for longer than ``slow_callback`` seconds it logs the stack of the
+    loop thread, naming the coroutine that is hogging it.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float = 0.5,
+        slow_callback: float = 0.5,
+        gateway_latency: Optional[Callable[[], float]] = None,
+    ) -> None:
+        self._interval = interval
+        self._slow_callback = slow_callback
+        self._gateway_latency = gateway_latency
+        self._task: Optional[asyncio.Task[None]] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._deadline = 0.0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._deadline = time.monotonic() + self._interval
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._sample())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def gateway_latency(self) -> float:
+        if self._gateway_latency is None:
+            return math.nan
+        try:
+            return float(self._gateway_latency())
+        except Exception:  # noqa: BLE001
+            return math.nan
+
+    def current_lag(self) -> float:
+        """Lag of the last sample, or how long the loop is stuck right now."""
+        return max(self.lag, time.monotonic() - self._deadline) if self._task else self.lag
+
+    async def _sample(self) -> None:
+        while True:
+            self._deadline = time.monotonic() + self._interval
+            await asyncio.sleep(self._interval)
+            lag = max(time.monotonic() - self._deadline, 0.0)
+            self.lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG_SECONDS.set(lag)
+            LOOP_LAG_HISTOGRAM.observe(lag)
+            GATEWAY_LATENCY_SECONDS.set(self.gateway_latency())
+
+    def _watch(self) -> None:
+        reported_deadline = 0.0
+        check_every = max(self._slow_callback / 4, 0.01)
+        while not self._stop.wait(check_every):
+            deadline = self._deadline
+            blocked = time.monotonic() - deadline
+            if blocked < self._slow_callback or deadline == reported_deadline:
+                continue
+            reported_deadline = deadline
+            SLOW_CALLBACKS.inc()
+            coroutines, stack = self._loop_stack()
+            logger.warning(
+                "🐢 Event loop blocked for %.2fs in %s\n%s",
+                blocked,
+                " → ".join(coroutines) or "a non-coroutine callback",
+                stack,
+            )
+
+    def _loop_stack(self) -> Tuple[List[str], str]:
+        frame = sys._current_frames().get(self._loop_thread_id or 0)  # noqa: SLF001
+        if frame is None:
+            return [], ""
+        coroutines = []
+        cursor = frame
+        while cursor is not None:
+            if cursor.f_code.co_flags & inspect.CO_COROUTINE:
+                coroutines.append(cursor.f_code.co_qualname)
+            cursor = cursor.f_back
+        stack = "".join(traceback.format_stack(frame, limit=8))
+        return list(reversed(coroutines)), stack
+
+
+class ReadinessProbe:
+    """Decides whether this instance should receive work (``/ready``)."""
+
+    def __init__(
+        self,
+        bot: "commands.Bot",
+        monitor: LoopMonitor,
+        retry_manager: Optional["RetryManager"] = None,
+        *,
+        max_loop_lag: float = 1.0,
+        max_gateway_latency: float = 10.0,
+        max_retry_due: int = 50,
+    ) -> None:
+        self._bot = bot
+        self._monitor = monitor
+        self._retry_manager = retry_manager
+        self._max_loop_lag = max_loop_lag
+        self._max_gateway_latency = max_gateway_latency
+        self._max_retry_due = max_retry_due
+
+    async def check(self) -> Tuple[bool, Dict[str, Any]]:
+        failures: List[str] = []
+        lag = self._monitor.current_lag()
+        if lag > self._max_loop_lag:
+            failures.append(f"event loop lag {lag:.2f}s > {self._max_loop_lag}s")
+
+        gateway_ready = self._bot.is_ready() and not self._bot.is_closed()
+        latency = self._monitor.gateway_latency()
+        if not gateway_ready:
+            failures.append("gateway not connected")
+        elif not math.isfinite(latency) or latency > self._max_gateway_latency:
+            failures.append(f"gateway latency {latency:.2f}s > {self._max_gateway_latency}s")
+
+        details: Dict[str, Any] = {
+            "loop_lag_seconds": round(lag, 4),
+            "max_loop_lag_seconds": round(self._monitor.max_lag, 4),
+            "gateway_ready": gateway_ready,
+            "gateway_latency_seconds": round(latency, 4) if math.isfinite(latency) else None,
+        }
+        warmup = getattr(self._bot, "warmup", None)
+        if warmup is not None and warmup.pending():
+            details["warmup_pending"] = warmup.pending()
+            failures.append(f"warming up: {', '.join(warmup.pending())}")
+        if self._retry_manager is not None:
+            stats = await self._retry_manager.stats()
+            details["retry_due"] = stats.due
+            details["retry_in_flight"] = stats.in_flight
+            if stats.due > self._max_retry_due:
+                failures.append(f"retry queue depth {stats.due} > {self._max_retry_due}")
+
+        details["status"] = "ready" if not failures else "unavailable"
+        if failures:
+            details["failures"] = failures
+        return not failures, details
@@ -2,13 +2,20 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any, Dict, Iterable, List
-
-from openai import OpenAI
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
 
+from .capture import capture_model_output
 from .config import OpenAIConfig
+from .metrics import OPENAI_REQUEST_SECONDS, OPENAI_TOKENS
+from .tracing import start_span
+from .usage import UsageLedger, usage_owner
 from .utils import run_blocking
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 logger = logging.getLogger(__name__)
 
 SYSTEM_PROMPT = (
@@ -33,21 +40,42 @@ IMAGE_PROMPT_TEMPLATE = (
 )
 
 MAX_PROMPT_CHARS = 6000
+# Keys the model sometimes wraps the job list in.
+WRAPPER_KEYS = ("jobs", "results")
+# Rough characters per token for English prompts, used to estimate image tokens.
+CHARS_PER_TOKEN = 4
 
 
 class OpenAIJobParser:
-    def __init__(self, config: OpenAIConfig) -> None:
-        self._client = OpenAI(api_key=config.api_key)
+    def __init__(self, config: OpenAIConfig, *, usage_ledger: Optional[UsageLedger] = None) -> None:
+        # The openai package is slow to import; build the client on first use,
+        # off the event loop, so startup does not pay for it.
+        self._client: Optional[OpenAI] = None
+        self._client_lock = threading.Lock()
+        self._usage_ledger = usage_ledger
         self._text_model = config.model
         self._image_model = config.image_model or config.model
         self._config = config
 
+    def _get_client(self) -> OpenAI:
+        with self._client_lock:
+            if self._client is None:
+                from openai import OpenAI
+
+                self._client = OpenAI(api_key=self._config.api_key, base_url=self._config.base_url)
+            return self._client
+
+    async def warm_up(self) -> None:
+        """Build the client (and its connection pool) ahead of the first request."""
+        await run_blocking(self._get_client)
+
     async def parse_from_text(self, *, content: str, url: str) -> List[Dict[str, Any]]:
         if not content:
             return []
         prompt = TEXT_PROMPT_TEMPLATE.format(url=url, content=content[:MAX_PROMPT_CHARS])
         messages = _build_text_messages(prompt)
-        raw_text = await self._call_openai(messages, model=self._text_model)
+        raw_text = await self._call_openai(messages, model=self._text_model, kind="text")
+        capture_model_output("text", url, raw_text)
         return _extract_jobs(raw_text)
 
     async def parse_from_image(self, *, image_url: str, url: str) -> List[Dict[str, Any]]:
@@ -55,26 +83,78 @@ class OpenAIJobParser:
             return []
         prompt = IMAGE_PROMPT_TEMPLATE.format(url=url)
         messages = _build_image_messages(prompt, image_url)
-        raw_text = await self._call_openai(messages, model=self._image_model)
+        raw_text = await self._call_openai(messages, model=self._image_model, kind="image")
+        capture_model_output("image", url, raw_text)
         return _extract_jobs(raw_text)
 
-    async def _call_openai(self, messages: Iterable[Dict[str, Any]], *, model: str) -> str:
-        def _send_request() -> str:
-            response = self._client.responses.create(
+    async def _call_openai(
+        self,
+        messages: Iterable[Dict[str, Any]],
+        *,
+        model: str,
+        kind: str = "text",
+    ) -> str:
+        messages = list(messages)
+
+        def _send_request():
+            return self._get_client().responses.create(
                 model=model,
                 temperature=self._config.temperature,
-                input=list(messages),
+                input=messages,
                 max_output_tokens=1200,
             )
-            return response.output_text
 
+        span = start_span("openai.request", model=model, kind=kind)
+        started = time.perf_counter()
         try:
-            raw_text = await run_blocking(_send_request)
-            logger.info("🤖 OpenAI responded with %s characters", len(raw_text))
-            return raw_text
+            response = await run_blocking(_send_request)
+            raw_text = response.output_text
         except Exception as exc:  # noqa: BLE001
+            OPENAI_REQUEST_SECONDS.observe(time.perf_counter() - started, kind=kind, outcome="error")
+            span.end(exc)
             logger.error("🚫 OpenAI request failed: %s", exc)
             return ""
+        latency = time.perf_counter() - started
+        OPENAI_REQUEST_SECONDS.observe(latency, kind=kind, outcome="ok")
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        OPENAI_TOKENS.inc(input_tokens, kind=kind, direction="input")
+        OPENAI_TOKENS.inc(output_tokens, kind=kind, direction="output")
+        span.set(input_tokens=input_tokens, output_tokens=output_tokens)
+        span.end()
+        if self._usage_ledger is not None:
+            guild_id, user_id = usage_owner()
+            await self._usage_ledger.record(
+                model=model,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                image_tokens=_image_tokens(usage, input_tokens, messages) if kind == "image" else 0,
+                latency=latency,
+                guild_id=guild_id,
+                user_id=user_id,
+            )
+        logger.info("🤖 OpenAI responded with %s characters", len(raw_text))
+        return raw_text
+
+
+def _image_tokens(usage: Any, input_tokens: int, messages: Iterable[Dict[str, Any]]) -> int:
+    """Input tokens spent on images: reported by the API when available, else estimated.
+
+    The estimate subtracts the text parts of the prompt (about ``CHARS_PER_TOKEN``
+    characters per token) from the billed input.
+    """
+    reported = getattr(getattr(usage, "input_tokens_details", None), "image_tokens", None)
+    if isinstance(reported, int):
+        return reported
+    text_chars = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            text_chars += len(content)
+        elif isinstance(content, list):
+            text_chars += sum(len(part.get("text", "")) for part in content if part.get("type") == "input_text")
+    return max(input_tokens - text_chars // CHARS_PER_TOKEN, 0)
 
 
 def _build_text_messages(prompt: str) -> List[Dict[str, Any]]:
@@ -97,38 +177,60 @@ def _build_image_messages(prompt: str, image_url: str) -> List[Dict[str, Any]]:
     ]
 
 
-def _extract_jobs(text: str) -> List[Dict[str, Any]]:
-    if not text:
-        return []
-    text = text.strip()
-    if text.startswith("```"):
-        text = "\n".join(line for line in text.splitlines() if not line.strip().startswith("```"))
-        text = text.strip()
+def _parse_json_slice(text: str) -> Any:
+    """Parse the JSON array (or lone object) embedded in surrounding prose."""
     start = text.find("[")
     end = text.rfind("]")
-    if start == -1 or end == -1:
+    obj_first = text.find("{")
+    # A lone object may itself contain arrays (e.g. "skills"); don't mistake those for the payload.
+    if start == -1 or end == -1 or -1 < obj_first < start:
         # Fallback to single object parsing
         obj_start = text.find("{")
         obj_end = text.rfind("}")
         if obj_start == -1 or obj_end == -1:
             preview = text[:200].replace("\n", " ")
             logger.warning("⚠️ No JSON payload detected in OpenAI response (preview: %s...)", preview)
-            return []
+            return None
         json_str = text[obj_start : obj_end + 1]
     else:
         json_str = text[start : end + 1]
 
     try:
-        data = json.loads(json_str)
+        return json.loads(json_str)
     except json.JSONDecodeError as exc:
         logger.warning(
             "⚠️ Failed to parse OpenAI JSON: %s | snippet=%s",
             exc,
             json_str[:200].replace("\n", " "),
         )
+        return None
+
+
+def _extract_jobs(text: str) -> List[Dict[str, Any]]:
+    if not text:
         return []
+    text = text.strip()
+    if text.startswith("```"):
+        text = "\n".join(line for line in text.splitlines() if not line.strip().startswith("```"))
+        text = text.strip()
+    data = None
+    if text[:1] in ("{", "["):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            pass
+    if data is None:
+        # Prose around the JSON, or trailing garbage: parse the embedded payload.
+        data = _parse_json_slice(text)
+        if data is None:
+            return []
 
     if isinstance(data, dict):
+        # Wrapped outputs such as {"jobs": [...]}.
+        for key in WRAPPER_KEYS:
+            items = data.get(key)
+            if isinstance(items, list) and all(isinstance(item, dict) for item in items):
+                return items
         return [data]
     if isinstance(data, list):
         jobs = [item for item in data if isinstance(item, dict)]
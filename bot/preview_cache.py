@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .metrics import CACHE_REQUESTS
+from .urls import canonicalize_url
+from .utils import extract_image_urls, extract_urls
+
+CacheKey = Tuple[int, str, bool]
+
+
+def normalize_reference(reference: str) -> Optional[str]:
+    """The sources a reference points at, independent of wording, order and tracking noise."""
+    text = reference.strip()
+    image_urls = extract_image_urls(text)
+    sources = {f"page {canonicalize_url(url)}" for url in extract_urls(text) if url not in image_urls}
+    sources.update(f"image {url}" for url in image_urls)
+    return "\n".join(sorted(sources)) or None
+
+
+@dataclass(slots=True)
+class _Entry:
+    jobs: List[Dict[str, object]]
+    issues: List[str]
+    expires_at: float
+    size: int
+
+
+class PreviewCache:
+    """Short-lived results of ``/jobbot preview``, reused by a matching ``/jobbot post``.
+
+    Keyed by guild, normalised reference and ``force``; bounded by entry count
+    and by the JSON size of the cached jobs, evicting least recently stored
+    entries first. A post takes the entry out so it is only reused once.
+    """
+
+    def __init__(self, *, ttl: float = 900.0, max_entries: int = 256, max_bytes: int = 5_000_000) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def put(
+        self,
+        guild_id: int,
+        reference: str,
+        force: bool,
+        jobs: List[Dict[str, object]],
+        issues: List[str],
+    ) -> bool:
+        normalized = normalize_reference(reference)
+        if normalized is None or not jobs:
+            return False
+        key = (guild_id, normalized, force)
+        size = len(json.dumps(jobs, default=str)) + sum(len(issue) for issue in issues)
+        self._drop(key)
+        if size > self._max_bytes:
+            return False
+        self._purge_expired()
+        self._entries[key] = _Entry(deepcopy(jobs), list(issues), time.monotonic() + self._ttl, size)
+        self._bytes += size
+        while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+            self._drop(next(iter(self._entries)))
+        return True
+
+    def take(self, guild_id: int, reference: str, force: bool) -> Optional[Tuple[List[Dict[str, object]], List[str]]]:
+        normalized = normalize_reference(reference)
+        entry = self._drop((guild_id, normalized, force)) if normalized else None
+        if entry is None or entry.expires_at <= time.monotonic():
+            CACHE_REQUESTS.inc(cache="preview", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="preview", result="hit")
+        return entry.jobs, entry.issues
+
+    def _drop(self, key: CacheKey) -> Optional[_Entry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _purge_expired(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, entry in self._entries.items() if entry.expires_at <= now]:
+            self._drop(key)
@@ -3,10 +3,17 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+import os
+import queue
+import random
+import threading
 import time
-from dataclasses import asdict, dataclass
+from copy import deepcopy
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
-from typing import List
+from typing import IO, Any, Dict, List, Optional, Set, Union
+
+from .metrics import RETRY_BACKLOG, RETRY_FAILURES, RETRY_IN_FLIGHT
 
 logger = logging.getLogger(__name__)
 
@@ -20,19 +27,75 @@ class PendingRequest:
     created_at: float
     attempts: int = 0
     last_error: str | None = None
+    next_attempt_at: float = 0.0
+    force: bool = False
+    # Stage checkpoints: parsed jobs per source URL and history keys already posted.
+    parsed_sources: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    posted_keys: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class RetryStats:
+    backlog: int
+    due: int
+    in_flight: int
+    exhausted: int
+    lag_seconds: float
 
 
 class RetryManager:
-    def __init__(self, storage_path: Path, *, max_attempts: int = 3) -> None:
+    """Tracks slash-command requests until they complete.
+
+    Entries live in an in-memory index. Every change is appended to a JSON-lines
+    journal next to the snapshot file, and the snapshot is rewritten atomically
+    on startup (when the journal has records) and whenever the journal grows
+    past ``compact_threshold`` records. Journal appends and snapshots are
+    written by a background thread that fsyncs at most every
+    ``fsync_interval`` seconds, so the event loop never waits on the disk.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path,
+        *,
+        max_attempts: int = 3,
+        base_delay: float = 30.0,
+        max_delay: float = 3600.0,
+        jitter: float = 0.2,
+        fsync_interval: float = 1.0,
+        compact_threshold: int = 1000,
+    ) -> None:
         self._storage_path = storage_path
+        self._journal_path = storage_path.with_name(storage_path.name + ".journal")
         self._max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._jitter = jitter
+        self._fsync_interval = fsync_interval
+        self._compact_threshold = compact_threshold
         self._lock = asyncio.Lock()
+        # Requests currently being processed by this process (live or retry).
+        self._active: Set[int] = set()
+        self._journal: Optional[IO[str]] = None
+        self._journal_records = 0
+        # Journal lines, snapshots (lists), flush markers (Event) and the stop sentinel (None).
+        self._writes: "queue.SimpleQueue[Union[str, List[dict], threading.Event, None]]" = queue.SimpleQueue()
         storage_path.parent.mkdir(parents=True, exist_ok=True)
+        self._entries: Dict[int, PendingRequest] = self._recover()
+        self._writer = threading.Thread(target=self._run_writer, name="retry-journal", daemon=True)
+        self._writer.start()
+        if self._journal_path.exists() and self._journal_path.stat().st_size:
+            self._compact()
+        self._update_gauges()
 
     @property
     def max_attempts(self) -> int:
         return self._max_attempts
 
+    def backoff_delay(self, attempts: int) -> float:
+        delay = min(self._max_delay, self._base_delay * 2 ** max(attempts - 1, 0))
+        return delay * random.uniform(1 - self._jitter, 1 + self._jitter)
+
     async def start_request(
         self,
         *,
@@ -40,86 +103,321 @@ class RetryManager:
         guild_id: int,
         user_id: int,
         reference: str,
+        force: bool = False,
     ) -> None:
         async with self._lock:
-            entries = self._load()
-            for entry in entries:
-                if entry.request_id == request_id:
-                    entry.reference = reference
-                    entry.guild_id = guild_id
-                    entry.user_id = user_id
-                    break
+            self._active.add(request_id)
+            entry = self._entries.get(request_id)
+            if entry:
+                entry.reference = reference
+                entry.guild_id = guild_id
+                entry.user_id = user_id
+                entry.force = force
             else:
-                entries.append(
-                    PendingRequest(
-                        request_id=request_id,
-                        guild_id=guild_id,
-                        user_id=user_id,
-                        reference=reference,
-                        created_at=time.time(),
-                    )
+                entry = PendingRequest(
+                    request_id=request_id,
+                    guild_id=guild_id,
+                    user_id=user_id,
+                    reference=reference,
+                    created_at=time.time(),
+                    force=force,
                 )
-            self._save(entries)
+                self._entries[request_id] = entry
+            self._put(entry)
+            self._update_gauges()
 
     async def complete_request(self, request_id: int) -> None:
         async with self._lock:
-            entries = self._load()
-            new_entries = [entry for entry in entries if entry.request_id != request_id]
-            if len(new_entries) != len(entries):
+            self._active.discard(request_id)
+            if self._entries.pop(request_id, None) is not None:
                 logger.debug("✅ Cleared pending request %s", request_id)
-                self._save(new_entries)
+                self._append({"op": "delete", "request_id": request_id})
+            self._update_gauges()
 
     async def fail_request(self, request_id: int, error: str) -> None:
         async with self._lock:
-            entries = self._load()
-            updated = False
-            for entry in entries:
-                if entry.request_id == request_id:
-                    entry.attempts += 1
-                    entry.last_error = error[:500]
-                    updated = True
+            self._active.discard(request_id)
+            now = time.time()
+            entry = self._entries.get(request_id)
+            if entry:
+                entry.attempts += 1
+                entry.last_error = error[:500]
+                entry.next_attempt_at = now + self.backoff_delay(entry.attempts)
+                if entry.attempts >= self._max_attempts:
+                    RETRY_FAILURES.inc(outcome="exhausted")
                     logger.warning(
-                        "⚠️ Pending request %s failed (attempt %s/%s): %s",
+                        "⚠️ Giving up on pending request %s after %s attempts: %s",
                         request_id,
                         entry.attempts,
-                        self._max_attempts,
                         entry.last_error,
                     )
-                    break
-            if not updated:
-                entries.append(
-                    PendingRequest(
-                        request_id=request_id,
-                        guild_id=0,
-                        user_id=0,
-                        reference="",
-                        created_at=time.time(),
-                        attempts=1,
-                        last_error=error[:500],
+                else:
+                    RETRY_FAILURES.inc(outcome="scheduled")
+                    logger.warning(
+                        "⚠️ Pending request %s failed (attempt %s/%s), next try in %.0fs: %s",
+                        request_id,
+                        entry.attempts,
+                        self._max_attempts,
+                        entry.next_attempt_at - now,
+                        entry.last_error,
                     )
+            else:
+                entry = PendingRequest(
+                    request_id=request_id,
+                    guild_id=0,
+                    user_id=0,
+                    reference="",
+                    created_at=now,
+                    attempts=1,
+                    last_error=error[:500],
+                    next_attempt_at=now + self.backoff_delay(1),
                 )
-            self._save(entries)
+                self._entries[request_id] = entry
+                RETRY_FAILURES.inc(outcome="scheduled")
+            self._put(entry)
+            self._update_gauges()
+
+    async def defer_request(self, request_id: int, *, until: float, reason: str) -> None:
+        """Postpone a request without spending one of its attempts."""
+        async with self._lock:
+            self._active.discard(request_id)
+            entry = self._entries.get(request_id)
+            if entry is None:
+                return
+            entry.next_attempt_at = until
+            entry.last_error = reason[:500]
+            self._put(entry)
+            self._update_gauges()
+            logger.info("⏳ Deferred pending request %s until %s: %s", request_id, time.ctime(until), reason)
+
+    async def record_source(
+        self,
+        request_id: int,
+        url: str,
+        *,
+        jobs: List[Dict[str, Any]],
+        text_hash: Optional[str] = None,
+    ) -> None:
+        """Checkpoint the parsed jobs of one source so a retry can skip fetch + parse."""
+        async with self._lock:
+            entry = self._entries.get(request_id)
+            if entry is None:
+                return
+            source = {"text_hash": text_hash, "jobs": deepcopy(jobs)}
+            entry.parsed_sources[url] = source
+            self._append({"op": "source", "request_id": request_id, "url": url, "source": source})
+
+    async def record_posted(self, request_id: int, key: str) -> None:
+        """Checkpoint a job that reached Discord so a retry doesn't post it again."""
+        async with self._lock:
+            entry = self._entries.get(request_id)
+            if entry is None or not key or key in entry.posted_keys:
+                return
+            entry.posted_keys.append(key)
+            self._append({"op": "posted", "request_id": request_id, "key": key})
 
     async def list_pending_requests(self) -> List[PendingRequest]:
         async with self._lock:
-            return self._load()
+            return [deepcopy(entry) for entry in self._entries.values()]
 
-    def _load(self) -> List[PendingRequest]:
-        if not self._storage_path.exists():
-            return []
-        try:
-            raw = json.loads(self._storage_path.read_text())
-        except (json.JSONDecodeError, OSError):
-            logger.warning("⚠️ Could not read retry storage. Resetting %s", self._storage_path)
-            return []
-        entries: List[PendingRequest] = []
-        for item in raw:
+    async def claim_due_requests(
+        self,
+        *,
+        limit: Optional[int] = None,
+        now: Optional[float] = None,
+    ) -> List[PendingRequest]:
+        """Return retryable entries whose backoff elapsed and mark them in flight."""
+        now = time.time() if now is None else now
+        async with self._lock:
+            due = [
+                entry
+                for entry in self._entries.values()
+                if self._is_due(entry, now)
+            ]
+            due.sort(key=lambda entry: entry.next_attempt_at)
+            if limit is not None:
+                due = due[:limit]
+            self._active.update(entry.request_id for entry in due)
+            self._update_gauges()
+            return [deepcopy(entry) for entry in due]
+
+    async def stats(self, *, now: Optional[float] = None) -> RetryStats:
+        now = time.time() if now is None else now
+        async with self._lock:
+            entries = list(self._entries.values())
+            exhausted = sum(1 for entry in entries if entry.attempts >= self._max_attempts)
+            due = [entry for entry in entries if self._is_due(entry, now)]
+            # Entries stored before scheduling existed have no next_attempt_at.
+            lag = max(
+                (now - (entry.next_attempt_at or entry.created_at) for entry in due),
+                default=0.0,
+            )
+            return RetryStats(
+                backlog=len(entries) - exhausted,
+                due=len(due),
+                in_flight=len(self._active),
+                exhausted=exhausted,
+                lag_seconds=max(lag, 0.0),
+            )
+
+    def flush(self) -> None:
+        """Block until every change so far is written and fsynced."""
+        if not self._writer.is_alive():
+            return
+        done = threading.Event()
+        self._writes.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join()
+
+    def _update_gauges(self) -> None:
+        backlog = sum(1 for entry in self._entries.values() if entry.attempts < self._max_attempts)
+        RETRY_BACKLOG.set(backlog)
+        RETRY_IN_FLIGHT.set(len(self._active))
+
+    def _is_due(self, entry: PendingRequest, now: float) -> bool:
+        return (
+            entry.request_id not in self._active
+            and entry.attempts < self._max_attempts
+            and entry.next_attempt_at <= now
+        )
+
+    def _put(self, entry: PendingRequest) -> None:
+        self._append({"op": "put", "entry": asdict(entry)})
+
+    def _append(self, record: dict) -> None:
+        self._writes.put(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal_records += 1
+        if self._journal_records >= self._compact_threshold:
+            self._compact()
+
+    def _run_writer(self) -> None:
+        dirty = False
+        last_sync = time.monotonic()
+        while True:
+            timeout = max(self._fsync_interval - (time.monotonic() - last_sync), 0.0) if dirty else None
+            try:
+                items = [self._writes.get(timeout=timeout)]
+            except queue.Empty:
+                items = []
+            while True:
+                try:
+                    items.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            lines: List[str] = []
+            try:
+                for item in items:
+                    if isinstance(item, list):
+                        # The snapshot already contains every earlier journal record.
+                        lines = []
+                        self._write_snapshot(item)
+                        dirty = False
+                    elif isinstance(item, str):
+                        lines.append(item)
+                if lines:
+                    self._write_journal(lines)
+                    dirty = True
+                now = time.monotonic()
+                flushing = any(item is None or isinstance(item, threading.Event) for item in items)
+                if dirty and (flushing or now - last_sync >= self._fsync_interval):
+                    assert self._journal is not None
+                    os.fsync(self._journal.fileno())
+                    dirty = False
+                    last_sync = now
+            except OSError:
+                logger.exception("🚫 Could not write retry journal %s", self._journal_path)
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in items:
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                return
+
+    def _write_journal(self, lines: List[str]) -> None:
+        if self._journal is None:
+            self._journal = self._journal_path.open("a", encoding="utf-8")
+        self._journal.write("".join(lines))
+        self._journal.flush()
+
+    def _recover(self) -> Dict[int, PendingRequest]:
+        entries: Dict[int, PendingRequest] = {}
+        if self._storage_path.exists():
             try:
-                entries.append(PendingRequest(**item))
-            except TypeError:
-                logger.debug("Skipping malformed retry entry: %s", item)
+                raw = json.loads(self._storage_path.read_text())
+            except (json.JSONDecodeError, OSError):
+                logger.warning("⚠️ Could not read retry storage. Resetting %s", self._storage_path)
+                raw = []
+            for item in raw:
+                entry = self._parse_entry(item)
+                if entry:
+                    entries[entry.request_id] = entry
+
+        if self._journal_path.exists():
+            with self._journal_path.open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-write; earlier records are intact.
+                        logger.warning("⚠️ Ignoring truncated retry journal record")
+                        continue
+                    if record.get("op") == "put":
+                        entry = self._parse_entry(record.get("entry"))
+                        if entry:
+                            entries[entry.request_id] = entry
+                    elif record.get("op") == "delete":
+                        entries.pop(record.get("request_id"), None)
+                    elif record.get("op") == "source":
+                        entry = entries.get(record.get("request_id"))
+                        if entry:
+                            entry.parsed_sources[record["url"]] = record["source"]
+                    elif record.get("op") == "posted":
+                        entry = entries.get(record.get("request_id"))
+                        if entry and record["key"] not in entry.posted_keys:
+                            entry.posted_keys.append(record["key"])
         return entries
 
-    def _save(self, entries: List[PendingRequest]) -> None:
-        data = [asdict(entry) for entry in entries]
-        self._storage_path.write_text(json.dumps(data, indent=2))
+    def _parse_entry(self, item) -> Optional[PendingRequest]:
+        try:
+            return PendingRequest(**item)
+        except TypeError:
+            logger.debug("Skipping malformed retry entry: %s", item)
+            return None
+
+    def _compact(self) -> None:
+        """Queue a fresh snapshot of the current entries; the writer then truncates the journal."""
+        self._writes.put([asdict(entry) for entry in self._entries.values()])
+        self._journal_records = 0
+
+    def _write_snapshot(self, data: List[dict]) -> None:
+        tmp_path = self._storage_path.with_name(self._storage_path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as handle:
+            json.dump(data, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self._storage_path)
+        _fsync_directory(self._storage_path.parent)
+        # Replaying the old journal over the new snapshot is idempotent, so a
+        # crash between the replace and the truncate is harmless.
+        if self._journal:
+            self._journal.close()
+        self._journal = self._journal_path.open("w", encoding="utf-8")
+
+
+def _fsync_directory(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. Windows cannot open directories
+        return
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover - not supported by every filesystem
+        pass
+    finally:
+        os.close(fd)
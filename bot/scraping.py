@@ -1,32 +1,60 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import Optional
 
-import httpx
-from bs4 import BeautifulSoup
+from .capture import capture_page
+from .metrics import IMAGE_FETCH_SECONDS, PAGE_EXTRACT_SECONDS, PAGE_FETCH_SECONDS
+from .utils import run_blocking
 
 logger = logging.getLogger(__name__)
 
 USER_AGENT = "la-commu-discord-bot/1.0 (+https://github.com/la-commu)"
 
 
+def _import_dependencies() -> None:
+    # httpx and bs4 are imported on first use to keep them off the startup path.
+    import bs4  # noqa: F401
+    import httpx  # noqa: F401
+
+
+async def preload_dependencies() -> None:
+    """Import the scraping dependencies off the event loop before the first fetch."""
+    await run_blocking(_import_dependencies)
+
+
 async def fetch_page_text(url: str, *, timeout: float, max_bytes: int) -> Optional[str]:
+    import httpx
+
     logger.info("🕸️ Fetching page: %s", url)
     headers = {"User-Agent": USER_AGENT}
+    started = time.perf_counter()
     try:
         async with httpx.AsyncClient(follow_redirects=True, timeout=timeout, headers=headers) as client:
             response = await client.get(url)
             response.raise_for_status()
     except Exception as exc:  # noqa: BLE001
+        PAGE_FETCH_SECONDS.observe(time.perf_counter() - started, outcome="error")
         logger.warning("⚠️ Failed to fetch %s: %s", url, exc)
         return None
+    PAGE_FETCH_SECONDS.observe(time.perf_counter() - started, outcome="ok")
+    capture_page(url, response.text)
 
-    content = response.text
+    started = time.perf_counter()
+    try:
+        return _extract_text(url, response.text, max_bytes)
+    finally:
+        PAGE_EXTRACT_SECONDS.observe(time.perf_counter() - started)
+
+
+def _extract_text(url: str, content: str, max_bytes: int) -> Optional[str]:
     if len(content) > max_bytes:
         logger.info("✂️ Trimming page content for %s to %s bytes", url, max_bytes)
         content = content[:max_bytes]
 
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(content, "html.parser")
     for tag in soup(["script", "style", "noscript", "svg", "img"]):
         tag.decompose()
@@ -40,15 +68,20 @@ async def fetch_page_text(url: str, *, timeout: float, max_bytes: int) -> Option
 
 
 async def fetch_image_bytes(url: str, *, timeout: float, max_bytes: int) -> Optional[bytes]:
+    import httpx
+
     logger.info("🖼️ Fetching image: %s", url)
     headers = {"User-Agent": USER_AGENT}
+    started = time.perf_counter()
     try:
         async with httpx.AsyncClient(follow_redirects=True, timeout=timeout, headers=headers) as client:
             response = await client.get(url)
             response.raise_for_status()
     except Exception as exc:  # noqa: BLE001
+        IMAGE_FETCH_SECONDS.observe(time.perf_counter() - started, outcome="error")
         logger.warning("⚠️ Failed to fetch image %s: %s", url, exc)
         return None
+    IMAGE_FETCH_SECONDS.observe(time.perf_counter() - started, outcome="ok")
 
     content = response.content
     if len(content) > max_bytes:
@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Set
+
+from .utils import locked_file, run_blocking
+
+if TYPE_CHECKING:
+    from .models import JobPosting
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+_TOKEN_REGEX = re.compile(r"[a-z0-9+#]+")
+
+# Title and company dominate the fingerprint so that two different roles at
+# the same studio with boilerplate descriptions stay apart.
+FIELD_WEIGHTS = {
+    "title": 4,
+    "company": 3,
+    "location": 1,
+    "summary": 1,
+}
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    return _TOKEN_REGEX.findall((text or "").lower())
+
+
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def simhash(features: Dict[str, int]) -> int:
+    """64-bit SimHash of weighted features; similar inputs differ in few bits."""
+    vector = [0] * FINGERPRINT_BITS
+    for feature, weight in features.items():
+        hashed = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            vector[bit] += weight if hashed >> bit & 1 else -weight
+    fingerprint = 0
+    for bit, value in enumerate(vector):
+        if value > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def job_features(job: "JobPosting") -> Dict[str, int]:
+    features: Counter[str] = Counter()
+    fields = {
+        "title": job.job_title,
+        "company": job.company_name,
+        "location": job.location,
+        "summary": job.description_summary,
+    }
+    for name, value in fields.items():
+        tokens = _tokens(value)
+        weight = FIELD_WEIGHTS[name]
+        for token in tokens:
+            features[f"{name}:{token}"] += weight
+        # Bigrams keep some word order, which separates e.g. "lead artist" from "artist lead".
+        for first, second in zip(tokens, tokens[1:]):
+            features[f"{name}:{first} {second}"] += weight
+    return dict(features)
+
+
+def job_fingerprint(job: "JobPosting") -> int:
+    return simhash(job_features(job))
+
+
+def _format_line(fingerprint: int, label: str, added_at: float) -> str:
+    return json.dumps({"fp": f"{fingerprint:016x}", "label": label, "at": added_at}) + "\n"
+
+
+def _parse_lines(data: bytes) -> List[tuple[int, str, float]]:
+    records = []
+    for line in data.decode("utf-8", errors="replace").splitlines():
+        try:
+            record = json.loads(line)
+            records.append((int(record["fp"], 16), record["label"], float(record["at"])))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return records
+
+
+class _Tail(NamedTuple):
+    """Log lines read from ``offset``; ``reset`` when the log was replaced and read from the start."""
+
+    reset: bool
+    records: List[tuple[int, str, float]]
+    offset: int
+    inode: Optional[int]
+
+
+@dataclass(slots=True)
+class SimilarMatch:
+    label: str
+    distance: int
+    added_at: float
+
+
+class SimilarityIndex:
+    """SimHash index of recently posted jobs with LSH banding.
+
+    Fingerprints are split into ``max_distance + 1`` bands; by the pigeonhole
+    principle two fingerprints within ``max_distance`` bits share at least one
+    band exactly, so a lookup only compares against jobs in matching buckets.
+    Entries older than ``window`` seconds are dropped, and ``storage_path``
+    (JSON lines) keeps the index across restarts.
+
+    With ``shared=True`` several bot processes use the same log: writes hold a
+    lock on a ``.lock`` file next to it, and lines appended by the other
+    processes are indexed before each lookup. Compaction on load replaces the
+    log, and the other processes then re-read it from the start.
+    """
+
+    def __init__(
+        self,
+        storage_path: Optional[Path] = None,
+        *,
+        max_distance: int = 3,
+        window: float = 90 * 86400,
+        max_entries: int = 50_000,
+        shared: bool = False,
+    ) -> None:
+        if not 0 <= max_distance < FINGERPRINT_BITS:
+            raise ValueError(f"max_distance must be between 0 and {FINGERPRINT_BITS - 1}, got {max_distance}")
+        self._storage_path = storage_path
+        self._shared = shared
+        self._max_distance = max_distance
+        self._window = window
+        self._max_entries = max_entries
+        band_count = max_distance + 1
+        self._band_bits = FINGERPRINT_BITS // band_count
+        self._band_count = band_count
+        self._entries: Dict[int, tuple[int, str, float]] = {}
+        self._buckets: Dict[tuple[int, int], Set[int]] = {}
+        self._next_id = 0
+        self._loaded = storage_path is None
+        # Serialises loading and log reads/appends; the index itself is only changed on the loop.
+        self._lock = asyncio.Lock()
+        # How far into the log (identified by its inode) lines have been indexed.
+        self._offset = 0
+        self._inode: Optional[int] = None
+
+    async def load(self) -> None:
+        """Read the fingerprint log off the event loop; concurrent callers share one read."""
+        if self._loaded:
+            return
+        async with self._lock:
+            if self._loaded:
+                return
+            self._apply(await run_blocking(self._read))
+            self._loaded = True
+        logger.info("🧬 Loaded %d job fingerprint(s) for near-duplicate detection", len(self._entries))
+
+    async def find(self, job: "JobPosting") -> Optional[SimilarMatch]:
+        await self.load()
+        if self._shared and self._storage_path is not None:
+            async with self._lock:
+                self._apply(await run_blocking(self._read_tail, self._offset, self._inode))
+        fingerprint = job_fingerprint(job)
+        cutoff = time.time() - self._window
+        candidates: Set[int] = set()
+        for band in self._bands(fingerprint):
+            candidates.update(self._buckets.get(band, ()))
+        best: Optional[SimilarMatch] = None
+        for entry_id in candidates:
+            other, label, added_at = self._entries[entry_id]
+            if added_at < cutoff:
+                continue
+            distance = (fingerprint ^ other).bit_count()
+            if distance <= self._max_distance and (best is None or distance < best.distance):
+                best = SimilarMatch(label=label, distance=distance, added_at=added_at)
+        return best
+
+    async def add(self, job: "JobPosting") -> None:
+        await self.load()
+        fingerprint = job_fingerprint(job)
+        label = f"{job.job_title} @ {job.company_name}"
+        if job.job_url:
+            label += f" ({job.job_url})"
+        added_at = time.time()
+        self._insert(fingerprint, label, added_at)
+        if self._storage_path is not None:
+            line = _format_line(fingerprint, label, added_at)
+            async with self._lock:
+                tail = await run_blocking(self._append, line, self._offset, self._inode)
+                self._apply(tail)
+            if tail.reset:
+                # The index was rebuilt from a log that didn't hold this job yet.
+                self._insert(fingerprint, label, added_at)
+
+    def _read(self) -> _Tail:
+        assert self._storage_path is not None
+        if not self._storage_path.exists():
+            return _Tail(True, [], 0, None)
+        cutoff = time.time() - self._window
+        # Compaction holds the lock so appends from other shard processes aren't lost.
+        with locked_file(self._lock_path):
+            records = [record for record in _parse_lines(self._storage_path.read_bytes()) if record[2] >= cutoff]
+            tmp_path = self._storage_path.with_name(f"{self._storage_path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text("".join(_format_line(*record) for record in records), encoding="utf-8")
+            tmp_path.replace(self._storage_path)
+            stat = self._storage_path.stat()
+        return _Tail(True, records, stat.st_size, stat.st_ino)
+
+    def _read_tail(self, offset: int, inode: Optional[int]) -> _Tail:
+        assert self._storage_path is not None
+        try:
+            handle = self._storage_path.open("rb")
+        except FileNotFoundError:
+            return _Tail(False, [], offset, inode)
+        with handle:
+            stat = os.fstat(handle.fileno())
+            reset = stat.st_ino != inode or stat.st_size < offset
+            start = 0 if reset else offset
+            handle.seek(start)
+            data = handle.read()
+        # A line without its newline is still being appended; read it next time.
+        complete = data.rfind(b"\n") + 1
+        return _Tail(reset, _parse_lines(data[:complete]), start + complete, stat.st_ino)
+
+    def _append(self, line: str, offset: int, inode: Optional[int]) -> _Tail:
+        assert self._storage_path is not None
+        with locked_file(self._lock_path):
+            # Index other processes' lines first, so this one is never read back.
+            tail = self._read_tail(offset, inode) if self._shared else _Tail(False, [], offset, inode)
+            with self._storage_path.open("ab") as handle:
+                handle.write(line.encode("utf-8"))
+                stat = os.fstat(handle.fileno())
+        return tail._replace(offset=stat.st_size, inode=stat.st_ino)
+
+    def _apply(self, tail: _Tail) -> None:
+        if tail.reset:
+            self._entries.clear()
+            self._buckets.clear()
+        for record in tail.records:
+            self._insert(*record)
+        self._offset, self._inode = tail.offset, tail.inode
+
+    @property
+    def _lock_path(self) -> Path:
+        assert self._storage_path is not None
+        return self._storage_path.with_name(self._storage_path.name + ".lock")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _bands(self, fingerprint: int) -> List[tuple[int, int]]:
+        mask = (1 << self._band_bits) - 1
+        bands = []
+        for index in range(self._band_count):
+            # The last band absorbs the leftover bits when 64 isn't divisible.
+            if index == self._band_count - 1:
+                value = fingerprint >> (index * self._band_bits)
+            else:
+                value = (fingerprint >> (index * self._band_bits)) & mask
+            bands.append((index, value))
+        return bands
+
+    def _insert(self, fingerprint: int, label: str, added_at: float) -> None:
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (fingerprint, label, added_at)
+        for band in self._bands(fingerprint):
+            self._buckets.setdefault(band, set()).add(entry_id)
+        while len(self._entries) > self._max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, entry_id: int) -> None:
+        fingerprint, _, _ = self._entries.pop(entry_id)
+        for band in self._bands(fingerprint):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[band]
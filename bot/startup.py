@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _process_age() -> float:
+    """Seconds since the process was created, or 0.0 when unknown (non-Linux)."""
+    try:
+        with open("/proc/self/stat", "r", encoding="ascii") as handle:
+            # The command name may contain spaces; fields are counted after its ")".
+            fields = handle.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime", "r", encoding="ascii") as handle:
+            uptime = float(handle.read().split()[0])
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return 0.0
+    return max(uptime - started, 0.0)
+
+
+class StartupTimer:
+    """Records named startup phases from process start until the bot is ready."""
+
+    def __init__(self) -> None:
+        # Interpreter startup happens before any of our code runs; count it too.
+        self._origin = time.perf_counter() - _process_age()
+        self._last = self._origin
+        self.phases: List[Tuple[str, float]] = []
+        self.logged = False
+
+    def mark(self, name: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @property
+    def elapsed(self) -> float:
+        return self._last - self._origin
+
+    def summary(self) -> str:
+        parts = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases)
+        return f"{self.elapsed:.2f}s ({parts})"
+
+    def log_once(self) -> None:
+        if not self.logged:
+            self.logged = True
+            logger.info("⏱️ Startup took %s", self.summary())
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Set, TypeVar, Union
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("jobbot_span", default=None)
+
+
+class Span:
+    """One timed operation in a request trace.
+
+    Spans are usable as context managers; the active span lives in a
+    ``ContextVar`` so child spans (and tasks spawned inside them) attach to
+    the right parent without threading objects through every call.
+    """
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start",
+        "duration",
+        "error",
+        "_started",
+        "_token",
+        "_root",
+        "_finished",
+        "_tracer",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        *,
+        trace_id: str,
+        parent: Optional["Span"],
+        attributes: Dict[str, Any],
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+        self._tracer = tracer
+        self._root: Span = parent._root if parent else self
+        self._finished: List[Span] = []
+        self._token: Optional[Token] = _current_span.set(self)
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.duration is not None:
+            return
+        self.duration = time.perf_counter() - self._started
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:
+                # Ended from another context (e.g. a callback); just drop it.
+                pass
+            self._token = None
+        self._root._finished.append(self)
+        if self._root is self:
+            self._tracer._finish(self, self._finished)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end(exc)
+
+
+class _NoopSpan:
+    """Returned outside of a trace so instrumented code never has to check."""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: List[Span]) -> None:
+        ...
+
+
+class JsonlSpanExporter:
+    """Appends finished spans to a JSON-lines file, rotating it at ``max_bytes``.
+
+    Spans are serialised on the caller and queued; a background thread batches
+    the writes and rotations, so the event loop never waits on the file.
+    """
+
+    def __init__(self, path: Path, *, max_bytes: int = 5_000_000, backups: int = 3) -> None:
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backups = backups
+        # Payload strings, flush markers (Event) and the stop sentinel (None).
+        self._queue: "queue.SimpleQueue[Union[str, threading.Event, None]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        self._queue.put("".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans))
+        if self._thread is None:
+            with self._thread_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+                    self._thread.start()
+
+    def flush(self) -> None:
+        """Block until every span exported so far is written."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self) -> None:
+        with self._thread_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            payload = "".join(item for item in items if isinstance(item, str))
+            if payload:
+                self._write(payload)
+            for item in items:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in items:
+                return
+
+    def _write(self, payload: str) -> None:
+        try:
+            if self._path.exists() and self._path.stat().st_size + len(payload) > self._max_bytes:
+                self._rotate()
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.write(payload)
+        except OSError as exc:
+            logger.warning("⚠️ Could not write traces to %s: %s", self._path, exc)
+
+    def _rotate(self) -> None:
+        for index in range(self._backups - 1, 0, -1):
+            source = self._path.with_name(f"{self._path.name}.{index}")
+            if source.exists():
+                os.replace(source, self._path.with_name(f"{self._path.name}.{index + 1}"))
+        os.replace(self._path, self._path.with_name(f"{self._path.name}.1"))
+
+
+class OtlpHttpExporter:
+    """Sends spans to an OpenTelemetry collector using OTLP/HTTP with JSON encoding."""
+
+    def __init__(self, endpoint: str, *, service_name: str = "la-commu-discord-bot", timeout: float = 5.0) -> None:
+        endpoint = endpoint.rstrip("/")
+        self._url = endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self._service_name = service_name
+        self._timeout = timeout
+        self._tasks: Set[asyncio.Task[None]] = set()
+
+    def export(self, spans: List[Span]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._send(self._payload(spans)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, payload: Dict[str, Any]) -> None:
+        import httpx
+
+        try:
+            async with httpx.AsyncClient(timeout=self._timeout) as client:
+                response = await client.post(self._url, json=payload)
+                response.raise_for_status()
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("⚠️ Failed to export traces to %s: %s", self._url, exc)
+
+    def _payload(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", self._service_name)]},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "bot.tracing"},
+                            "spans": [_otlp_span(span) for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+def _otlp_trace_id(trace_id: str) -> str:
+    if trace_id.isdigit():
+        return f"{int(trace_id):032x}"[-32:]
+    return hashlib.blake2b(trace_id.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    start_ns = int(span.start * 1e9)
+    item: Dict[str, Any] = {
+        "traceId": _otlp_trace_id(span.trace_id),
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(start_ns),
+        "endTimeUnixNano": str(start_ns + int((span.duration or 0.0) * 1e9)),
+        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+    }
+    if span.parent_id:
+        item["parentSpanId"] = span.parent_id
+    if span.error:
+        item["status"] = {"code": 2, "message": span.error}
+    return item
+
+
+class Tracer:
+    """Keeps the spans of recent traces in memory and hands them to exporters."""
+
+    def __init__(self, *, max_traces: int = 200) -> None:
+        self._max_traces = max_traces
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self.exporters: List[SpanExporter] = []
+
+    def start_trace(self, trace_id: str | int, name: str, **attributes: Any) -> Span:
+        return Span(self, name, trace_id=str(trace_id), parent=None, attributes=attributes)
+
+    def start_span(self, name: str, **attributes: Any) -> Span | _NoopSpan:
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(self, name, trace_id=parent.trace_id, parent=parent, attributes=attributes)
+
+    def get_trace(self, trace_id: str | int) -> List[Span]:
+        return list(self._traces.get(str(trace_id), ()))
+
+    def close(self) -> None:
+        """Flush and stop exporters that write in the background."""
+        for exporter in self.exporters:
+            close = getattr(exporter, "close", None)
+            if close is not None:
+                close()
+
+    def recent_traces(self) -> List[List[Span]]:
+        """Stored traces, most recently finished first."""
+        return [list(spans) for spans in reversed(self._traces.values())]
+
+    def _finish(self, root: Span, spans: List[Span]) -> None:
+        # Retries reuse the interaction ID, so their spans extend the same trace.
+        stored = self._traces.setdefault(root.trace_id, [])
+        stored.extend(spans)
+        self._traces.move_to_end(root.trace_id)
+        while len(self._traces) > self._max_traces:
+            self._traces.popitem(last=False)
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("⚠️ Trace exporter %s failed: %s", type(exporter).__name__, exc)
+
+
+tracer = Tracer()
+
+
+def start_trace(trace_id: str | int, name: str, **attributes: Any) -> Span:
+    return tracer.start_trace(trace_id, name, **attributes)
+
+
+def start_span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    return tracer.start_span(name, **attributes)
+
+
+def current_span() -> Span | _NoopSpan:
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Wrap a coroutine function in a span named ``name``."""
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            with start_span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def render_waterfall(spans: List[Span], *, width: int = 20, max_lines: int = 30) -> str:
+    """Text waterfall (offset, duration, indented name, bar) for ``/jobbot trace``."""
+    if not spans:
+        return ""
+    by_id = {span.span_id: span for span in spans}
+
+    def depth(span: Span) -> int:
+        level = 0
+        while span.parent_id and span.parent_id in by_id:
+            span = by_id[span.parent_id]
+            level += 1
+        return level
+
+    # Parents sort before children that started in the same clock tick.
+    spans = sorted(spans, key=lambda span: (span.start, depth(span)))
+    origin = spans[0].start
+    end = max(span.start + (span.duration or 0.0) for span in spans)
+    total = max(end - origin, 1e-6)
+
+    lines = [f"{'offset':>8} {'took':>8}  span"]
+    for span in spans[:max_lines]:
+        offset = span.start - origin
+        duration = span.duration or 0.0
+        first = min(int(offset / total * width), width - 1)
+        length = max(int(round(duration / total * width)), 1)
+        bar = " " * first + "█" * min(length, width - first)
+        label = "  " * depth(span) + span.name
+        detail = ", ".join(f"{key}={value}" for key, value in span.attributes.items())
+        if span.error:
+            detail = f"{detail}, error={span.error}" if detail else f"error={span.error}"
+        line = f"{offset:>7.2f}s {duration:>7.2f}s  {bar:<{width}} {label}"
+        if detail:
+            line += f" ({detail[:60]})"
+        lines.append(line)
+    if len(spans) > max_lines:
+        lines.append(f"… {len(spans) - max_lines} more span(s)")
+    return "\n".join(lines)
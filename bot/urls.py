@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .metrics import CACHE_REQUESTS
+from .utils import run_blocking
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "mc_cid",
+    "mc_eid",
+    "igshid",
+    "ref",
+    "ref_src",
+    "referrer",
+    "source",
+    "src",
+    "trk",
+    "trkinfo",
+    "trackingid",
+    "refid",
+    "lipi",
+    "midtoken",
+    "midsig",
+    "originalsubdomain",
+    "_hsenc",
+    "_hsmi",
+    "lever-source",
+    "lever-origin",
+    "gh_src",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_")
+
+SHORTENER_HOSTS = {
+    "lnkd.in",
+    "bit.ly",
+    "t.co",
+    "ow.ly",
+    "buff.ly",
+    "tinyurl.com",
+    "goo.gl",
+    "rebrand.ly",
+    "shorturl.at",
+}
+
+_DIGITS_AT_END = re.compile(r"(\d{6,})/?$")
+
+SiteRule = Callable[[str, List[Tuple[str, str]]], Tuple[str, List[Tuple[str, str]]]]
+
+
+def _linkedin(path: str, query: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+    # /jobs/view/senior-dev-at-studio-1234567890 and ?currentJobId=1234567890 are the same posting.
+    params = dict(query)
+    job_id = params.get("currentJobId") or params.get("currentjobid")
+    if not job_id and path.startswith("/jobs/view/"):
+        match = _DIGITS_AT_END.search(path)
+        job_id = match.group(1) if match else None
+    if job_id:
+        return f"/jobs/view/{job_id}", []
+    return path, []
+
+
+def _lever(path: str, query: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+    return re.sub(r"/apply$", "", path), []
+
+
+def _workable(path: str, query: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+    match = re.match(r"(/[^/]+/j/[0-9A-Za-z]+)", path)
+    return (match.group(1) if match else path), []
+
+
+def _greenhouse(path: str, query: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+    return path, [(key, value) for key, value in query if key == "gh_jid"]
+
+
+def _indeed(path: str, query: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+    job_key = dict(query).get("jk")
+    if job_key:
+        return "/viewjob", [("jk", job_key)]
+    return path, []
+
+
+def _smartrecruiters(path: str, query: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+    match = re.match(r"(/[^/]+/\d+)", path)
+    return (match.group(1) if match else path), []
+
+
+def _drop_query(path: str, query: List[Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+    return path, []
+
+
+# Hosts are matched after lowercasing and dropping "www."; the value maps
+# regional or legacy hosts to one canonical host.
+SITE_RULES: Dict[str, Tuple[str, SiteRule]] = {
+    "linkedin.com": ("linkedin.com", _linkedin),
+    "jobs.lever.co": ("jobs.lever.co", _lever),
+    "apply.workable.com": ("apply.workable.com", _workable),
+    "boards.greenhouse.io": ("boards.greenhouse.io", _greenhouse),
+    "job-boards.greenhouse.io": ("boards.greenhouse.io", _greenhouse),
+    "indeed.com": ("indeed.com", _indeed),
+    "jobs.smartrecruiters.com": ("jobs.smartrecruiters.com", _smartrecruiters),
+    "welcometothejungle.com": ("welcometothejungle.com", _drop_query),
+}
+
+
+def _site_rule(host: str) -> Optional[Tuple[str, SiteRule]]:
+    if host in SITE_RULES:
+        return SITE_RULES[host]
+    # Regional subdomains: fr.linkedin.com, uk.indeed.com, ...
+    parent = host.split(".", 1)[1] if host.count(".") >= 2 else ""
+    if parent in ("linkedin.com", "indeed.com"):
+        return SITE_RULES[parent]
+    return None
+
+
+def _is_tracking(key: str) -> bool:
+    lowered = key.lower()
+    return lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """Return a stable form of ``url`` for dedupe keys and cache keys.
+
+    Lowercases the host, drops ``www.``, the fragment, tracking parameters and
+    trailing slashes, sorts the remaining query and applies :data:`SITE_RULES`
+    (ATS job IDs, LinkedIn view URLs, ...). Non-HTTP input is returned stripped.
+    """
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return url
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(key)]
+
+    rule = _site_rule(parts.hostname.lower().removeprefix("www."))
+    if rule:
+        host, transform = rule
+        path, query = transform(path, query)
+
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+def dedupe_key(url: str) -> str:
+    """Case-insensitive canonical form used by history, caches and in-flight keys."""
+    canonical = canonicalize_url(url)
+    if canonical.startswith("https://"):
+        return canonical.lower()
+    return canonical.lower().split("#", 1)[0].rstrip("/")
+
+
+def anonymize_url(url: str) -> str:
+    """Strip credentials and tracking values (``trk``, ``utm_*``, ...) from ``url``.
+
+    Unlike :func:`canonicalize_url` the shape is kept (host, path, parameter
+    names and order), so captured references still exercise the real
+    canonicalisation and redirect handling on replay. Idempotent.
+    """
+    parts = urlsplit((url or "").strip())
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return (url or "").strip()
+    netloc = parts.netloc.rsplit("@", 1)[-1]
+    query = [
+        (key, "x" if _is_tracking(key) and value else value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit((parts.scheme, netloc, parts.path, urlencode(query), parts.fragment))
+
+
+def is_shortened(url: str) -> bool:
+    host = (urlsplit(url.strip()).hostname or "").lower().removeprefix("www.")
+    return host in SHORTENER_HOSTS
+
+
+class RedirectResolver:
+    """Resolves shortened links (lnkd.in, bit.ly, ...) to their target, with a cache.
+
+    Only known shortener hosts trigger a request. Results are kept in an LRU
+    bounded by ``max_entries`` and, when ``storage_path`` is set, persisted as
+    JSON so they survive restarts.
+    """
+
+    def __init__(
+        self,
+        storage_path: Optional[Path] = None,
+        *,
+        timeout: float = 10.0,
+        max_entries: int = 10_000,
+    ) -> None:
+        self._storage_path = storage_path
+        self._timeout = timeout
+        self._max_entries = max_entries
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._loaded = storage_path is None
+        self._load_lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def load(self) -> None:
+        if self._loaded:
+            return
+        # A resolve racing the warm-up waits for it instead of saving a half-loaded cache.
+        async with self._load_lock:
+            if self._loaded:
+                return
+            assert self._storage_path is not None
+            try:
+                raw = await run_blocking(self._storage_path.read_text)
+                self._cache.update(json.loads(raw))
+            except FileNotFoundError:
+                pass
+            except (OSError, json.JSONDecodeError, TypeError, ValueError):
+                logger.warning("⚠️ Could not read redirect cache %s; starting empty", self._storage_path)
+            self._loaded = True
+
+    async def resolve(self, url: str) -> str:
+        if not is_shortened(url):
+            return url
+        await self.load()
+        key = canonicalize_url(url)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="redirect", result="hit")
+            return cached
+        self.misses += 1
+        CACHE_REQUESTS.inc(cache="redirect", result="miss")
+        target = await self._follow(url)
+        if target is None:
+            return url
+        self._cache[key] = target
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+        if self._storage_path is not None:
+            await run_blocking(self._save, json.dumps(dict(self._cache)))
+        logger.info("🔗 Resolved %s → %s", url, target)
+        return target
+
+    async def _follow(self, url: str) -> Optional[str]:
+        import httpx
+
+        try:
+            async with httpx.AsyncClient(follow_redirects=True, timeout=self._timeout) as client:
+                response = await client.head(url)
+                if response.status_code >= 400:
+                    response = await client.get(url)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("⚠️ Failed to resolve redirect for %s: %s", url, exc)
+            return None
+        return str(response.url)
+
+    def _save(self, payload: str) -> None:
+        assert self._storage_path is not None
+        self._storage_path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per process and thread: shard processes and concurrent resolves save at once.
+        tmp_path = self._storage_path.with_name(
+            f"{self._storage_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        tmp_path.write_text(payload)
+        tmp_path.replace(self._storage_path)
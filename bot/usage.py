@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .utils import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens (input, output). Unknown models are tracked with a zero cost.
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+# (guild_id, user_id) of the request currently being processed; set once per
+# interaction or retry task so the parser can attribute its calls.
+_usage_owner: ContextVar[Tuple[Optional[int], Optional[int]]] = ContextVar(
+    "jobbot_usage_owner", default=(None, None)
+)
+
+
+def set_usage_owner(guild_id: Optional[int], user_id: Optional[int]) -> None:
+    _usage_owner.set((guild_id, user_id))
+
+
+def usage_owner() -> Tuple[Optional[int], Optional[int]]:
+    return _usage_owner.get()
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int) -> float:
+    # Dated snapshots ("gpt-4o-mini-2024-07-18") share the base model's price.
+    prices = next(
+        (price for name, price in sorted(MODEL_PRICES.items(), key=lambda item: -len(item[0])) if model.startswith(name)),
+        (0.0, 0.0),
+    )
+    return (input_tokens * prices[0] + output_tokens * prices[1]) / 1_000_000
+
+
+def utc_day(timestamp: Optional[float] = None) -> str:
+    moment = datetime.fromtimestamp(time.time() if timestamp is None else timestamp, tz=timezone.utc)
+    return moment.strftime("%Y-%m-%d")
+
+
+def next_utc_midnight(timestamp: Optional[float] = None) -> float:
+    moment = datetime.fromtimestamp(time.time() if timestamp is None else timestamp, tz=timezone.utc)
+    midnight = moment.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return midnight.timestamp()
+
+
+@dataclass(slots=True)
+class UsageTotals:
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    image_tokens: int = 0
+    latency_seconds: float = 0.0
+    cost_usd: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+
+@dataclass(slots=True)
+class UsageSummary:
+    day: str
+    guild: UsageTotals
+    top_users: List[Tuple[int, UsageTotals]] = field(default_factory=list)
+
+
+class UsageLedger:
+    """Daily OpenAI usage per guild, user and model in SQLite, with token budgets.
+
+    ``guild_daily_tokens`` / ``user_daily_tokens`` cap input + output tokens per
+    UTC day; ``None`` means unlimited. The database is opened by :meth:`load`
+    or, if that hasn't run or failed, by the first query.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path,
+        *,
+        guild_daily_tokens: Optional[int] = None,
+        user_daily_tokens: Optional[int] = None,
+    ) -> None:
+        self.storage_path = storage_path
+        self.guild_daily_tokens = guild_daily_tokens
+        self.user_daily_tokens = user_daily_tokens
+        self._connection: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._closed = False
+
+    async def load(self) -> None:
+        await run_blocking(self._open)
+
+    async def record(
+        self,
+        *,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        image_tokens: int = 0,
+        latency: float = 0.0,
+        guild_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        await run_blocking(
+            self._upsert,
+            utc_day(timestamp),
+            guild_id or 0,
+            user_id or 0,
+            model,
+            input_tokens,
+            output_tokens,
+            image_tokens,
+            latency,
+            estimate_cost(model, input_tokens, output_tokens),
+        )
+
+    async def totals(
+        self,
+        *,
+        guild_id: Optional[int] = None,
+        user_id: Optional[int] = None,
+        day: Optional[str] = None,
+    ) -> UsageTotals:
+        return await run_blocking(self._totals, day or utc_day(), guild_id, user_id)
+
+    async def summary(self, guild_id: int, *, day: Optional[str] = None, top: int = 3) -> UsageSummary:
+        day = day or utc_day()
+        guild = await self.totals(guild_id=guild_id, day=day)
+        top_users = await run_blocking(self._top_users, day, guild_id, top)
+        return UsageSummary(day=day, guild=guild, top_users=top_users)
+
+    async def budget_exceeded(self, guild_id: int, user_id: int) -> Optional[str]:
+        """Return why a new parse would exceed today's budget, or ``None``."""
+        if self.guild_daily_tokens:
+            used = (await self.totals(guild_id=guild_id)).tokens
+            if used >= self.guild_daily_tokens:
+                return f"this server used {used:,}/{self.guild_daily_tokens:,} OpenAI tokens today"
+        if self.user_daily_tokens:
+            used = (await self.totals(guild_id=guild_id, user_id=user_id)).tokens
+            if used >= self.user_daily_tokens:
+                return f"you used {used:,}/{self.user_daily_tokens:,} OpenAI tokens today"
+        return None
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._closed = True
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _open(self) -> None:
+        with self._db_lock:
+            self._ensure_open()
+
+    def _ensure_open(self) -> Optional[sqlite3.Connection]:
+        """The connection, opened on first use; ``None`` once closed. Call with ``_db_lock`` held."""
+        if self._connection is not None or self._closed:
+            return self._connection
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.storage_path, check_same_thread=False, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS openai_usage ("
+            " day TEXT NOT NULL,"
+            " guild_id INTEGER NOT NULL,"
+            " user_id INTEGER NOT NULL,"
+            " model TEXT NOT NULL,"
+            " calls INTEGER NOT NULL,"
+            " input_tokens INTEGER NOT NULL,"
+            " output_tokens INTEGER NOT NULL,"
+            " image_tokens INTEGER NOT NULL,"
+            " latency_seconds REAL NOT NULL,"
+            " cost_usd REAL NOT NULL,"
+            " PRIMARY KEY (day, guild_id, user_id, model)"
+            ") WITHOUT ROWID"
+        )
+        connection.commit()
+        self._connection = connection
+        return connection
+
+    def _upsert(
+        self,
+        day: str,
+        guild_id: int,
+        user_id: int,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        image_tokens: int,
+        latency: float,
+        cost: float,
+    ) -> None:
+        with self._db_lock:
+            connection = self._ensure_open()
+            if connection is None:
+                return
+            with connection:
+                connection.execute(
+                    "INSERT INTO openai_usage VALUES (?, ?, ?, ?, 1, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (day, guild_id, user_id, model) DO UPDATE SET"
+                    " calls = calls + 1,"
+                    " input_tokens = input_tokens + excluded.input_tokens,"
+                    " output_tokens = output_tokens + excluded.output_tokens,"
+                    " image_tokens = image_tokens + excluded.image_tokens,"
+                    " latency_seconds = latency_seconds + excluded.latency_seconds,"
+                    " cost_usd = cost_usd + excluded.cost_usd",
+                    (day, guild_id, user_id, model, input_tokens, output_tokens, image_tokens, latency, cost),
+                )
+
+    _SUMS = (
+        "COALESCE(SUM(calls), 0), COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0),"
+        " COALESCE(SUM(image_tokens), 0), COALESCE(SUM(latency_seconds), 0), COALESCE(SUM(cost_usd), 0)"
+    )
+
+    def _totals(self, day: str, guild_id: Optional[int], user_id: Optional[int]) -> UsageTotals:
+        query = f"SELECT {self._SUMS} FROM openai_usage WHERE day = ?"
+        params: list = [day]
+        if guild_id is not None:
+            query += " AND guild_id = ?"
+            params.append(guild_id)
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        with self._db_lock:
+            connection = self._ensure_open()
+            if connection is None:
+                return UsageTotals()
+            row = connection.execute(query, params).fetchone()
+        return UsageTotals(*row)
+
+    def _top_users(self, day: str, guild_id: int, limit: int) -> List[Tuple[int, UsageTotals]]:
+        with self._db_lock:
+            connection = self._ensure_open()
+            if connection is None:
+                return []
+            rows = connection.execute(
+                f"SELECT user_id, {self._SUMS} FROM openai_usage"
+                " WHERE day = ? AND guild_id = ? GROUP BY user_id"
+                " ORDER BY SUM(input_tokens + output_tokens) DESC LIMIT ?",
+                (day, guild_id, limit),
+            ).fetchall()
+        return [(row[0], UsageTotals(*row[1:])) for row in rows]
@@ -3,7 +3,14 @@ from __future__ import annotations
 import asyncio
 import base64
 import re
-from typing import Iterable, List
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
 
 URL_REGEX = re.compile(r"https?://[^\s<>]+", re.IGNORECASE)
 IMAGE_REF_REGEX = re.compile(r"image\s*:\s*(https?://[^\s<>]+)", re.IGNORECASE)
@@ -74,3 +81,22 @@ def chunk_text(text: str, size: int) -> Iterable[str]:
 
 def to_base64(data: bytes) -> str:
     return base64.b64encode(data).decode("ascii")
+
+
+@contextmanager
+def locked_file(path: Path, mode: str = "a+", *, exclusive: bool = True) -> Iterator[IO[str]]:
+    """Open ``path`` holding an advisory lock shared with other bot processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open(mode, encoding="utf-8") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield handle
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def shard_ids_for_process(index: int, processes: int, shard_count: int) -> List[int]:
+    """Spread ``shard_count`` shards round-robin across ``processes`` workers."""
+    return [shard_id for shard_id in range(shard_count) if shard_id % processes == index]
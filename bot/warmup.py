@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Named background start-up tasks that commands can wait on.
+
+    Each task sets its readiness event when it finishes, successfully or not:
+    a failed warm-up is logged and the component falls back to loading on
+    first use, so waiters never hang. Waiting on a name that was never
+    started returns immediately.
+    """
+
+    def __init__(self) -> None:
+        self._events: Dict[str, asyncio.Event] = {}
+        self._tasks: Set[asyncio.Task[None]] = set()
+        self.durations: Dict[str, float] = {}
+
+    def start(self, name: str, work: Awaitable[object]) -> None:
+        event = self._events.setdefault(name, asyncio.Event())
+        task = asyncio.create_task(self._run(name, work, event), name=f"warmup:{name}")
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, name: str, work: Awaitable[object], event: asyncio.Event) -> None:
+        started = time.perf_counter()
+        try:
+            await work
+        except Exception:  # noqa: BLE001
+            logger.exception("⚠️ Warm-up step %s failed; it will load on first use", name)
+        else:
+            self.durations[name] = time.perf_counter() - started
+            logger.info("🔥 Warm-up step %s done in %.2fs", name, self.durations[name])
+        finally:
+            event.set()
+
+    def is_ready(self, name: str) -> bool:
+        event = self._events.get(name)
+        return event is None or event.is_set()
+
+    def pending(self) -> List[str]:
+        return [name for name, event in self._events.items() if not event.is_set()]
+
+    async def wait(self, *names: str) -> None:
+        for name in names:
+            event = self._events.get(name)
+            if event is not None and not event.is_set():
+                await event.wait()
+
+    async def cancel(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for event in self._events.values():
+            event.set()
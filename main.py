@@ -1,37 +1,78 @@
 from __future__ import annotations
 
+# Imported first so the startup breakdown covers every other import.
+from bot.startup import startup_timer  # isort: skip
+
 import argparse
 import asyncio
+import atexit
 import logging
+import multiprocessing
 import os
+import signal
+from logging.handlers import QueueListener
 from pathlib import Path
 from typing import Sequence
 
+from bot.capture import TrafficCapture
 from bot.client import LaCommuDiscordBot
-from bot.config import load_config
+from bot.config import BotConfig, load_config
 from bot.health import HealthServer
 from bot.history import PostHistory
+from bot.log import build_file_handler, setup_queue_logging
+from bot.monitor import LoopMonitor, ReadinessProbe
 from bot.openai_client import OpenAIJobParser
 from bot.retry import RetryManager
+from bot.similarity import SimilarityIndex
+from bot.tracing import JsonlSpanExporter, OtlpHttpExporter, tracer
+from bot.urls import RedirectResolver
+from bot.usage import UsageLedger
+from bot.utils import shard_ids_for_process
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").strip().lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_ROTATE_WHEN = os.getenv("LOG_ROTATE_WHEN", "").strip() or None
+LOG_BACKUPS = int(os.getenv("LOG_BACKUPS", "5"))
 DEFAULT_LOG_FILE = Path("job-caster.log")
 logger = logging.getLogger(__name__)
+startup_timer.mark("imports")
+_log_listener: QueueListener | None = None
 
 
-def configure_logging(log_file: Path | None) -> None:
+def configure_logging(log_file: Path | None, *, process_index: int | None = None) -> None:
+    global _log_listener
     handlers: list[logging.Handler] = [logging.StreamHandler()]
     destination = DEFAULT_LOG_FILE if log_file is None else log_file
+    if destination and process_index is not None:
+        # Rotating handlers can't share a file across processes: each shard process gets its own.
+        destination = destination.with_name(f"{destination.stem}.{process_index}{destination.suffix}")
     if destination:
-        destination.parent.mkdir(parents=True, exist_ok=True)
-        handlers.append(logging.FileHandler(destination))
-
-    logging.basicConfig(
-        level=LOG_LEVEL,
-        format="[%(asctime)s] %(levelname)s %(name)s: %(message)s",
-        handlers=handlers,
-        force=True,
-    )
+        handlers.append(
+            build_file_handler(
+                destination,
+                max_bytes=LOG_MAX_BYTES,
+                rotate_when=LOG_ROTATE_WHEN,
+                backups=LOG_BACKUPS,
+            )
+        )
+
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+    # Handlers run on a background thread; the event loop only enqueues records.
+    _log_listener = setup_queue_logging(handlers, level=LOG_LEVEL, json_format=LOG_FORMAT == "json")
+
+
+@atexit.register
+def _flush_logging() -> None:
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
 
 
 def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
@@ -41,35 +82,253 @@ def parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
         type=Path,
         help=f"Path to a log file (default: {DEFAULT_LOG_FILE}).",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Number of shard processes to launch (default: 1, a single auto-sharded process).",
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        help="Total number of gateway shards (default: DISCORD_SHARD_COUNT, or --processes in cluster mode).",
+    )
+    parser.add_argument(
+        "--rewrite-history-keys",
+        action="store_true",
+        help="Canonicalize stored posted-job keys (run once while the bot is stopped) and exit.",
+    )
+    args = parser.parse_args(argv)
+    if args.processes < 1:
+        parser.error("--processes must be at least 1")
+    if args.shard_count is not None and args.shard_count < args.processes:
+        parser.error("--shard-count must be greater than or equal to --processes")
+    return args
 
 
 configure_logging(DEFAULT_LOG_FILE)
 
 
-async def run_bot() -> None:
+def build_post_history(config: BotConfig, *, shared: bool = False) -> PostHistory:
+    history_log = Path("data/posted_jobs.log")
+    # A zero interval disables the group-commit writer (write-through).
+    history_writer = {
+        "flush_interval": config.history_flush_interval or None,
+        "batch_size": config.history_batch_size,
+        "fsync": config.history_fsync,
+    }
+    if config.history_backend == "sqlite":
+        return PostHistory(
+            Path("data/posted_jobs.db"),
+            ttl=config.history_ttl_days * 86400 if config.history_ttl_days else None,
+            legacy_log_path=history_log,
+            **history_writer,
+        )
+    return PostHistory(
+        history_log,
+        shared=shared,
+        compact=config.history_key_format != "text",
+        bloom=config.history_key_format == "bloom",
+        **history_writer,
+    )
+
+
+async def rewrite_history_keys() -> None:
+    post_history = build_post_history(load_config())
+    try:
+        changed = await post_history.rewrite_keys()
+    finally:
+        await post_history.aclose()
+    logger.info("🔑 Rewrote %d history key(s) to their canonical form", changed)
+
+
+def configure_tracing(config: BotConfig) -> None:
+    tracer.close()
+    tracer.exporters.clear()
+    if config.trace_file:
+        tracer.exporters.append(JsonlSpanExporter(Path(config.trace_file)))
+    if config.otlp_endpoint:
+        tracer.exporters.append(OtlpHttpExporter(config.otlp_endpoint))
+
+
+async def run_bot(
+    *,
+    shard_count: int | None = None,
+    shard_ids: Sequence[int] | None = None,
+    process_index: int | None = None,
+) -> None:
     config = load_config()
-    parser = OpenAIJobParser(config.openai)
-    retry_manager = RetryManager(Path("data/pending_requests.json"))
-    post_history = PostHistory(Path("data/posted_jobs.log"))
-    await post_history.load()
-    bot = LaCommuDiscordBot(config, parser, retry_manager, post_history)
-    health_server = HealthServer()
-
-    await health_server.start()
+    if shard_count is not None:
+        config.shard_count = shard_count
+    configure_tracing(config)
+    startup_timer.mark("config")
+    usage_ledger = UsageLedger(
+        Path("data/usage.db"),
+        guild_daily_tokens=config.usage_guild_daily_tokens,
+        user_daily_tokens=config.usage_user_daily_tokens,
+    )
+    parser = OpenAIJobParser(config.openai, usage_ledger=usage_ledger)
+    # Each shard process owns its retry file; posted-job history is shared.
+    retry_path = Path("data/pending_requests.json")
+    if process_index is not None:
+        retry_path = retry_path.with_name(f"pending_requests.{process_index}.json")
+    retry_manager = RetryManager(
+        retry_path,
+        base_delay=config.retry_base_delay,
+        max_delay=config.retry_max_delay,
+    )
+    # History, usage and fingerprints load in the background once logged in (see setup_hook).
+    post_history = build_post_history(config, shared=process_index is not None)
+    redirect_resolver = RedirectResolver(Path("data/redirects.json"), timeout=config.request_timeout)
+    similarity_index = None
+    if config.near_duplicate_action != "off":
+        similarity_index = SimilarityIndex(
+            Path("data/job_fingerprints.log"),
+            max_distance=config.near_duplicate_distance,
+            window=config.near_duplicate_window_days * 86400,
+            shared=process_index is not None,
+        )
+    traffic_capture = None
+    if config.capture_dir:
+        traffic_capture = TrafficCapture(
+            Path(config.capture_dir),
+            max_bytes=config.capture_max_bytes,
+            sample_rate=config.capture_sample_rate,
+        )
+        logger.info("📼 Capturing anonymised requests to %s", config.capture_dir)
+    startup_timer.mark("setup")
+    bot = LaCommuDiscordBot(
+        config,
+        parser,
+        retry_manager,
+        post_history,
+        shard_ids=shard_ids,
+        redirect_resolver=redirect_resolver,
+        similarity_index=similarity_index,
+        usage_ledger=usage_ledger,
+        traffic_capture=traffic_capture,
+        command_sync_path=Path("data/command_tree.json"),
+    )
+    loop_monitor = LoopMonitor(
+        slow_callback=config.slow_callback_threshold,
+        gateway_latency=lambda: bot.latency,
+    )
+    readiness = ReadinessProbe(
+        bot,
+        loop_monitor,
+        retry_manager,
+        max_loop_lag=config.ready_max_loop_lag,
+        max_gateway_latency=config.ready_max_gateway_latency,
+        max_retry_due=config.ready_max_retry_due,
+    )
+    # Only the first process binds the health port so cluster members don't collide.
+    health_server = (
+        HealthServer(
+            readiness=readiness.check,
+            debug_port=config.debug_port,
+            debug_token=config.debug_token,
+        )
+        if not process_index
+        else None
+    )
+
+    shutdown: asyncio.Task[None] | None = None
+
+    async def _drain_and_close() -> None:
+        await bot.drain(config.shutdown_timeout)
+        await bot.close()
+
+    def _request_shutdown(signame: str) -> None:
+        nonlocal shutdown
+        if shutdown is None:
+            logger.info("🛑 Received %s; finishing in-flight requests before exiting", signame)
+            shutdown = asyncio.create_task(_drain_and_close())
+
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, _request_shutdown, signum.name)
+        except (NotImplementedError, RuntimeError):
+            # Windows event loops have no signal handler support; fall back to the defaults.
+            pass
+
+    loop_monitor.start()
+    if health_server:
+        await health_server.start()
     try:
         await bot.start(config.discord_token)
     except Exception as exc:  # noqa: BLE001
         logger.exception("🛑 Bot stopped unexpectedly: %s", exc)
         raise
     finally:
-        await health_server.stop()
+        if shutdown is not None:
+            await shutdown
+        retry_manager.close()
+        await post_history.aclose()
+        usage_ledger.close()
+        tracer.close()
+        if health_server:
+            await health_server.stop()
+        await loop_monitor.stop()
+
+
+def _run_shard_process(
+    index: int,
+    shard_ids: list[int],
+    shard_count: int,
+    log_file: Path | None,
+) -> None:
+    configure_logging(log_file, process_index=index)
+    logger.info("🧩 Shard process %s starting with shards %s/%s", index, shard_ids, shard_count)
+    try:
+        asyncio.run(run_bot(shard_count=shard_count, shard_ids=shard_ids, process_index=index))
+    finally:
+        # multiprocessing children exit without running atexit hooks.
+        _flush_logging()
+
+
+def run_cluster(processes: int, shard_count: int, log_file: Path | None) -> int:
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    for index in range(processes):
+        shard_ids = shard_ids_for_process(index, processes, shard_count)
+        worker = context.Process(
+            target=_run_shard_process,
+            args=(index, shard_ids, shard_count, log_file),
+            name=f"jobbot-shard-{index}",
+        )
+        worker.start()
+        workers.append(worker)
+    logger.info("🧩 Launched %d shard process(es) for %d shard(s)", processes, shard_count)
+
+    def _forward_signal(signum, frame) -> None:  # noqa: ARG001
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+
+    signal.signal(signal.SIGTERM, _forward_signal)
+    signal.signal(signal.SIGINT, _forward_signal)
+    exit_code = 0
+    for worker in workers:
+        worker.join()
+        if worker.exitcode:
+            logger.error("🛑 Shard process %s exited with code %s", worker.name, worker.exitcode)
+            exit_code = 1
+    return exit_code
 
 
 def main(argv: Sequence[str] | None = None) -> None:
     args = parse_args(argv)
     configure_logging(args.log_file)
-    asyncio.run(run_bot())
+    if args.rewrite_history_keys:
+        asyncio.run(rewrite_history_keys())
+        return
+    if args.processes > 1:
+        shard_count = args.shard_count or load_config().shard_count or args.processes
+        if shard_count < args.processes:
+            raise SystemExit("DISCORD_SHARD_COUNT must be greater than or equal to --processes")
+        raise SystemExit(run_cluster(args.processes, shard_count, args.log_file))
+    asyncio.run(run_bot(shard_count=args.shard_count))
 
 
 if __name__ == "__main__":
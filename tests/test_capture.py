@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+from bot.capture import (
+    TrafficCapture,
+    capture_model_output,
+    capture_page,
+    capture_redirect,
+    output_key,
+    read_capture,
+)
+
+
+@pytest.mark.asyncio
+async def test_capture_round_trip_is_anonymised(tmp_path: Path):
+    capture = TrafficCapture(tmp_path)
+    record = capture.begin(
+        command="post",
+        reference="Hey, look at this one https://lnkd.in/abc?trk=me\nimage: https://cdn.example.com/p.png?utm_source=bob",
+        force=False,
+    )
+    capture_redirect("https://lnkd.in/abc?trk=me", "https://jobs.example.com/42?refId=bob")
+    capture_page("https://jobs.example.com/42?refId=bob", "<html><body>Gameplay Programmer</body></html>")
+    capture_model_output(
+        "text",
+        "https://jobs.example.com/42?refId=bob",
+        '[{"job_title": "Gameplay Programmer", "job_url": "https://jobs.example.com/42?refId=bob"}]',
+    )
+    jobs = [{"job_title": "Gameplay Programmer", "job_url": "https://jobs.example.com/42?refId=bob"}]
+    await capture.finish(record, jobs=jobs, issues=[])
+
+    # Outside of a capture the hooks are no-ops.
+    capture_page("https://other.example.com", "ignored")
+
+    raw = (tmp_path / "requests.jsonl").read_text()
+    assert "bob" not in raw and "trk=me" not in raw and "Hey" not in raw
+
+    [request] = list(read_capture(tmp_path))
+    assert request.reference == "https://lnkd.in/abc?trk=x\nimage: https://cdn.example.com/p.png?utm_source=x"
+    assert request.redirects == {"https://lnkd.in/abc?trk=x": "https://jobs.example.com/42?refId=x"}
+    assert request.pages["https://jobs.example.com/42?refId=x"].startswith("<html>")
+    assert "refId=x" in request.outputs[output_key("text", "https://jobs.example.com/42?refId=x")]
+    assert request.jobs[0]["job_url"] == "https://jobs.example.com/42?refId=x"
+
+
+@pytest.mark.asyncio
+async def test_capture_pauses_when_archive_is_full(tmp_path: Path):
+    capture = TrafficCapture(tmp_path, max_bytes=1)
+    record = capture.begin(command="preview", reference="https://jobs.example.com/1", force=False)
+    await capture.finish(record, jobs=[], issues=[])
+
+    assert capture.captured == 1
+    assert capture.begin(command="preview", reference="https://jobs.example.com/2", force=False) is None
@@ -1,8 +1,10 @@
+import asyncio
 from pathlib import Path
+from types import SimpleNamespace
 
 import pytest
 
-from bot.client import LaCommuDiscordBot
+from bot.client import LaCommuDiscordBot, PostPreviewView
 from bot.config import BotConfig, ChannelConfig, OpenAIConfig
 from bot.history import PostHistory
 from bot.retry import RetryManager
@@ -36,6 +38,7 @@ class FakeChannel:
     def __init__(self, name, channel_id):
         self.name = name
         self.id = channel_id
+        self.mention = f"<#{channel_id}>"
         self.sent_embeds = []
 
     async def send(self, *, embed, reference=None, mention_author=None):
@@ -157,3 +160,293 @@ async def test_dispatch_jobs_skips_duplicates(tmp_path: Path):
     assert not second_post
     assert any("Skipped duplicate" in item for item in second_issues)
     assert len(art_channel.sent_embeds) == 1
+
+
+class CountingParser(DummyParser):
+    def __init__(self):
+        self.calls = 0
+
+    async def parse_from_text(self, *, content: str, url: str):
+        self.calls += 1
+        return [{"job_title": "Environment Artist", "company_name": "Voxel Labs", "team": "art"}]
+
+
+@pytest.mark.asyncio
+async def test_retry_resumes_from_checkpointed_stages(tmp_path: Path, monkeypatch):
+    async def fake_fetch(url, *, timeout, max_bytes):
+        return "Environment Artist at Voxel Labs"
+
+    monkeypatch.setattr("bot.client.fetch_page_text", fake_fetch)
+    config = BotConfig(
+        discord_token="dummy",
+        openai=OpenAIConfig(api_key="dummy"),
+        channels=ChannelConfig(team_channels={"art": 1}),
+    )
+    parser = CountingParser()
+    manager = RetryManager(tmp_path / "pending.json")
+    post_history = PostHistory(tmp_path / "posted.log")
+    bot = LaCommuDiscordBot(config, parser, manager, post_history)
+    art_channel = FakeChannel("art", 1)
+    guild = FakeGuild([art_channel])
+    reference = "https://jobs.example.com/env"
+
+    await manager.start_request(request_id=7, guild_id=guild.id, user_id=1, reference=reference)
+    jobs_data, _ = await bot._collect_jobs(reference=reference, request_id=7)
+    await bot._post_jobs(jobs_data, guild, request_id=7)
+    await manager.fail_request(7, "followup failed")
+    manager.flush()
+
+    [entry] = await RetryManager(tmp_path / "pending.json").list_pending_requests()
+    assert entry.parsed_sources[reference]["text_hash"]
+    assert entry.posted_keys == [reference]
+
+    jobs_data, issues = await bot._collect_jobs(
+        reference=reference,
+        request_id=7,
+        checkpoint=entry.parsed_sources,
+    )
+    posted, issues = await bot._post_jobs(
+        jobs_data,
+        guild,
+        request_id=7,
+        posted_keys=entry.posted_keys,
+    )
+    assert parser.calls == 1
+    assert not posted and not issues
+    assert len(art_channel.sent_embeds) == 1
+
+
+@pytest.mark.asyncio
+async def test_collect_jobs_skips_posted_links_before_fetching(tmp_path: Path, monkeypatch):
+    async def fake_fetch(url, *, timeout, max_bytes):
+        return "Environment Artist at Voxel Labs"
+
+    monkeypatch.setattr("bot.client.fetch_page_text", fake_fetch)
+    config = BotConfig(
+        discord_token="dummy",
+        openai=OpenAIConfig(api_key="dummy"),
+        channels=ChannelConfig(team_channels={"art": 1}),
+    )
+    parser = CountingParser()
+    bot = LaCommuDiscordBot(
+        config,
+        parser,
+        RetryManager(tmp_path / "pending.json"),
+        PostHistory(tmp_path / "posted.log"),
+    )
+    guild = FakeGuild([FakeChannel("art", 1)])
+    reference = "https://jobs.example.com/env"
+
+    jobs_data, _ = await bot._collect_jobs(reference=reference)
+    await bot._post_jobs(jobs_data, guild)
+
+    jobs_data, issues = await bot._collect_jobs(reference=reference)
+    assert not jobs_data
+    assert parser.calls == 1
+    assert any("saved 1 LLM call" in issue for issue in issues)
+
+    jobs_data, _ = await bot._collect_jobs(reference=reference, force=True)
+    assert jobs_data and parser.calls == 2
+
+
+class CareersPageParser(DummyParser):
+    def __init__(self):
+        self.calls = 0
+
+    async def parse_from_text(self, *, content: str, url: str):
+        self.calls += 1
+        return [
+            {"job_title": f"Role {index}", "company_name": "Voxel Labs", "team": "art", "job_url": f"{url}/role-{index}"}
+            for index in range(self.calls)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_careers_page_is_fetched_again_for_new_jobs(tmp_path: Path, monkeypatch):
+    async def fake_fetch(url, *, timeout, max_bytes):
+        return "Open roles at Voxel Labs"
+
+    monkeypatch.setattr("bot.client.fetch_page_text", fake_fetch)
+    config = BotConfig(
+        discord_token="dummy",
+        openai=OpenAIConfig(api_key="dummy"),
+        channels=ChannelConfig(team_channels={"art": 1}),
+    )
+    parser = CareersPageParser()
+    bot = LaCommuDiscordBot(
+        config,
+        parser,
+        RetryManager(tmp_path / "pending.json"),
+        PostHistory(tmp_path / "posted.log"),
+    )
+    art_channel = FakeChannel("art", 1)
+    guild = FakeGuild([art_channel])
+    reference = "https://voxel.example.com/careers"
+
+    jobs_data, _ = await bot._collect_jobs(reference=reference)
+    await bot._post_jobs(jobs_data, guild)
+
+    jobs_data, _ = await bot._collect_jobs(reference=reference)
+    posted, issues = await bot._post_jobs(jobs_data, guild)
+    assert parser.calls == 2
+    assert [job.job_title for job, _ in posted] == ["Role 1"]
+    assert any("Skipped duplicate `Role 0`" in issue for issue in issues)
+    assert len(art_channel.sent_embeds) == 2
+
+
+@pytest.mark.asyncio
+async def test_command_sync_skipped_when_tree_unchanged(tmp_path: Path, monkeypatch):
+    config = BotConfig(
+        discord_token="dummy",
+        openai=OpenAIConfig(api_key="dummy"),
+        channels=ChannelConfig(team_channels={"art": 1}),
+    )
+    sync_path = tmp_path / "command_tree.json"
+    bot = LaCommuDiscordBot(
+        config,
+        DummyParser(),
+        RetryManager(tmp_path / "pending.json"),
+        PostHistory(tmp_path / "posted.log"),
+        command_sync_path=sync_path,
+    )
+    syncs = []
+
+    async def fake_sync(*args, **kwargs):
+        syncs.append(1)
+        return []
+
+    monkeypatch.setattr(bot.tree, "sync", fake_sync)
+
+    await bot._sync_commands()
+    await bot._sync_commands()
+    assert len(syncs) == 1 and sync_path.exists()
+
+    bot.tree.remove_command("jobbot")
+    await bot._sync_commands()
+    assert len(syncs) == 2
+
+
+class FakeInteraction:
+    def __init__(self, interaction_id, guild):
+        self.id = interaction_id
+        self.guild = guild
+        self.user = SimpleNamespace(id=42)
+        self.followups = []
+        self.deferred = False
+        self.response = SimpleNamespace(
+            defer=self._defer,
+            send_message=self._send_message,
+            is_done=lambda: self.deferred,
+        )
+        self.followup = SimpleNamespace(send=self._followup)
+
+    async def _defer(self, **kwargs):
+        self.deferred = True
+
+    async def _send_message(self, content=None, **kwargs):
+        self.followups.append(content)
+
+    async def _followup(self, content=None, *, embed=None, ephemeral, view=None):
+        self.followups.append(embed.title if embed is not None else content)
+        self.view = view
+
+
+@pytest.mark.asyncio
+async def test_drain_checkpoints_unfinished_posts_and_queues_new_ones(tmp_path: Path, monkeypatch):
+    started = asyncio.Event()
+
+    async def stuck_fetch(url, *, timeout, max_bytes):
+        started.set()
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr("bot.client.fetch_page_text", stuck_fetch)
+    config = BotConfig(
+        discord_token="dummy",
+        openai=OpenAIConfig(api_key="dummy"),
+        channels=ChannelConfig(team_channels={"art": 1}),
+    )
+    manager = RetryManager(tmp_path / "pending.json")
+    bot = LaCommuDiscordBot(config, DummyParser(), manager, PostHistory(tmp_path / "posted.log"))
+    post = bot.tree.get_command("jobbot").get_command("post")
+    guild = FakeGuild([FakeChannel("art", 1)])
+
+    stuck = FakeInteraction(1, guild)
+    task = asyncio.create_task(post.callback(stuck, reference="https://jobs.example.com/env"))
+    await asyncio.wait_for(started.wait(), 1)
+    await bot.drain(0.05)
+    assert task.cancelled()
+    assert stuck.followups == ["🔄 Bot restarting"]
+
+    late = FakeInteraction(2, guild)
+    await post.callback(late, reference="https://jobs.example.com/other")
+    assert "queued" in late.followups[0]
+    manager.close()
+
+    pending = await RetryManager(tmp_path / "pending.json").claim_due_requests()
+    assert {entry.request_id: entry.attempts for entry in pending} == {1: 0, 2: 0}
+    assert {entry.last_error for entry in pending} == {"Interrupted by shutdown", "Received during shutdown"}
+
+
+@pytest.mark.asyncio
+async def test_drain_queues_posts_cancelled_before_they_are_stored(tmp_path: Path):
+    config = BotConfig(
+        discord_token="dummy",
+        openai=OpenAIConfig(api_key="dummy"),
+        channels=ChannelConfig(team_channels={"art": 1}),
+    )
+    manager = RetryManager(tmp_path / "pending.json")
+    bot = LaCommuDiscordBot(config, DummyParser(), manager, PostHistory(tmp_path / "posted.log"))
+    bot.warmup.start("history", asyncio.sleep(3600))
+    post = bot.tree.get_command("jobbot").get_command("post")
+    interaction = FakeInteraction(1, FakeGuild([FakeChannel("art", 1)]))
+
+    task = asyncio.create_task(post.callback(interaction, reference="https://jobs.example.com/env"))
+    await asyncio.sleep(0.01)
+    await bot.drain(0.05)
+    await bot.warmup.cancel()
+    assert task.cancelled()
+    assert "queued" in interaction.followups[0]
+    manager.close()
+
+    [entry] = await RetryManager(tmp_path / "pending.json").claim_due_requests()
+    assert (entry.request_id, entry.last_error) == (1, "Received during shutdown")
+
+
+@pytest.mark.asyncio
+async def test_post_reuses_matching_preview(tmp_path: Path, monkeypatch):
+    async def fake_fetch(url, *, timeout, max_bytes):
+        return "Environment Artist at Voxel Labs"
+
+    monkeypatch.setattr("bot.client.fetch_page_text", fake_fetch)
+    config = BotConfig(
+        discord_token="dummy",
+        openai=OpenAIConfig(api_key="dummy"),
+        channels=ChannelConfig(team_channels={"art": 1}),
+    )
+    parser = CountingParser()
+    bot = LaCommuDiscordBot(config, parser, RetryManager(tmp_path / "pending.json"), PostHistory(tmp_path / "posted.log"))
+    group = bot.tree.get_command("jobbot")
+    art_channel = FakeChannel("art", 1)
+    guild = FakeGuild([art_channel])
+
+    preview = FakeInteraction(1, guild)
+    await group.get_command("preview").callback(preview, reference="https://jobs.example.com/env")
+    assert preview.view is not None
+    await group.get_command("post").callback(
+        FakeInteraction(2, guild),
+        reference="Hiring: https://jobs.example.com/env?utm_source=discord",
+    )
+    assert parser.calls == 1
+    assert len(art_channel.sent_embeds) == 1
+    assert len(bot.preview_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_post_these_outside_a_server_replies(tmp_path: Path):
+    config = BotConfig(discord_token="dummy", openai=OpenAIConfig(api_key="dummy"))
+    bot = LaCommuDiscordBot(config, DummyParser(), RetryManager(tmp_path / "pending.json"), PostHistory(tmp_path / "posted.log"))
+    view = PostPreviewView(bot, reference="https://jobs.example.com/env", force=False, timeout=60)
+    interaction = FakeInteraction(1, None)
+
+    await view.post_these.callback(interaction)
+    assert interaction.followups == ["Run this command inside a Discord server."]
@@ -0,0 +1,35 @@
+import pytest
+
+from bot.config import load_config
+
+
+@pytest.fixture
+def env(monkeypatch):
+    monkeypatch.setenv("DISCORD_BOT_TOKEN", "dummy")
+    monkeypatch.setenv("OPENAI_API_KEY", "dummy")
+    monkeypatch.setenv("JOB_TEAM_CHANNEL_IDS", "art:1,game_design:2,dev:3,others:4")
+    return monkeypatch
+
+
+def test_retry_settings_default_and_parse(env):
+    assert load_config().retry_concurrency == 4
+    env.setenv("RETRY_CONCURRENCY", "2")
+    env.setenv("RETRY_POLL_INTERVAL", "0.5")
+    config = load_config()
+    assert (config.retry_concurrency, config.retry_poll_interval) == (2, 0.5)
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("RETRY_CONCURRENCY", "0"),
+        ("RETRY_POLL_INTERVAL", "-1"),
+        ("RETRY_BASE_DELAY", "0"),
+        ("RETRY_MAX_DELAY", "nan"),
+        ("RETRY_MAX_DELAY", "10"),
+    ],
+)
+def test_retry_settings_reject_non_positive_values(env, name, value):
+    env.setenv(name, value)
+    with pytest.raises(RuntimeError, match=name):
+        load_config()
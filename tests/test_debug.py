@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.debug import build_debug_app
+
+AUTH = {"Authorization": "Bearer secret"}
+
+
+async def busy_worker():
+    await asyncio.sleep(10)
+
+
+@pytest.mark.asyncio
+async def test_debug_routes_require_token_and_dump_tasks():
+    worker = asyncio.create_task(busy_worker(), name="busy-worker")
+    async with TestClient(TestServer(build_debug_app("secret"))) as client:
+        response = await client.get("/debug/tasks")
+        assert response.status == 401
+
+        response = await client.get("/debug/tasks", headers=AUTH)
+        assert response.status == 200
+        assert "attachment" in response.headers["Content-Disposition"]
+        report = await response.text()
+        assert "busy-worker" in report
+        assert "busy_worker" in report
+    worker.cancel()
+
+
+@pytest.mark.asyncio
+async def test_debug_profile_and_tracemalloc_reports():
+    async with TestClient(TestServer(build_debug_app("secret"))) as client:
+        response = await client.get("/debug/profile?seconds=0.1", headers=AUTH)
+        assert response.status == 200
+        assert "function calls" in await response.text()
+
+        response = await client.get("/debug/profile?seconds=0.1&mode=sample", headers=AUTH)
+        assert response.status == 200
+
+        response = await client.get("/debug/tracemalloc?seconds=0.1", headers=AUTH)
+        assert response.status == 200
+        assert "tracemalloc diff" in await response.text()
@@ -20,6 +20,8 @@ def test_health_server_registers_expected_routes() -> None:
             assert "/health" in routes
             assert "/" in routes
             assert "/healthz" in routes
+            assert "/ready" in routes
+            assert "/metrics" in routes
         finally:
             await server.stop()
 
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from bot.history import HistoryRecord, PostHistory
+from bot.models import JobPosting
+
+
+def _job(url: str) -> JobPosting:
+    return JobPosting(job_title="Producer", company_name="Space Cats", job_url=url, team="others")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("options", [{}, {"compact": True}, {"bloom": True}])
+async def test_history_persists_posted_keys(tmp_path: Path, options):
+    storage = tmp_path / "posted.log"
+    history = PostHistory(storage, **options)
+    await history.mark_posted(_job("https://jobs.example.com/1/#apply"))
+
+    reloaded = PostHistory(storage, **options)
+    assert await reloaded.is_posted(_job("https://JOBS.example.com/1"))
+    assert not await reloaded.is_posted(_job("https://jobs.example.com/2"))
+
+
+@pytest.mark.asyncio
+async def test_shared_history_sees_entries_from_other_processes(tmp_path: Path):
+    storage = tmp_path / "posted.log"
+    first = PostHistory(storage, shared=True)
+    second = PostHistory(storage, shared=True)
+    await first.load()
+    await second.load()
+
+    await first.mark_posted(_job("https://jobs.example.com/1"))
+
+    assert await second.is_posted(_job("https://jobs.example.com/1"))
+    await second.mark_posted(_job("https://jobs.example.com/1"))
+    assert storage.read_text().splitlines() == ["https://jobs.example.com/1"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_history_migrates_log_and_records_destination(tmp_path: Path):
+    legacy = tmp_path / "posted.log"
+    legacy.write_text("https://jobs.example.com/old\n")
+    history = PostHistory(tmp_path / "posted.db", legacy_log_path=legacy)
+
+    assert await history.is_posted(_job("https://jobs.example.com/old"))
+    assert not legacy.exists()
+    await history.mark_posted(_job("https://jobs.example.com/new"), guild_id=1, channel_id=2)
+    history.close()
+
+    reopened = PostHistory(tmp_path / "posted.db")
+    assert await reopened.is_posted(_job("https://jobs.example.com/new"))
+    row = reopened._store._connection.execute(  # noqa: SLF001
+        "SELECT guild_id, channel_id FROM posted_jobs WHERE key = ?",
+        ("https://jobs.example.com/new",),
+    ).fetchone()
+    assert row == (1, 2)
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_history_expires_entries_after_ttl(tmp_path: Path, monkeypatch):
+    history = PostHistory(tmp_path / "posted.db", ttl=60)
+    await history.mark_posted(_job("https://jobs.example.com/1"))
+    assert await history.is_posted(_job("https://jobs.example.com/1"))
+
+    real_time = time.time
+    monkeypatch.setattr("bot.history.time.time", lambda: real_time() + 120)
+    assert not await history.is_posted(_job("https://jobs.example.com/1"))
+    history.close()
+
+
+@pytest.mark.asyncio
+async def test_forced_repost_refreshes_sqlite_ttl(tmp_path: Path, monkeypatch):
+    history = PostHistory(tmp_path / "posted.db", ttl=60)
+    real_time = time.time
+    assert await history.mark_posted(_job("https://jobs.example.com/1"))
+    assert not await history.mark_posted(_job("https://jobs.example.com/1"))
+
+    monkeypatch.setattr("bot.history.time.time", lambda: real_time() + 50)
+    assert await history.mark_posted(_job("https://jobs.example.com/1"), force=True)
+    monkeypatch.setattr("bot.history.time.time", lambda: real_time() + 100)
+    assert await history.is_posted(_job("https://jobs.example.com/1"))
+    history.close()
+
+
+@pytest.mark.asyncio
+async def test_group_commit_batches_writes_and_flushes_on_close(tmp_path: Path):
+    storage = tmp_path / "posted.log"
+    history = PostHistory(storage, flush_interval=60, batch_size=3)
+
+    await history.mark_posted(_job("https://jobs.example.com/1"))
+    await history.mark_posted(_job("https://jobs.example.com/2"))
+    assert await history.is_posted(_job("https://jobs.example.com/1"))
+    assert not storage.exists() or storage.read_text() == ""
+
+    await history.mark_posted(_job("https://jobs.example.com/3"))
+    await asyncio.sleep(0.05)
+    assert len(storage.read_text().splitlines()) == 3
+
+    await history.mark_posted(_job("https://jobs.example.com/4"))
+    await history.aclose()
+    assert len(storage.read_text().splitlines()) == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", ["posted.log", "posted.db"])
+async def test_rewrite_keys_canonicalizes_stored_urls(tmp_path: Path, name: str):
+    history = PostHistory(tmp_path / name)
+    await history.load()
+    legacy_keys = [
+        "https://www.jobs.example.com/1?utm_source=x",
+        "https://jobs.example.com/1",
+        "voxel labs|producer|others",
+    ]
+    await history._store.add_many([HistoryRecord(key, time.time()) for key in legacy_keys])  # noqa: SLF001
+
+    assert await history.rewrite_keys() == 1
+    assert await history.is_posted(_job("https://jobs.example.com/1?utm_medium=social"))
+    await history.aclose()
+
+
+@pytest.mark.asyncio
+async def test_shared_history_append_rechecks_under_lock(tmp_path: Path):
+    storage = tmp_path / "posted.log"
+    first = PostHistory(storage, shared=True)
+    second = PostHistory(storage, shared=True)
+    await first.load()
+    await second.load()
+
+    # Both processes looked the key up before either recorded it.
+    assert not await first.is_posted(_job("https://jobs.example.com/1"))
+    assert not await second.is_posted(_job("https://jobs.example.com/1"))
+    assert await first.mark_posted(_job("https://jobs.example.com/1"))
+    records = [HistoryRecord("https://jobs.example.com/1", time.time())]
+    assert await second._store.add_many(records) == []  # noqa: SLF001
+    assert storage.read_text().splitlines() == ["https://jobs.example.com/1"]
+
+
+@pytest.mark.asyncio
+async def test_sqlite_history_reports_only_first_writer(tmp_path: Path):
+    first = PostHistory(tmp_path / "posted.db")
+    second = PostHistory(tmp_path / "posted.db")
+    await first.load()
+    await second.load()
+    records = [HistoryRecord("https://jobs.example.com/1", time.time())]
+
+    assert await first._store.add_many(records) == ["https://jobs.example.com/1"]  # noqa: SLF001
+    assert await second._store.add_many(records) == []  # noqa: SLF001
+    assert await second._store.add_many(records, replace=True) == ["https://jobs.example.com/1"]  # noqa: SLF001
+    first.close()
+    second.close()
@@ -0,0 +1,21 @@
+from bot.keyset import KeyDigestSet
+
+
+def test_key_digest_set_membership_survives_growth():
+    keys = [f"https://jobs.example.com/{index}" for index in range(5000)]
+    digests = KeyDigestSet(keys[:10], capacity=4)
+    digests.update(keys[10:])
+
+    assert len(digests) == 5000
+    assert all(key in digests for key in keys)
+    assert "https://jobs.example.com/unknown" not in digests
+    assert not digests.add(keys[0])
+
+
+def test_bloom_front_never_rejects_present_keys():
+    keys = [f"https://jobs.example.com/{index}" for index in range(2000)]
+    digests = KeyDigestSet(keys, bloom=True)
+
+    assert all(digests.might_contain(key) for key in keys)
+    misses = sum(digests.might_contain(f"https://other.example.com/{index}") for index in range(2000))
+    assert misses < 100
@@ -0,0 +1,47 @@
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from bot.log import JsonFormatter, RequestIdFilter, build_file_handler, setup_queue_logging
+from bot.tracing import Tracer
+
+
+def test_json_formatter_includes_request_id_of_active_trace():
+    record = logging.LogRecord("bot.client", logging.INFO, __file__, 1, "Posted %s", ("Producer",), None)
+    with Tracer().start_trace(987, "jobbot.post"):
+        RequestIdFilter().filter(record)
+
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["message"] == "Posted Producer"
+    assert payload["request_id"] == "987"
+    assert payload["level"] == "INFO"
+
+
+@pytest.fixture
+def restore_root_logging():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_queue_logging_writes_on_listener_thread_and_rotates(tmp_path: Path, restore_root_logging):
+    log_file = tmp_path / "bot.log"
+    handler = build_file_handler(log_file, max_bytes=500, backups=2)
+    listener = setup_queue_logging([handler], json_format=True)
+    try:
+        for index in range(30):
+            logging.getLogger("bot.test").info("line %d", index)
+    finally:
+        listener.stop()
+        handler.close()
+
+    assert (tmp_path / "bot.log.1").exists()
+    last = json.loads(log_file.read_text().splitlines()[-1])
+    assert last["message"] == "line 29"
@@ -0,0 +1,36 @@
+import pytest
+
+from bot.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text_format():
+    registry = MetricsRegistry()
+    posted = registry.counter("jobs_total", "Jobs posted.", ["team"])
+    backlog = registry.gauge("backlog", "Pending requests.")
+    latency = registry.histogram("send_seconds", "Send latency.", buckets=(0.1, 1.0))
+
+    posted.inc(team="art")
+    posted.inc(2, team="art")
+    backlog.set(4)
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3)
+
+    text = registry.render()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{team="art"} 3' in text
+    assert "backlog 4" in text
+    assert 'send_seconds_bucket{le="0.1"} 1' in text
+    assert 'send_seconds_bucket{le="1"} 2' in text
+    assert 'send_seconds_bucket{le="+Inf"} 3' in text
+    assert "send_seconds_count 3" in text
+    assert "send_seconds_sum 3.55" in text
+
+
+def test_metric_rejects_unknown_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter("hits_total", "Hits.", ["cache"])
+    with pytest.raises(ValueError):
+        counter.inc(result="hit")
+    with pytest.raises(ValueError):
+        registry.counter("hits_total", "Duplicate.")
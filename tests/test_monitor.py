@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from bot.monitor import LoopMonitor, ReadinessProbe
+
+
+class FakeBot:
+    def __init__(self, *, ready=True):
+        self._ready = ready
+
+    def is_ready(self):
+        return self._ready
+
+    def is_closed(self):
+        return False
+
+
+async def blocking_parse():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_measures_lag_and_names_blocking_coroutine(caplog):
+    monitor = LoopMonitor(interval=0.02, slow_callback=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING, logger="bot.monitor"):
+            await blocking_parse()
+            await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    assert monitor.max_lag >= 0.2
+    assert "blocking_parse" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_readiness_probe_fails_on_lag_or_disconnected_gateway():
+    monitor = LoopMonitor(gateway_latency=lambda: 0.1)
+    probe = ReadinessProbe(FakeBot(), monitor, max_loop_lag=1.0)
+    ready, details = await probe.check()
+    assert ready
+    assert details["status"] == "ready"
+
+    monitor.lag = 2.0
+    ready, details = await probe.check()
+    assert not ready
+    assert "event loop lag" in details["failures"][0]
+
+    monitor.lag = 0.0
+    ready, details = await ReadinessProbe(FakeBot(ready=False), monitor).check()
+    assert not ready
+    assert details["failures"] == ["gateway not connected"]
@@ -1,8 +1,9 @@
 import json
+from types import SimpleNamespace
 
 import pytest
 
-from bot.openai_client import _extract_jobs
+from bot.openai_client import _build_image_messages, _extract_jobs, _image_tokens
 
 
 def test_extract_jobs_from_array():
@@ -23,6 +24,20 @@ def test_extract_jobs_from_single_object():
     assert result[0]["team"] == "game_design"
 
 
+def test_extract_jobs_from_single_object_with_array_field():
+    payload = json.dumps({"job_title": "Artist", "skills": ["ZBrush", "Substance"]})
+    result = _extract_jobs(payload)
+    assert len(result) == 1
+    assert result[0]["skills"] == ["ZBrush", "Substance"]
+
+
+def test_extract_jobs_unwraps_job_list_object():
+    payload = json.dumps({"jobs": [{"job_title": "A", "skills": ["C++"]}, {"job_title": "B"}]})
+    assert [job["job_title"] for job in _extract_jobs(payload)] == ["A", "B"]
+    assert [job["job_title"] for job in _extract_jobs(f"Here you go: {payload}")] == ["A", "B"]
+    assert _extract_jobs(json.dumps({"results": []})) == []
+
+
 def test_extract_jobs_handles_malformed_json():
     result = _extract_jobs("{not valid json}")
     assert result == []
@@ -34,3 +49,12 @@ def test_extract_jobs_missing_objects_logs_warning(caplog):
         result = _extract_jobs(payload)
     assert result == []
     assert "JSON array contained no dict objects" in caplog.text
+
+
+def test_image_tokens_excludes_text_prompt():
+    messages = _build_image_messages("x" * 400, "https://cdn.example.com/poster.png")
+    text_tokens = (len(messages[0]["content"]) + 400) // 4
+    assert _image_tokens(SimpleNamespace(), text_tokens + 765, messages) == 765
+
+    reported = SimpleNamespace(input_tokens_details=SimpleNamespace(image_tokens=700))
+    assert _image_tokens(reported, text_tokens + 765, messages) == 700
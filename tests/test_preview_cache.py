@@ -0,0 +1,41 @@
+from bot.preview_cache import PreviewCache, normalize_reference
+
+JOBS = [{"job_title": "Environment Artist", "company_name": "Voxel Labs", "source_url": "https://jobs.example.com/env"}]
+
+
+def test_normalize_reference_ignores_wording_order_and_tracking():
+    first = "New roles! https://jobs.example.com/env?utm_source=x and image: https://cdn.example.com/poster.png"
+    second = "image: https://cdn.example.com/poster.png\nhttps://www.jobs.example.com/env/"
+    assert normalize_reference(first) == normalize_reference(second)
+    assert normalize_reference("no links here") is None
+
+
+def test_take_reuses_once_and_respects_guild_and_force():
+    cache = PreviewCache(ttl=60)
+    assert cache.put(1, "https://jobs.example.com/env", False, JOBS, ["note"])
+
+    assert cache.take(2, "https://jobs.example.com/env", False) is None
+    assert cache.take(1, "https://jobs.example.com/env", True) is None
+    jobs, issues = cache.take(1, "see https://jobs.example.com/env?utm_medium=social", False)
+    assert jobs == JOBS and jobs is not JOBS and issues == ["note"]
+    assert cache.take(1, "https://jobs.example.com/env", False) is None
+    assert cache.size_bytes == 0
+
+
+def test_expired_entries_are_not_reused():
+    cache = PreviewCache(ttl=0)
+    cache.put(1, "https://jobs.example.com/env", False, JOBS, [])
+    assert cache.take(1, "https://jobs.example.com/env", False) is None
+
+
+def test_bounded_by_entries_and_bytes():
+    cache = PreviewCache(ttl=60, max_entries=2, max_bytes=10_000)
+    for index in range(3):
+        cache.put(1, f"https://jobs.example.com/{index}", False, JOBS, [])
+    assert len(cache) == 2
+    assert cache.take(1, "https://jobs.example.com/0", False) is None
+
+    big = [{"summary": "x" * 9_950}]
+    assert cache.put(1, "https://jobs.example.com/big", False, big, [])
+    assert len(cache) == 1 and cache.size_bytes <= 10_000
+    assert not cache.put(1, "https://jobs.example.com/huge", False, [{"summary": "x" * 20_000}], [])
@@ -0,0 +1,96 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from bot.retry import RetryManager
+
+
+async def _start(manager: RetryManager, request_id: int) -> None:
+    await manager.start_request(
+        request_id=request_id,
+        guild_id=1,
+        user_id=2,
+        reference="https://jobs.example.com/1",
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_request_is_scheduled_with_backoff(tmp_path: Path):
+    manager = RetryManager(tmp_path / "pending.json", base_delay=10, jitter=0)
+    await _start(manager, 1)
+    await manager.fail_request(1, "boom")
+
+    [entry] = await manager.list_pending_requests()
+    assert entry.attempts == 1
+    assert entry.next_attempt_at - entry.created_at == pytest.approx(10, abs=1)
+
+    assert await manager.claim_due_requests() == []
+    due = await manager.claim_due_requests(now=entry.next_attempt_at + 1)
+    assert [item.request_id for item in due] == [1]
+    assert manager.backoff_delay(3) == 40
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_in_flight_and_exhausted_requests(tmp_path: Path):
+    storage = tmp_path / "pending.json"
+    manager = RetryManager(storage, max_attempts=1)
+    await _start(manager, 1)
+    await _start(manager, 2)
+    await manager.fail_request(2, "boom")
+
+    # Request 1 is still running live; request 2 ran out of attempts.
+    assert await manager.claim_due_requests(now=float("inf")) == []
+    manager.flush()
+
+    restarted = RetryManager(storage, max_attempts=1)
+    due = await restarted.claim_due_requests()
+    assert [item.request_id for item in due] == [1]
+    stats = await restarted.stats()
+    assert (stats.backlog, stats.due, stats.in_flight, stats.exhausted) == (1, 0, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_journal_replays_after_crash_and_ignores_torn_record(tmp_path: Path):
+    storage = tmp_path / "pending.json"
+    manager = RetryManager(storage)
+    await _start(manager, 1)
+    await _start(manager, 2)
+    await manager.complete_request(1)
+    await manager.fail_request(2, "boom")
+    manager.flush()
+    # Simulate a crash mid-append: no close(), half a record at the end.
+    with storage.with_name("pending.json.journal").open("a") as journal:
+        journal.write('{"op":"put","entry":{"request_')
+
+    recovered = RetryManager(storage)
+    [entry] = await recovered.list_pending_requests()
+    assert entry.request_id == 2
+    assert entry.attempts == 1
+    recovered.flush()
+    assert storage.with_name("pending.json.journal").read_text() == ""
+
+
+@pytest.mark.asyncio
+async def test_journal_compacts_into_snapshot(tmp_path: Path):
+    storage = tmp_path / "pending.json"
+    manager = RetryManager(storage, compact_threshold=3)
+    for request_id in range(4):
+        await _start(manager, request_id)
+    manager.close()
+
+    assert len(json.loads(storage.read_text())) == 3
+    assert len(await RetryManager(storage).list_pending_requests()) == 4
+
+
+@pytest.mark.asyncio
+async def test_deferred_request_keeps_its_attempts(tmp_path: Path):
+    manager = RetryManager(tmp_path / "pending.json")
+    await _start(manager, 1)
+    await manager.defer_request(1, until=1000.0, reason="Daily budget reached")
+
+    [entry] = await manager.list_pending_requests()
+    assert entry.attempts == 0
+    assert entry.last_error == "Daily budget reached"
+    assert await manager.claim_due_requests(now=999.0) == []
+    assert [item.request_id for item in await manager.claim_due_requests(now=1000.0)] == [1]
@@ -1,3 +1,4 @@
+import httpx
 import pytest
 
 from bot import scraping
@@ -39,7 +40,7 @@ async def test_fetch_page_text_strips_scripts(monkeypatch):
     def fake_client(*args, **kwargs):
         return DummyClient(response)
 
-    monkeypatch.setattr(scraping.httpx, "AsyncClient", fake_client)
+    monkeypatch.setattr(httpx, "AsyncClient", fake_client)
 
     text = await scraping.fetch_page_text(
         "https://jobs.example.com",
@@ -58,7 +59,7 @@ async def test_fetch_image_bytes_returns_content(monkeypatch):
     def fake_client(*args, **kwargs):
         return DummyClient(response)
 
-    monkeypatch.setattr(scraping.httpx, "AsyncClient", fake_client)
+    monkeypatch.setattr(httpx, "AsyncClient", fake_client)
 
     content = await scraping.fetch_image_bytes(
         "https://cdn.example.com/poster.png",
@@ -76,7 +77,7 @@ async def test_fetch_image_bytes_returns_none_when_too_large(monkeypatch):
     def fake_client(*args, **kwargs):
         return DummyClient(response)
 
-    monkeypatch.setattr(scraping.httpx, "AsyncClient", fake_client)
+    monkeypatch.setattr(httpx, "AsyncClient", fake_client)
 
     content = await scraping.fetch_image_bytes(
         "https://cdn.example.com/poster.png",
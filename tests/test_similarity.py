@@ -0,0 +1,79 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from bot.models import JobPosting
+from bot.similarity import SimilarityIndex
+
+
+def make_job(title, company, url, summary="Build tools and gameplay systems for our next open-world title."):
+    return JobPosting(
+        job_title=title,
+        company_name=company,
+        job_url=url,
+        team="dev",
+        location="Paris, France",
+        description_summary=summary,
+    )
+
+
+@pytest.mark.asyncio
+async def test_similarity_index_flags_reposts_but_not_other_roles(tmp_path: Path):
+    index = SimilarityIndex(tmp_path / "fingerprints.log")
+    await index.add(make_job("Senior Gameplay Programmer", "Voxel Labs", "https://jobs.example.com/1"))
+
+    repost = make_job("Senior Gameplay Programmer", "Voxel Labs", "https://mirror.example.com/abc")
+    match = await index.find(repost)
+    assert match is not None
+    assert "https://jobs.example.com/1" in match.label
+
+    other = make_job(
+        "Lead Character Artist",
+        "Pixel Forge",
+        "https://jobs.example.com/2",
+        summary="Own the look of our heroes, from concept sculpt to in-engine shaders.",
+    )
+    assert await index.find(other) is None
+
+    reloaded = SimilarityIndex(tmp_path / "fingerprints.log")
+    assert await reloaded.find(repost) is not None
+
+
+@pytest.mark.asyncio
+async def test_similarity_index_forgets_entries_outside_window(tmp_path: Path):
+    storage = tmp_path / "fingerprints.log"
+    await SimilarityIndex(storage).add(make_job("Technical Artist", "Voxel Labs", "https://jobs.example.com/ta"))
+    record = json.loads(storage.read_text())
+    record["at"] = time.time() - 120
+    storage.write_text(json.dumps(record) + "\n")
+
+    reloaded = SimilarityIndex(storage, window=60)
+    assert await reloaded.find(make_job("Technical Artist", "Voxel Labs", "https://other.example.com/ta")) is None
+    assert len(reloaded) == 0
+
+
+def test_similarity_index_rejects_out_of_range_distance():
+    for distance in (-1, 64):
+        with pytest.raises(ValueError):
+            SimilarityIndex(max_distance=distance)
+
+
+@pytest.mark.asyncio
+async def test_shared_similarity_index_sees_other_processes(tmp_path: Path):
+    storage = tmp_path / "fingerprints.log"
+    first = SimilarityIndex(storage, shared=True)
+    second = SimilarityIndex(storage, shared=True)
+    await first.load()
+    await second.load()
+
+    await first.add(make_job("Technical Artist", "Voxel Labs", "https://jobs.example.com/ta"))
+    assert await second.find(make_job("Technical Artist", "Voxel Labs", "https://other.example.com/ta")) is not None
+    await second.add(make_job("Level Designer", "Space Cats", "https://jobs.example.com/ld"))
+    assert len(second) == 2
+
+    # A third process compacts (replaces) the log on start-up; the others re-read it.
+    await SimilarityIndex(storage, shared=True).load()
+    assert await first.find(make_job("Level Designer", "Space Cats", "https://other.example.com/ld")) is not None
+    assert len(first) == 2
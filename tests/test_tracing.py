@@ -0,0 +1,56 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from bot.tracing import JsonlSpanExporter, Tracer, render_waterfall
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_awaits_and_export_per_trace(tmp_path: Path):
+    tracer = Tracer()
+    exporter = JsonlSpanExporter(tmp_path / "traces.jsonl", max_bytes=10_000)
+    tracer.exporters.append(exporter)
+
+    async def fetch(url):
+        with tracer.start_span("fetch_page", url=url):
+            await asyncio.sleep(0.01)
+
+    assert tracer.start_span("orphan").__class__.__name__ == "_NoopSpan"
+    with tracer.start_trace(42, "jobbot.post", guild_id=1):
+        with tracer.start_span("collect_jobs"):
+            await asyncio.gather(fetch("https://a.example"), fetch("https://b.example"))
+        with pytest.raises(RuntimeError):
+            with tracer.start_span("discord.send"):
+                raise RuntimeError("boom")
+
+    spans = tracer.get_trace("42")
+    by_name = {span.name: span for span in spans}
+    assert len(spans) == 5
+    assert by_name["collect_jobs"].parent_id == by_name["jobbot.post"].span_id
+    assert {span.parent_id for span in spans if span.name == "fetch_page"} == {by_name["collect_jobs"].span_id}
+    assert by_name["discord.send"].error == "RuntimeError: boom"
+
+    exporter.flush()
+    lines = (tmp_path / "traces.jsonl").read_text().splitlines()
+    assert {json.loads(line)["trace_id"] for line in lines} == {"42"}
+
+    waterfall = render_waterfall(spans)
+    assert "jobbot.post" in waterfall
+    assert "    fetch_page" in waterfall
+
+
+def test_jsonl_exporter_rotates(tmp_path: Path):
+    tracer = Tracer()
+    exporter = JsonlSpanExporter(tmp_path / "traces.jsonl", max_bytes=300, backups=2)
+    tracer.exporters.append(exporter)
+    for index in range(6):
+        tracer.start_trace(index, "jobbot.post", payload="x" * 100).end()
+        # One flush per trace so each lands in its own write, as when traces finish apart.
+        exporter.flush()
+    tracer.close()
+
+    assert (tmp_path / "traces.jsonl.1").exists()
+    assert (tmp_path / "traces.jsonl.2").exists()
+    assert not (tmp_path / "traces.jsonl.3").exists()
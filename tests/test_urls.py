@@ -0,0 +1,61 @@
+import pytest
+
+from bot import urls
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        (
+            "https://www.linkedin.com/jobs/view/gameplay-programmer-at-studio-3812345678/?trk=abc&refId=x",
+            "https://linkedin.com/jobs/view/3812345678",
+        ),
+        (
+            "https://fr.linkedin.com/jobs/search/?currentJobId=3812345678&geoId=1",
+            "https://linkedin.com/jobs/view/3812345678",
+        ),
+        (
+            "http://jobs.lever.co/studio/abc-123/apply?lever-source=LinkedIn",
+            "https://jobs.lever.co/studio/abc-123",
+        ),
+        (
+            "https://Jobs.Example.com/careers/123/?utm_source=x&b=2&a=1#apply",
+            "https://jobs.example.com/careers/123?a=1&b=2",
+        ),
+        ("https://fr.indeed.com/rc/clk?jk=abcd1234&from=x", "https://indeed.com/viewjob?jk=abcd1234"),
+    ],
+)
+def test_canonicalize_url(raw, expected):
+    assert urls.canonicalize_url(raw) == expected
+
+
+def test_dedupe_key_keeps_legacy_behaviour_for_non_urls():
+    assert urls.dedupe_key("Careers Page/#apply") == "careers page"
+
+
+def test_anonymize_url_masks_tracking_values_and_keeps_shape():
+    raw = "https://user:pw@www.linkedin.com/jobs/view/123/?trk=abc&refId=Zz9&currentJobId=9"
+    anonymized = urls.anonymize_url(raw)
+    assert anonymized == "https://www.linkedin.com/jobs/view/123/?trk=x&refId=x&currentJobId=9"
+    assert urls.anonymize_url(anonymized) == anonymized
+    assert urls.canonicalize_url(anonymized) == urls.canonicalize_url(raw)
+
+
+@pytest.mark.asyncio
+async def test_redirect_resolver_caches_shortened_links(tmp_path, monkeypatch):
+    calls = []
+
+    async def fake_follow(self, url):
+        calls.append(url)
+        return "https://www.linkedin.com/jobs/view/3812345678"
+
+    monkeypatch.setattr(urls.RedirectResolver, "_follow", fake_follow)
+    resolver = urls.RedirectResolver(tmp_path / "redirects.json")
+
+    assert await resolver.resolve("https://example.com/job") == "https://example.com/job"
+    first = await resolver.resolve("https://lnkd.in/abcDEF")
+    reloaded = urls.RedirectResolver(tmp_path / "redirects.json")
+    second = await reloaded.resolve("https://lnkd.in/abcDEF")
+
+    assert first == second == "https://www.linkedin.com/jobs/view/3812345678"
+    assert calls == ["https://lnkd.in/abcDEF"]
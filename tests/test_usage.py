@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+
+from bot.usage import UsageLedger, estimate_cost, next_utc_midnight, utc_day
+
+
+@pytest.mark.asyncio
+async def test_usage_ledger_aggregates_per_guild_user_and_day(tmp_path: Path):
+    ledger = UsageLedger(tmp_path / "usage.db")
+    await ledger.load()
+    try:
+        await ledger.record(model="gpt-4o-mini", input_tokens=1000, output_tokens=200, guild_id=1, user_id=10)
+        await ledger.record(
+            model="gpt-4o-mini", input_tokens=3000, output_tokens=100, image_tokens=3000, guild_id=1, user_id=11
+        )
+        await ledger.record(model="gpt-4o-mini", input_tokens=500, output_tokens=50, guild_id=1, user_id=10)
+        await ledger.record(model="gpt-4o-mini", input_tokens=999, output_tokens=1, guild_id=2, user_id=10)
+        await ledger.record(
+            model="gpt-4o-mini", input_tokens=5, output_tokens=5, guild_id=1, user_id=10, timestamp=0
+        )
+
+        summary = await ledger.summary(1)
+        assert summary.guild.calls == 3
+        assert summary.guild.input_tokens == 4500
+        assert summary.guild.image_tokens == 3000
+        assert [user_id for user_id, _ in summary.top_users] == [11, 10]
+        assert summary.guild.cost_usd == pytest.approx(estimate_cost("gpt-4o-mini", 4500, 350))
+
+        user = await ledger.totals(guild_id=1, user_id=10)
+        assert user.tokens == 1750
+        assert (await ledger.totals(guild_id=1, day=utc_day(0))).calls == 1
+    finally:
+        ledger.close()
+
+
+@pytest.mark.asyncio
+async def test_usage_ledger_budgets(tmp_path: Path):
+    ledger = UsageLedger(tmp_path / "usage.db", guild_daily_tokens=5000, user_daily_tokens=1000)
+    await ledger.load()
+    try:
+        assert await ledger.budget_exceeded(1, 10) is None
+        await ledger.record(model="gpt-4o", input_tokens=900, output_tokens=100, guild_id=1, user_id=10)
+        assert "you used" in await ledger.budget_exceeded(1, 10)
+        assert await ledger.budget_exceeded(1, 11) is None
+        await ledger.record(model="gpt-4o", input_tokens=4000, output_tokens=0, guild_id=1, user_id=11)
+        assert "this server used" in await ledger.budget_exceeded(1, 12)
+    finally:
+        ledger.close()
+
+    assert next_utc_midnight(0) == 86400
+    assert estimate_cost("gpt-4o-mini-2024-07-18", 1_000_000, 0) == pytest.approx(0.15)
+
+
+@pytest.mark.asyncio
+async def test_usage_ledger_opens_on_first_use_without_load(tmp_path: Path):
+    ledger = UsageLedger(tmp_path / "usage.db", guild_daily_tokens=100)
+    try:
+        await ledger.record(model="gpt-4o", input_tokens=150, output_tokens=0, guild_id=1, user_id=10)
+        assert "this server used" in await ledger.budget_exceeded(1, 10)
+    finally:
+        ledger.close()
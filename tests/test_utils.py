@@ -29,3 +29,9 @@ def test_to_base64_roundtrip():
     payload = b"hello world"
     encoded = utils.to_base64(payload)
     assert encoded == base64.b64encode(payload).decode("ascii")
+
+
+def test_shard_ids_for_process_covers_every_shard_once():
+    assignments = [utils.shard_ids_for_process(index, 3, 8) for index in range(3)]
+    assert assignments[0] == [0, 3, 6]
+    assert sorted(shard for group in assignments for shard in group) == list(range(8))
@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+
+from bot.warmup import Warmup
+
+
+@pytest.mark.asyncio
+async def test_wait_blocks_until_step_finishes():
+    warmup = Warmup()
+    release = asyncio.Event()
+    warmup.start("history", release.wait())
+
+    waiter = asyncio.create_task(warmup.wait("history", "never-started"))
+    await asyncio.sleep(0.01)
+    assert not waiter.done()
+    assert warmup.pending() == ["history"]
+
+    release.set()
+    await asyncio.wait_for(waiter, 1)
+    assert warmup.is_ready("history")
+    assert "history" in warmup.durations
+
+
+@pytest.mark.asyncio
+async def test_failed_step_still_releases_waiters():
+    async def broken():
+        raise OSError("disk gone")
+
+    warmup = Warmup()
+    warmup.start("usage", broken())
+    await asyncio.wait_for(warmup.wait("usage"), 1)
+    assert not warmup.pending()
+    assert "usage" not in warmup.durations